@@ -0,0 +1,64 @@
+"""denormalized owner_teacher_id
+
+Adds owner_teacher_id to classes, assignments and submissions so teacher
+authorization checks no longer join back to schools. Existing rows are
+backfilled top-down from schools.teacher_id before the columns become
+NOT NULL; new rows are kept consistent by the mapper events in
+app/models/ownership.py.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 21:05:12.418307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+OWNED_TABLES = ('classes', 'assignments', 'submissions')
+
+
+def upgrade() -> None:
+    for table in OWNED_TABLES:
+        op.add_column(table, sa.Column('owner_teacher_id', sa.Integer(), nullable=True))
+
+    op.execute(
+        "UPDATE classes SET owner_teacher_id = "
+        "(SELECT schools.teacher_id FROM schools WHERE schools.id = classes.school_id)"
+    )
+    op.execute(
+        "UPDATE assignments SET owner_teacher_id = "
+        "(SELECT classes.owner_teacher_id FROM classes WHERE classes.id = assignments.class_id)"
+    )
+    op.execute(
+        "UPDATE submissions SET owner_teacher_id = "
+        "(SELECT assignments.owner_teacher_id FROM assignments WHERE assignments.id = submissions.assignment_id)"
+    )
+
+    for table in OWNED_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('owner_teacher_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_foreign_key(f'fk_{table}_owner_teacher_id', 'users', ['owner_teacher_id'], ['id'])
+
+    op.create_index('ix_classes_owner_teacher', 'classes', ['owner_teacher_id'], unique=False)
+    op.create_index('ix_assignments_owner_created', 'assignments', ['owner_teacher_id', 'created_at'], unique=False)
+    op.create_index('ix_submissions_owner_graded', 'submissions', ['owner_teacher_id', 'is_graded'], unique=False)
+    op.create_index('ix_submissions_owner_submitted', 'submissions', ['owner_teacher_id', 'submitted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submissions_owner_submitted', table_name='submissions')
+    op.drop_index('ix_submissions_owner_graded', table_name='submissions')
+    op.drop_index('ix_assignments_owner_created', table_name='assignments')
+    op.drop_index('ix_classes_owner_teacher', table_name='classes')
+
+    for table in reversed(OWNED_TABLES):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_owner_teacher_id', type_='foreignkey')
+            batch_op.drop_column('owner_teacher_id')
@@ -0,0 +1,50 @@
+"""content addressed uploads
+
+Adds the upload_blobs reference-count table and a content_hash column on
+submissions and corrections. Files uploaded before this revision keep
+their uuid paths and a NULL content_hash; new uploads are stored under
+UPLOAD_DIR/ab/cd/<sha256> and counted by the mapper events in
+app/models/upload_blob.py.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 20:48:25.846046
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+REFERENCING_TABLES = ('submissions', 'corrections')
+
+
+def upgrade() -> None:
+    op.create_table('upload_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+
+    for table in REFERENCING_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+            batch_op.create_foreign_key(f'fk_{table}_content_hash', 'upload_blobs', ['content_hash'], ['sha256'])
+        op.create_index(f'ix_{table}_content_hash', table, ['content_hash'], unique=False)
+
+
+def downgrade() -> None:
+    for table in reversed(REFERENCING_TABLES):
+        op.drop_index(f'ix_{table}_content_hash', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_content_hash', type_='foreignkey')
+            batch_op.drop_column('content_hash')
+
+    op.drop_table('upload_blobs')
@@ -0,0 +1,138 @@
+"""
+In-process caches
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+class TTLCache:
+    """LRU cache whose entries also expire after a fixed time-to-live
+
+    With maxbytes set, entries are also evicted least recently used first
+    while the total of sizeof(value) exceeds it.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        maxbytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or sys.getsizeof
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._discard(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries when full"""
+        size = self.sizeof(value) if self.maxbytes is not None else 0
+        if self.maxbytes is not None and size > self.maxbytes:
+            return  # Would evict everything else and still not fit
+        with self._lock:
+            if key in self._data:
+                self._discard(key)
+            self._data[key] = (time.monotonic() + self.ttl, value, size)
+            self.bytes += size
+            self._on_set(key)
+            while len(self._data) > self.maxsize or (self.maxbytes is not None and self.bytes > self.maxbytes):
+                evicted_key = next(iter(self._data))
+                self._discard(evicted_key)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove and return a value"""
+        with self._lock:
+            if key not in self._data:
+                return None
+            return self._discard(key)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+            self._on_clear()
+
+    def _discard(self, key: Hashable) -> Any:
+        """Remove an entry and its bookkeeping (called with the lock held)"""
+        _, value, size = self._data.pop(key)
+        self.bytes -= size
+        self._on_remove(key)
+        return value
+
+    def _on_set(self, key: Hashable) -> None:
+        """Hook for subclasses that keep secondary indexes (called with the lock held)"""
+
+    def _on_remove(self, key: Hashable) -> None:
+        """Hook for subclasses that keep secondary indexes (called with the lock held)"""
+
+    def _on_clear(self) -> None:
+        """Hook for subclasses that keep secondary indexes (called with the lock held)"""
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Snapshot of cache metrics"""
+        stats = {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+        if self.maxbytes is not None:
+            stats.update(bytes=self.bytes, maxbytes=self.maxbytes)
+        return stats
+
+class PrincipalCache(TTLCache):
+    """TTL+LRU cache of authenticated users keyed by (user_id, token id)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self._keys_by_user: Dict[int, Set[Hashable]] = {}
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached principal for a user, whatever token it came from"""
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, set()):
+                self._data.pop(key, None)
+
+    def _on_set(self, key: Hashable) -> None:
+        self._keys_by_user.setdefault(key[0], set()).add(key)
+
+    def _on_remove(self, key: Hashable) -> None:
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def _on_clear(self) -> None:
+        self._keys_by_user.clear()
@@ -3,7 +3,7 @@ Application configuration settings
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -14,19 +14,65 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "mysql+pymysql://root:@localhost:3306/education"
+    ASYNC_DATABASE_URL: Optional[str] = None  # Derived from DATABASE_URL when unset
+    SQL_ECHO: bool = False  # Log every statement; for local debugging only
+    SQL_REPEAT_THRESHOLD: int = 5  # A request running one statement shape this often is logged as a possible N+1
+    SQL_STATS_HEADER: bool = False  # Send each request's statement count and time in X-SQL-Stats; not for production
+    
+    # Slow-query log
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 1000
+    SLOW_QUERY_EXPLAIN: bool = False  # EXPLAIN the first slow SELECT of each fingerprint
+    SLOW_QUERY_LOG_FILE: Optional[str] = None  # Rotating JSON-lines log of slow statements
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    ADMIN_API_KEY: Optional[str] = None  # X-Admin-Key for /api/v1/admin; the admin API is off when unset
     
     # Security
     SECRET_KEY: str = "your-super-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Requests beyond this get 429
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # How long other workers may keep honouring a changed or deleted user
+    LEADERBOARD_RESYNC_SECONDS: float = 60  # Rebuild each worker's leaderboard from progress_stats this often; 0 never
     
     # CORS
     ALLOWED_HOSTS: List[str] = ["*"]
     
+    # Pagination
+    DEFAULT_PAGE_SIZE: int = 50
+    MAX_PAGE_SIZE: int = 200
+    
     # File uploads
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_GC_GRACE_SECONDS: int = 3600  # Unreferenced files younger than this are kept
+    
+    # Background jobs
+    JOB_WORKERS: int = 2  # Per process; 0 disables the local workers
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_VISIBILITY_TIMEOUT_SECONDS: float = 300  # A claim not finished by then is handed to another worker
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_RETRY_DELAY_SECONDS: float = 5.0  # Doubled on each further attempt
+    JOB_MAX_WAIT_SECONDS: int = 30  # Longest long-poll on GET /jobs/{id}
+    
+    # Correction/dictation analysis cache
+    ANALYSIS_CACHE_SIZE: int = 10000
+    ANALYSIS_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    ANALYSIS_CACHE_TTL_SECONDS: int = 24 * 3600
+    ANALYSIS_CACHE_PERSIST: bool = False  # Also keep results in analysis_cache_entries across restarts
+    
+    # Compiled quest answer validators, keyed by (quest_id, updated_at)
+    QUEST_VALIDATOR_CACHE_SIZE: int = 5000
+    QUEST_VALIDATOR_CACHE_TTL_SECONDS: int = 24 * 3600
+    QUEST_ATTEMPT_BATCH_MAX: int = 500  # Attempts per POST /quests/attempts/batch
+    
+    # Activity event log
+    ACTIVITY_PARTITION_MONTHS_AHEAD: int = 3  # Monthly partitions kept ready on MySQL
     
     # AI Services (Mock for MVP)
     OPENAI_API_KEY: str = "mock-api-key"
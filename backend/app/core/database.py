@@ -2,23 +2,57 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, Table
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional
 
 from .config import settings
+from .metrics import instrument_engine
+
+# Async drivers used for each sync DATABASE_URL backend
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """Derive the async driver URL from a sync database URL"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=300,
-    echo=settings.DEBUG
+    echo=settings.SQL_ECHO
+)
+
+# Create async database engine used by the API routers
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    pool_recycle=300,
+    echo=settings.SQL_ECHO
 )
+instrument_engine(async_engine.sync_engine)
 
-# Create session factory
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 # Create base class for models
 Base = declarative_base()
@@ -32,3 +66,65 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database dependency for FastAPI
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def upsert_statement(
+    dialect_name: str,
+    table: Table,
+    values: Dict[str, Any],
+    on_conflict: Dict[str, Any],
+    conflict_columns: Optional[List[str]] = None
+):
+    """
+    INSERT that applies on_conflict to the existing row instead, or None if
+    the dialect has no such form.
+
+    conflict_columns names the unique key to match on (default: the primary
+    key). MySQL evaluates on_conflict assignments in order, each seeing the
+    ones before it, so put expressions that read a column ahead of the
+    assignment that changes it.
+    """
+    if dialect_name == "sqlite":
+        index_elements = conflict_columns or [column.name for column in table.primary_key.columns]
+        return sqlite_insert(table).values(values).on_conflict_do_update(index_elements=index_elements, set_=on_conflict)
+    if dialect_name == "mysql":
+        return mysql_insert(table).values(values).on_duplicate_key_update(list(on_conflict.items()))
+    return None
+
+def insert_ignore_statement(dialect_name: str, table: Table, rows: List[Dict[str, Any]]):
+    """Multi-row INSERT skipping rows that collide with a unique key; rowcount is the number inserted"""
+    if dialect_name == "sqlite":
+        return sqlite_insert(table).values(rows).on_conflict_do_nothing()
+    if dialect_name == "mysql":
+        return mysql_insert(table).values(rows).prefix_with("IGNORE")
+    return None
+
+def accumulate_statement(
+    dialect_name: str,
+    table: Table,
+    columns: List[str],
+    source,
+    conflict_columns: List[str],
+    counters: List[str]
+):
+    """
+    INSERT ... SELECT that adds the selected counters to rows already
+    present on conflict_columns, or None if the dialect has no such form.
+    source must select columns in order, and (for SQLite) have a WHERE clause.
+    """
+    if dialect_name == "sqlite":
+        statement = sqlite_insert(table).from_select(columns, source)
+        return statement.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={name: table.c[name] + statement.excluded[name] for name in counters}
+        )
+    if dialect_name == "mysql":
+        statement = mysql_insert(table).from_select(columns, source)
+        return statement.on_duplicate_key_update({name: table.c[name] + statement.inserted[name] for name in counters})
+    return None
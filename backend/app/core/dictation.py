@@ -0,0 +1,210 @@
+"""
+Dictation checking by word-level alignment against a reference text
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import List, NamedTuple, Optional
+
+# Words, keeping Arabic diacritics and French elisions/hyphenations (l'école, peut-être) together
+_MARKS = r"\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED"  # Arabic diacritics and Quranic marks
+_WORD = re.compile(rf"[\w{_MARKS}]+(?:['’\-][\w{_MARKS}]+)*")
+_ARABIC_DIACRITICS = re.compile(rf"[{_MARKS}]")
+_ARABIC_LETTER = re.compile(r"[\u0620-\u064A]")
+_TATWEEL = "ـ"
+_ARABIC_LETTER_VARIANTS = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",  # Hamza and madda on alef
+    "ى": "ي",  # Alef maqsura
+    "ة": "ه",  # Taa marbuta
+    "ؤ": "و", "ئ": "ي",
+})
+
+# Alignment costs: an exact match is free, a word that differs only in case,
+# accents or letter variants is cheaper than a wrong word, and a wrong word is
+# cheaper than deleting and inserting
+EXACT, NEAR, SUBSTITUTE, GAP = 0, 1, 3, 2
+
+# Extra band width on either side of the diagonal beyond the length difference
+BAND_MARGIN = 16
+
+# Error types
+CASE = "case"
+ACCENT = "accent"
+DIACRITICS = "diacritics"
+LETTER_VARIANT = "letter_variant"
+SPELLING = "spelling"
+WRONG_WORD = "wrong_word"
+MISSING_WORD = "missing_word"
+EXTRA_WORD = "extra_word"
+
+# Errors that cost half a word when scoring
+MINOR_ERRORS = {CASE, ACCENT, DIACRITICS, LETTER_VARIANT}
+
+class Token(NamedTuple):
+    text: str  # As written, NFC, without tatweel
+    key: str  # Comparison form with case, accents, diacritics and letter variants folded
+
+class DictationError(NamedTuple):
+    type: str
+    word: str  # Student's word ("" when missing)
+    correction: str  # Reference word ("" when extra)
+    position: int  # Index of the word in the student's text (for missing words, where it belongs)
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+class DictationReport(NamedTuple):
+    errors: List[DictationError]
+    score: float
+    reference_words: int
+    cells: int  # Alignment cells computed, for benchmarking
+
+def _strip_accents(text: str) -> str:
+    return "".join(ch for ch in unicodedata.normalize("NFD", text) if not unicodedata.combining(ch))
+
+def _fold(text: str) -> str:
+    text = _ARABIC_DIACRITICS.sub("", text).translate(_ARABIC_LETTER_VARIANTS)
+    return _strip_accents(text.casefold()).replace("’", "'")
+
+def tokenize(text: str) -> List[Token]:
+    text = unicodedata.normalize("NFC", text).replace(_TATWEEL, "")
+    return [Token(match.group(), _fold(match.group())) for match in _WORD.finditer(text)]
+
+def classify(expected: str, written: str) -> str:
+    """Name the difference between a reference word and the word written in its place"""
+    if _ARABIC_LETTER.search(expected):
+        expected_bare = _ARABIC_DIACRITICS.sub("", expected)
+        written_bare = _ARABIC_DIACRITICS.sub("", written)
+        if expected_bare == written_bare:
+            return DIACRITICS
+        if expected_bare.translate(_ARABIC_LETTER_VARIANTS) == written_bare.translate(_ARABIC_LETTER_VARIANTS):
+            return LETTER_VARIANT
+    else:
+        expected, written = expected.replace("’", "'"), written.replace("’", "'")
+        if expected.casefold() == written.casefold():
+            return CASE
+        if _strip_accents(expected).casefold() == _strip_accents(written).casefold():
+            return ACCENT
+    if SequenceMatcher(None, _fold(expected), _fold(written)).ratio() >= 0.5:
+        return SPELLING
+    return WRONG_WORD
+
+def _banded_alignment(reference: List[Token], student: List[Token]):
+    """
+    Minimum-cost alignment restricted to a diagonal band.
+
+    Only cells with -below <= j - i <= above are computed, where the band
+    covers the length difference plus BAND_MARGIN, so the cost is
+    O(len * band) rather than O(len^2). Returns the operations in order as
+    (op, i, j) with op "match", "missing" or "extra", and the cell count.
+    """
+    n, m = len(reference), len(student)
+    below = max(0, n - m) + BAND_MARGIN  # Rows the path may run ahead of columns
+    above = max(0, m - n) + BAND_MARGIN
+    width = below + above + 1
+    infinity = float("inf")
+
+    # Row i holds columns j = i - below .. i + above at offsets 0 .. width - 1
+    previous = [infinity] * width
+    for offset in range(below, min(width, below + m + 1)):
+        previous[offset] = (offset - below) * GAP
+    moves = [bytearray(width)]
+    for offset in range(below + 1, width):
+        moves[0][offset] = 2
+    cells = width
+
+    reference_keys = [token.key for token in reference]
+    reference_texts = [token.text for token in reference]
+    student_keys = [token.key for token in student]
+    student_texts = [token.text for token in student]
+
+    for i in range(1, n + 1):
+        current = [infinity] * width
+        row_moves = bytearray(width)
+        ref_key = reference_keys[i - 1]
+        ref_text = reference_texts[i - 1]
+        low = max(0, below - i)  # Offset of column 0
+        high = min(width - 1, below - i + m)  # Offset of column m
+        for offset in range(low, high + 1):
+            j = i - below + offset
+            # Deletion: reference word i is missing (same column, previous row sits one offset right)
+            best = previous[offset + 1] + GAP if offset + 1 < width else infinity
+            move = 1
+            if j > 0:
+                if student_texts[j - 1] == ref_text:
+                    diagonal = previous[offset]
+                elif student_keys[j - 1] == ref_key:
+                    diagonal = previous[offset] + NEAR
+                else:
+                    diagonal = previous[offset] + SUBSTITUTE
+                if diagonal <= best:
+                    best, move = diagonal, 0
+                if offset > 0:
+                    inserted = current[offset - 1] + GAP
+                    if inserted < best:
+                        best, move = inserted, 2
+            current[offset] = best
+            row_moves[offset] = move
+        cells += high - low + 1
+        moves.append(row_moves)
+        previous = current
+
+    operations = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        offset = j - i + below
+        move = moves[i][offset]
+        if move == 0:
+            operations.append(("match", i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif move == 1:
+            operations.append(("missing", i - 1, j))
+            i -= 1
+        else:
+            operations.append(("extra", i, j - 1))
+            j -= 1
+    operations.reverse()
+    return operations, cells
+
+def check_dictation(reference_text: str, student_text: str) -> DictationReport:
+    """Align a student's dictation with the reference and list its errors"""
+    reference = tokenize(reference_text)
+    student = tokenize(student_text)
+
+    # Dictations are mostly right; align only the stretch between the shared prefix and suffix
+    start = 0
+    while start < min(len(reference), len(student)) and reference[start].text == student[start].text:
+        start += 1
+    end = 0
+    while (end < min(len(reference), len(student)) - start
+           and reference[-1 - end].text == student[-1 - end].text):
+        end += 1
+
+    operations, cells = _banded_alignment(
+        reference[start:len(reference) - end], student[start:len(student) - end]
+    )
+
+    errors: List[DictationError] = []
+    for op, i, j in operations:
+        i, j = i + start, j + start
+        if op == "match":
+            if reference[i].text != student[j].text:
+                errors.append(DictationError(
+                    classify(reference[i].text, student[j].text), student[j].text, reference[i].text, j
+                ))
+        elif op == "missing":
+            errors.append(DictationError(MISSING_WORD, "", reference[i].text, j))
+        else:
+            errors.append(DictationError(EXTRA_WORD, student[j].text, "", j))
+
+    penalty = sum(0.5 if error.type in MINOR_ERRORS else 1 for error in errors)
+    score = max(0.0, round(100 * (1 - penalty / max(len(reference), 1)), 1))
+    return DictationReport(errors, score, len(reference), cells)
+
+def reference_text(content_json: Optional[dict]) -> Optional[str]:
+    """The text a dictation quest reads out, stored as content_json["text"]"""
+    if not content_json:
+        return None
+    text = content_json.get("text")
+    return text if isinstance(text, str) and text.strip() else None
@@ -0,0 +1,92 @@
+"""
+Bounded worker pool for password hashing
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from .config import settings
+
+class PasswordHashingPool:
+    """Runs bcrypt work off the event loop and sheds load when the queue is full"""
+
+    def __init__(self, max_workers: int, max_pending: int, executor_type: str = "thread"):
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown password hashing executor: {executor_type}")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor_type = executor_type
+        self._executor: Optional[Executor] = None
+
+        # Metrics
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        """Create the executor lazily so importing the app does not spawn workers"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a hashing function in the pool, or reject with 429 when saturated"""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.pending -= 1
+            self.completed += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+
+    def stats(self) -> dict:
+        """Snapshot of pool metrics"""
+        return {
+            "workers": self.max_workers,
+            "executor": self.executor_type,
+            "queue_length": self.pending,
+            "queue_limit": self.max_pending,
+            "peak_queue_length": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(self.total_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_latency_ms": round(self.max_seconds * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+password_hasher = PasswordHashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+)
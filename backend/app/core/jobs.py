@@ -0,0 +1,301 @@
+"""
+Persistent background jobs with a local worker pool
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import weakref
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .config import settings
+from .database import AsyncSessionLocal
+from ..models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, Job], Awaitable[Optional[Dict[str, Any]]]]
+
+AFTER_COMMIT_KEY = "job_after_commit"
+
+class JobFailed(Exception):
+    """Raised by a handler to fail a job without retrying it"""
+
+class JobQueue:
+    """
+    Runs jobs stored in the jobs table on in-process asyncio workers.
+
+    Jobs are claimed with a conditional UPDATE, so any number of processes can
+    share the table. A claim expires after the visibility timeout, after which
+    another worker may take the job over; failures are retried with
+    exponential backoff up to the job's max_attempts. A handler's writes are
+    committed in the same transaction that marks its job succeeded.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        workers: int,
+        visibility_timeout: float,
+        poll_interval: float,
+        retry_delay: float
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None  # Created on start, inside the event loop
+        self._waiters: "weakref.WeakValueDictionary[int, asyncio.Event]" = weakref.WeakValueDictionary()
+
+        # Metrics
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.lost_leases = 0
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Register the coroutine that runs jobs of a kind"""
+        def register(func: JobHandler) -> JobHandler:
+            self._handlers[kind] = func
+            return func
+        return register
+
+    # Producing
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        kind: str,
+        user_id: int,
+        payload: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None
+    ) -> Job:
+        """Add a job in the caller's transaction; call notify() once it commits"""
+        job = Job(
+            kind=kind,
+            status=JobStatus.QUEUED,
+            payload=payload,
+            user_id=user_id,
+            idempotency_key=idempotency_key,
+            max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+            run_after=datetime.utcnow()
+        )
+        db.add(job)
+        await db.flush()
+        return job
+
+    def notify(self) -> None:
+        """Wake idle local workers so a new job starts without waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def wait(self, job_id: int, timeout: float) -> None:
+        """Block until a local worker finishes the job or the timeout passes"""
+        event = self._waiters.get(job_id)
+        if event is None:
+            event = self._waiters[job_id] = asyncio.Event()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    @staticmethod
+    def after_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+        """Run callback once the handler's transaction has committed"""
+        db.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+    # Consuming
+
+    def _claimable(self, now: datetime):
+        return or_(
+            and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+            and_(Job.status == JobStatus.RUNNING, Job.locked_until < now),
+        )
+
+    async def claim(self, db: AsyncSession, worker_id: str) -> Optional[Job]:
+        """Take the next due job, or one whose previous claim expired"""
+        while True:
+            now = datetime.utcnow()
+            job_id = await db.scalar(
+                select(Job.id)
+                .where(self._claimable(now), Job.kind.in_(list(self._handlers)))
+                .order_by(Job.run_after, Job.id)
+                .limit(1)
+            )
+            if job_id is None:
+                return None
+
+            claimed = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, self._claimable(now))
+                .values(
+                    status=JobStatus.RUNNING,
+                    locked_by=worker_id,
+                    locked_until=now + timedelta(seconds=self.visibility_timeout),
+                    attempts=Job.attempts + 1
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                continue  # Another worker got there first
+
+            job = await db.scalar(select(Job).where(Job.id == job_id).execution_options(populate_existing=True))
+            if job.attempts > job.max_attempts:
+                # Every attempt timed out; do not start another
+                await self._finish_failed(db, job.id, worker_id, job.error or "Visibility timeout exceeded")
+                continue
+            return job
+
+    async def run_one(self, worker_id: Optional[str] = None) -> bool:
+        """Claim and run a single job; returns False when nothing was due"""
+        worker_id = worker_id or f"{self.worker_prefix}:0"
+        async with self.session_factory() as db:
+            job = await self.claim(db, worker_id)
+            if job is None:
+                return False
+            # Rolling back expires the job, so keep what the failure path needs
+            job_id, attempts, max_attempts = job.id, job.attempts, job.max_attempts
+
+            try:
+                result = await self._handlers[job.kind](db, job)
+            except Exception as error:
+                await db.rollback()
+                db.info.pop(AFTER_COMMIT_KEY, None)
+                message = str(error) or type(error).__name__
+                if isinstance(error, JobFailed) or attempts >= max_attempts:
+                    await self._finish_failed(db, job_id, worker_id, message)
+                else:
+                    await self._retry(db, job_id, attempts, worker_id, message)
+            else:
+                completed = await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.locked_by == worker_id)
+                    .values(
+                        status=JobStatus.SUCCEEDED,
+                        result=result,
+                        error=None,
+                        locked_until=None,
+                        finished_at=datetime.utcnow()
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if completed.rowcount == 1:
+                    await db.commit()
+                    self.succeeded += 1
+                    for callback in db.info.pop(AFTER_COMMIT_KEY, []):
+                        callback()
+                else:
+                    # The claim expired and another worker took the job over; discard this run
+                    await db.rollback()
+                    db.info.pop(AFTER_COMMIT_KEY, None)
+                    self.lost_leases += 1
+
+        event = self._waiters.get(job_id)
+        if event is not None:
+            event.set()
+        return True
+
+    async def run_until_idle(self) -> int:
+        """Run due jobs until none are left; returns how many ran"""
+        count = 0
+        while await self.run_one():
+            count += 1
+        return count
+
+    async def _retry(self, db: AsyncSession, job_id: int, attempts: int, worker_id: str, error: str) -> None:
+        delay = self.retry_delay * 2 ** (attempts - 1)
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id)
+            .values(
+                status=JobStatus.QUEUED,
+                error=error,
+                run_after=datetime.utcnow() + timedelta(seconds=delay),
+                locked_by=None,
+                locked_until=None
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        self.retried += 1
+
+    async def _finish_failed(self, db: AsyncSession, job_id: int, worker_id: str, error: str) -> None:
+        await db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id)
+            .values(
+                status=JobStatus.FAILED,
+                error=error,
+                locked_by=None,
+                locked_until=None,
+                finished_at=datetime.utcnow()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        self.failed += 1
+
+    async def _work(self, worker_id: str) -> None:
+        while True:
+            try:
+                processed = await self.run_one(worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job worker %s failed", worker_id)
+                processed = False
+
+            if not processed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    # Lifecycle
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop"""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self.worker_prefix}:{index}"))
+            for index in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks; jobs they held are picked up again after the visibility timeout"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        """Snapshot of queue metrics"""
+        return {
+            "workers": len(self._tasks),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "lost_leases": self.lost_leases,
+        }
+
+job_queue = JobQueue(
+    AsyncSessionLocal,
+    workers=settings.JOB_WORKERS,
+    visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT_SECONDS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    retry_delay=settings.JOB_RETRY_DELAY_SECONDS
+)
@@ -0,0 +1,207 @@
+"""
+Request and database metrics in the Prometheus text format
+
+Everything is recorded with plain integer and float updates and no locks:
+requests, their statements and the async engine's pool checkouts all run
+on the event loop thread, so the cost per request is a dict lookup and a
+few bisects. Statements are counted by app/core/query_tracking.py.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from .config import settings
+from .query_tracking import SQL_STATS_HEADER, track_queries, log_queries
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+UNMATCHED = "unmatched"  # Requests no route matched, kept as one series
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket and made cumulative when rendered"""
+
+    __slots__ = ("bounds", "counts", "total")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last one is +Inf
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def render(self, name: str, label_names: Sequence[str], label_values: Sequence[Any]) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(list(self.bounds) + ["+Inf"], self.counts):
+            cumulative += count
+            labels = _labels(list(label_names) + ["le"], list(label_values) + [bound])
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _labels(label_names, label_values)
+        lines.append(f"{name}_sum{labels} {_number(self.total)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+class Metrics:
+    """Process-wide request and database pool metrics"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, int], Histogram] = {}
+        self.statements: Dict[Tuple[str, str], Histogram] = {}
+        self.pool_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.pool_checked_out = 0
+        self.engine: Optional[Engine] = None  # Whose pool is reported
+        self._templates: Dict[Callable, str] = {}
+
+    def route_template(self, scope: dict) -> str:
+        """Path template of the route that handled the request, e.g. /api/v1/quests/{quest_id}"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED
+        template = self._templates.get(endpoint)
+        if template is None:
+            # Routes are all registered at import time, so this runs once per endpoint
+            for route in getattr(scope.get("app"), "routes", []):
+                if getattr(route, "endpoint", None) is not None and hasattr(route, "path_format"):
+                    self._templates.setdefault(route.endpoint, route.path_format)
+            template = self._templates.setdefault(endpoint, UNMATCHED)
+        return template
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, statements: int) -> None:
+        histogram = self.requests.get((method, route, status))
+        if histogram is None:
+            histogram = self.requests[(method, route, status)] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+        histogram = self.statements.get((method, route))
+        if histogram is None:
+            histogram = self.statements[(method, route)] = Histogram(STATEMENT_BUCKETS)
+        histogram.observe(statements)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_request_duration_seconds Request latency by route template and status",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for key in sorted(self.requests):
+            lines.extend(self.requests[key].render("http_request_duration_seconds", ("method", "route", "status"), key))
+        lines += [
+            "# HELP http_request_db_statements Database statements executed per request",
+            "# TYPE http_request_db_statements histogram",
+        ]
+        for key in sorted(self.statements):
+            lines.extend(self.statements[key].render("http_request_db_statements", ("method", "route"), key))
+        lines += [
+            "# HELP db_pool_checkout_wait_seconds Time spent getting a connection from the pool",
+            "# TYPE db_pool_checkout_wait_seconds histogram",
+            *self.pool_wait.render("db_pool_checkout_wait_seconds", (), ()),
+            "# HELP db_pool_checked_out Connections currently checked out of the pool",
+            "# TYPE db_pool_checked_out gauge",
+            f"db_pool_checked_out {self.pool_checked_out}",
+        ]
+        pool = self.engine.pool if self.engine is not None else None
+        size = getattr(pool, "size", None)
+        if callable(size):
+            capacity = size() + max(getattr(pool, "_max_overflow", 0), 0)
+            lines += [
+                "# HELP db_pool_size Connections the pool keeps open",
+                "# TYPE db_pool_size gauge",
+                f"db_pool_size {size()}",
+                "# HELP db_pool_utilization Checked out connections over pool size plus overflow",
+                "# TYPE db_pool_utilization gauge",
+                f"db_pool_utilization {_number(self.pool_checked_out / capacity if capacity else 0.0)}",
+            ]
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+_timed_pool_classes: Dict[type, type] = {}
+
+def _timed_pool_class(pool_class: type) -> type:
+    """Subclass of pool_class recording how long each checkout waits for a connection"""
+    timed = _timed_pool_classes.get(pool_class)
+    if timed is None:
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super(timed, self)._do_get()
+            finally:
+                metrics.pool_wait.observe(time.perf_counter() - start)
+
+        timed = _timed_pool_classes[pool_class] = type(f"Timed{pool_class.__name__}", (pool_class,), {"_do_get": _do_get})
+    return timed
+
+def instrument_engine(engine: Engine) -> None:
+    """Time and track pool checkouts for engine"""
+    # Pool.recreate() builds the same class, so the timing survives engine.dispose()
+    engine.pool.__class__ = _timed_pool_class(type(engine.pool))
+    metrics.engine = engine
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.pool_checked_out += 1
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        metrics.pool_checked_out -= 1
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request by route template and status
+    and tracking its SQL statements, which are logged and, with
+    SQL_STATS_HEADER set, summarized in the X-SQL-Stats response header
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # Unless a response starts
+
+        with track_queries() as queries:
+            async def send_with_status(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    if settings.SQL_STATS_HEADER:
+                        MutableHeaders(scope=message).append(SQL_STATS_HEADER, queries.header())
+                await send(message)
+
+            metrics.in_flight += 1
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - start
+                metrics.in_flight -= 1
+                route = metrics.route_template(scope)
+                metrics.observe_request(scope["method"], route, status, elapsed, queries.count)
+                log_queries(scope["method"], route, status, queries)
@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+Lists are ordered newest first on (timestamp, id) and each page seeks past
+the last row of the previous one, so a page costs the same whatever its
+depth. The opaque cursor for the next page is returned in the X-Next-Cursor
+response header; bodies stay plain arrays.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import and_, or_, select, func
+from sqlalchemy.sql import Select
+
+from .config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    """Encode the (timestamp, id) position of a row as an opaque token"""
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor token, rejecting anything we did not issue"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (datetime.fromisoformat(sort_value) if sort_value else None, int(row_id))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+class PageParams:
+    """Query parameters shared by paginated list endpoints"""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+        limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE)
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+def keyset_page(query: Select, sort_column, id_column, page: PageParams) -> Select:
+    """Order a query newest first and seek past the cursor row"""
+    if page.cursor:
+        sort_value, row_id = decode_cursor(page.cursor)
+        # Compare against the stored value of the cursor row so drivers that
+        # keep timestamps as text (SQLite) see identical representations;
+        # fall back to the encoded value if that row has since been deleted.
+        anchor = select(sort_column).where(id_column == row_id).correlate(None).scalar_subquery()
+        boundary = func.coalesce(anchor, sort_value)
+        query = query.where(or_(
+            sort_column < boundary,
+            and_(sort_column == boundary, id_column < row_id)
+        ))
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(page.limit + 1)
+
+def finish_page(
+    items: List[Any],
+    page: PageParams,
+    response: Response,
+    key: Callable[[Any], Tuple[Optional[datetime], int]]
+) -> List[Any]:
+    """Drop the look-ahead row and publish the cursor for the next page"""
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
+    return items
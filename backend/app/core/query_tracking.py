@@ -0,0 +1,148 @@
+"""
+Per-request SQL statement tracking
+
+Listeners on every Engine add each statement and its cursor time to the
+QueryStats of the current request (see track_queries) and to any active
+process-wide collector (see collect_queries, used by assert_max_queries
+in tests). Statements are counted by their SQL text and only
+fingerprinted, with literals and IN lists folded, when a request ran
+enough of them to possibly be an N+1.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SQL_STATS_HEADER = "X-SQL-Stats"
+
+_PARAMETER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """SQL text with literals and parameter lists folded, so loop iterations compare equal"""
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAMETER_LIST.sub("(?)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+class QueryStats:
+    """Statements executed within one request or collection block"""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()  # SQL text -> executions
+
+    def add(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(fingerprint, executions) run at least threshold times, most repeated first"""
+        threshold = settings.SQL_REPEAT_THRESHOLD if threshold is None else threshold
+        if self.count < threshold:
+            return []
+        fingerprints: Counter = Counter()
+        for statement, executions in self.statements.items():
+            fingerprints[fingerprint(statement)] += executions
+        return [(sql, executions) for sql, executions in fingerprints.most_common() if executions >= threshold]
+
+    def summary(self) -> Dict[str, Any]:
+        """Structured form for logs"""
+        return {
+            "statements": self.count,
+            "db_ms": round(self.seconds * 1000, 2),
+            "repeated": [{"sql": sql, "count": executions} for sql, executions in self.repeated()],
+        }
+
+    def header(self) -> str:
+        repeated = self.repeated()
+        return (
+            f"statements={self.count}, db_ms={self.seconds * 1000:.2f}, "
+            f"max_repeat={repeated[0][1] if repeated else 0}"
+        )
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_collectors: List[QueryStats] = []
+
+def current_queries() -> Optional[QueryStats]:
+    """Stats of the request being handled, if any"""
+    return _current.get()
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Record the statements run in this context (and tasks it starts) into a new QueryStats"""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def collect_queries() -> Iterator[QueryStats]:
+    """Record every statement the process runs while the block is active, whichever thread runs it"""
+    stats = QueryStats()
+    _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors.remove(stats)
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail when the block runs more than limit statements, listing what ran"""
+    with collect_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        ran = "\n".join(
+            f"  {executions}x {sql}"
+            for sql, executions in stats.repeated(threshold=1)
+        )
+        raise AssertionError(f"{stats.count} statements executed, expected at most {limit}:\n{ran}")
+
+def log_queries(method: str, route: str, status: int, stats: QueryStats) -> None:
+    """Warn about possible N+1 patterns; other requests' totals are logged at debug level"""
+    repeated = stats.repeated()
+    if repeated:
+        sql, executions = repeated[0]
+        logger.warning(
+            "Possible N+1 in %s %s: %d similar statements: %s", method, route, executions, sql,
+            extra={"method": method, "route": route, "status": status, "sql": stats.summary()}
+        )
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "%s %s ran %d statements in %.2f ms", method, route, stats.count, stats.seconds * 1000,
+            extra={"method": method, "route": route, "status": status, "sql": stats.summary()}
+        )
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None and not _collectors:
+        return
+    elapsed = time.perf_counter() - conn.info.get("query_started", time.perf_counter())
+    if stats is not None:
+        stats.add(statement, elapsed)
+    for collector in _collectors:
+        collector.add(statement, elapsed)
@@ -0,0 +1,243 @@
+"""
+Quest answer validators
+
+Each quest type registers a compiler that turns the quest's content_json
+into a CompiledQuest once: the answer key is normalized into sets, tuples
+and tolerance rules up front, and checking an attempt is a pure function
+of the student's answer_data returning a score between 0 and 1. Compiled
+quests are cached by (quest_id, updated_at), so editing a quest retires
+its old validator. Points are all or nothing unless the quest opts in to
+partial credit with content_json["partial_credit"]. Types whose check is too slow for the event loop
+(dictation's word alignment) are scored in the threadpool by score_answers.
+"""
+
+import math
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from .cache import TTLCache
+from .config import settings
+from .dictation import check_dictation, reference_text
+
+Checker = Callable[[Dict[str, Any]], float]
+
+class CompiledQuest(NamedTuple):
+    check: Checker  # answer_data -> score in [0, 1]
+    correct_answer: Any  # Shown to the student after the attempt
+    partial_credit: bool  # Points in proportion to the score; opt-in via content_json["partial_credit"]
+    threaded: bool = False  # Checked in the threadpool rather than on the event loop
+
+_compilers: Dict[str, Callable[[Dict[str, Any]], Tuple[Checker, Any]]] = {}
+_threaded = set()
+
+def validator(quest_type: str, threaded: bool = False):
+    """Register the compiler for a quest type, flagging types whose check blocks for long"""
+    def register(compiler):
+        _compilers[quest_type] = compiler
+        if threaded:
+            _threaded.add(quest_type)
+        return compiler
+    return register
+
+def compile_quest(quest_type: str, content_json: Optional[Dict[str, Any]]) -> CompiledQuest:
+    """Build the checker for a quest's answer key"""
+    content = content_json or {}
+    quest_type = getattr(quest_type, "value", quest_type)
+    compiler = _compilers.get(quest_type)
+    if compiler is None:
+        check, correct_answer = _never, None
+    else:
+        check, correct_answer = compiler(content)
+    return CompiledQuest(check, correct_answer, bool(content.get("partial_credit", False)), quest_type in _threaded)
+
+def _never(answer_data: Dict[str, Any]) -> float:
+    return 0.0
+
+def _normalize(value: Any) -> str:
+    """Compare answers as trimmed NFC strings with runs of whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFC", str(value)).split())
+
+def _strip_accents(text: str) -> str:
+    return "".join(ch for ch in unicodedata.normalize("NFD", text) if not unicodedata.combining(ch))
+
+def _fraction(hits: int, total: int) -> float:
+    return hits / total if total else 0.0
+
+# Fill in the blank: content_json["correct_answers"] is a list, or a dict keyed
+# by blank id; each blank takes one answer or a list of accepted answers.
+# Optional tolerance rules: case_sensitive (default true), ignore_accents,
+# max_typos (edit operations allowed) and tolerance (for numeric answers).
+@validator("fill_in_blank")
+def _compile_fill_in_blank(content: Dict[str, Any]):
+    correct_answers = content.get("correct_answers", [])
+    case_sensitive = bool(content.get("case_sensitive", True))
+    ignore_accents = bool(content.get("ignore_accents", False))
+    max_typos = int(content.get("max_typos", 0))
+    tolerance = content.get("tolerance")
+
+    def fold(value: Any) -> str:
+        text = _normalize(value)
+        if not case_sensitive:
+            text = text.casefold()
+        if ignore_accents:
+            text = _strip_accents(text)
+        return text
+
+    def blank(accepted: Any):
+        options = accepted if isinstance(accepted, list) else [accepted]
+        folded = frozenset(fold(option) for option in options)
+        numbers = []
+        if tolerance is not None:
+            for option in options:
+                try:
+                    numbers.append(float(option))
+                except (TypeError, ValueError):
+                    pass
+        return folded, tuple(numbers)
+
+    if isinstance(correct_answers, dict):
+        blanks = [(str(key), blank(value)) for key, value in correct_answers.items()]
+    else:
+        blanks = [(index, blank(value)) for index, value in enumerate(correct_answers)]
+
+    def matches(answer: Any, folded, numbers) -> bool:
+        if answer is None:
+            return False
+        text = fold(answer)
+        if text in folded:
+            return True
+        if numbers:
+            try:
+                value = float(answer)
+            except (TypeError, ValueError):
+                value = math.nan
+            if any(abs(value - number) <= tolerance for number in numbers):
+                return True
+        if max_typos:
+            return any(_within_typos(text, option, max_typos) for option in folded)
+        return False
+
+    def check(answer_data: Dict[str, Any]) -> float:
+        answers = answer_data.get("answers")
+        if isinstance(answers, dict):
+            lookup = {str(key): value for key, value in answers.items()}.get
+        elif isinstance(answers, list):
+            lookup = lambda index: answers[index] if isinstance(index, int) and index < len(answers) else None
+        else:
+            return 0.0
+        return _fraction(sum(matches(lookup(key), *rule) for key, rule in blanks), len(blanks))
+
+    return check, correct_answers
+
+def _within_typos(written: str, expected: str, limit: int) -> bool:
+    """Levenshtein distance <= limit, computed only while it can still fit"""
+    if abs(len(written) - len(expected)) > limit:
+        return False
+    previous = list(range(len(expected) + 1))
+    for i, char in enumerate(written, 1):
+        current = [i]
+        for j, other in enumerate(expected, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+# Multiple choice: content_json["correct_answer"] is the option to select, or
+# a list when several options are right (credit for right picks minus wrong ones)
+@validator("multiple_choice")
+def _compile_multiple_choice(content: Dict[str, Any]):
+    correct_answer = content.get("correct_answer")
+    if isinstance(correct_answer, list):
+        correct = frozenset(_normalize(option) for option in correct_answer)
+
+        def check(answer_data: Dict[str, Any]) -> float:
+            selected = answer_data.get("selected_option")
+            picks = {_normalize(option) for option in (selected if isinstance(selected, list) else [selected])}
+            return max(0.0, _fraction(len(picks & correct) - len(picks - correct), len(correct)))
+    else:
+        expected = _normalize(correct_answer) if correct_answer is not None else None
+
+        def check(answer_data: Dict[str, Any]) -> float:
+            selected = answer_data.get("selected_option")
+            return 1.0 if selected is not None and _normalize(selected) == expected else 0.0
+
+    return check, correct_answer
+
+# Reorder: content_json["correct_order"] lists the items in order; credit for
+# the longest run of items kept in the right relative order
+@validator("reorder")
+def _compile_reorder(content: Dict[str, Any]):
+    correct_order = content.get("correct_order", [])
+    expected = tuple(_normalize(item) for item in correct_order)
+
+    def check(answer_data: Dict[str, Any]) -> float:
+        order = answer_data.get("order")
+        if not isinstance(order, list):
+            return 0.0
+        given = tuple(_normalize(item) for item in order)
+        if given == expected:
+            return 1.0
+        in_order = sum(block.size for block in SequenceMatcher(None, expected, given, autojunk=False).get_matching_blocks())
+        return _fraction(in_order, max(len(expected), len(given)))
+
+    return check, correct_order
+
+# Matching: content_json["pairs"] maps each left item to its right item;
+# credit per correct pair
+@validator("matching")
+def _compile_matching(content: Dict[str, Any]):
+    pairs = content.get("pairs")
+    pairs = pairs if isinstance(pairs, dict) else {}
+    correct = frozenset((_normalize(left), _normalize(right)) for left, right in pairs.items())
+
+    def check(answer_data: Dict[str, Any]) -> float:
+        matches = answer_data.get("matches")
+        if not isinstance(matches, dict):
+            return 0.0
+        given = {(_normalize(left), _normalize(right)) for left, right in matches.items()}
+        return _fraction(len(given & correct), len(correct))
+
+    return check, pairs
+
+# Dictation: the dictation engine's score against content_json["text"]
+@validator("dictation", threaded=True)
+def _compile_dictation(content: Dict[str, Any]):
+    text = reference_text(content)
+
+    def check(answer_data: Dict[str, Any]) -> float:
+        written = answer_data.get("text")
+        if text is None or not isinstance(written, str):
+            return 0.0
+        return check_dictation(text, written).score / 100
+
+    return check, text
+
+compiled_quests = TTLCache(maxsize=settings.QUEST_VALIDATOR_CACHE_SIZE, ttl=settings.QUEST_VALIDATOR_CACHE_TTL_SECONDS)
+
+def compiled_quest(quest) -> CompiledQuest:
+    """The cached validator for a Quest row, compiled on first use of this version"""
+    key: Hashable = (quest.id, quest.updated_at)
+    compiled = compiled_quests.get(key)
+    if compiled is None:
+        compiled = compile_quest(quest.quest_type, quest.content_json)
+        compiled_quests.set(key, compiled)
+    return compiled
+
+async def score_answers(answers: List[Tuple[CompiledQuest, Dict[str, Any]]]) -> List[float]:
+    """Scores for (compiled quest, answer_data) pairs, all checked in one threadpool call if any is threaded"""
+    def check_all() -> List[float]:
+        return [compiled.check(answer_data) for compiled, answer_data in answers]
+
+    if any(compiled.threaded for compiled, _ in answers):
+        return await run_in_threadpool(check_all)
+    return check_all()
+
+def points_for(compiled: CompiledQuest, score: float, points_reward: int) -> int:
+    """Points earned for a score: proportional with partial credit, otherwise all or nothing"""
+    if score >= 1:
+        return points_reward
+    return int(round(points_reward * score)) if compiled.partial_credit else 0
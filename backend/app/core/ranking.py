@@ -0,0 +1,145 @@
+"""
+Order-statistic containers for rankings
+"""
+
+import random
+from typing import Any, Iterator, List, Optional
+
+class _Node:
+    __slots__ = ("key", "forward", "span")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.forward: List[Optional["_Node"]] = [None] * level
+        self.span: List[int] = [0] * level  # Ranks skipped by each forward link
+
+class IndexedSkipList:
+    """Sorted set of unique keys with O(log n) insert, remove, rank and index lookup"""
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self, seed: Optional[int] = None):
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < self.P:
+            level += 1
+        return level
+
+    def _find_predecessors(self, key: Any):
+        """Last node before key on every level, with its rank"""
+        update: List[_Node] = [self._head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            while node.forward[i] is not None and node.forward[i].key < key:
+                rank[i] += node.span[i]
+                node = node.forward[i]
+            update[i] = node
+        return update, rank
+
+    def insert(self, key: Any) -> bool:
+        """Add a key; returns False if it is already present"""
+        update, rank = self._find_predecessors(key)
+        successor = update[0].forward[0]
+        if successor is not None and successor.key == key:
+            return False
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.span[i] = self._size
+            self._level = level
+
+        node = _Node(key, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+            node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+
+        self._size += 1
+        return True
+
+    def remove(self, key: Any) -> bool:
+        """Remove a key; returns False if it was not present"""
+        update, _ = self._find_predecessors(key)
+        node = update[0].forward[0]
+        if node is None or node.key != key:
+            return False
+
+        for i in range(self._level):
+            if update[i].forward[i] is node:
+                update[i].span[i] += node.span[i] - 1
+                update[i].forward[i] = node.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+
+        self._size -= 1
+        return True
+
+    def rank(self, key: Any) -> Optional[int]:
+        """1-based position of a key, or None if absent"""
+        traversed = 0
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and node.forward[i].key <= key:
+                traversed += node.span[i]
+                node = node.forward[i]
+            if node is not self._head and node.key == key:
+                return traversed
+        return None
+
+    def _node_at(self, rank: int) -> Optional[_Node]:
+        if rank < 1 or rank > self._size:
+            return None
+        traversed = 0
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and traversed + node.span[i] <= rank:
+                traversed += node.span[i]
+                node = node.forward[i]
+            if traversed == rank:
+                return node
+        return None
+
+    def at(self, rank: int) -> Any:
+        """Key at a 1-based position"""
+        node = self._node_at(rank)
+        if node is None:
+            raise IndexError("rank out of range")
+        return node.key
+
+    def iter_from(self, rank: int = 1) -> Iterator[Any]:
+        """Keys in order starting at a 1-based position"""
+        node = self._node_at(rank)
+        while node is not None:
+            yield node.key
+            node = node.forward[0]
+
+    def range(self, start: int, count: int) -> List[Any]:
+        """Up to count keys starting at a 1-based position"""
+        keys = []
+        for key in self.iter_from(start):
+            if len(keys) == count:
+                break
+            keys.append(key)
+        return keys
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.iter_from(1)
@@ -2,16 +2,21 @@
 Security utilities for authentication and authorization
 """
 
+import hmac
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Header, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select, event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .cache import PrincipalCache
 from .config import settings
-from .database import get_db
+from .database import get_async_db
+from .hashing import password_hasher
 from ..models.user import User
 
 # Password hashing
@@ -20,6 +25,14 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT Security
 security = HTTPBearer()
 
+# Authenticated users, so get_current_user does not hit the users table on every request.
+# Changes evict a user only in the process that made them; with several workers the
+# others keep the old row until PRINCIPAL_CACHE_TTL_SECONDS passes, so keep it short.
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -28,6 +41,14 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool"""
+    return await password_hasher.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -36,7 +57,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -44,7 +65,7 @@ def create_refresh_token(data: dict) -> str:
     """Create JWT refresh token"""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -58,7 +79,7 @@ def verify_token(token: str) -> Optional[dict]:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -77,12 +98,35 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    cache_key = (int(user_id), str(payload.get("jti") or payload.get("iat", "")))
+    user = principal_cache.get(cache_key)
+    if user is not None:
+        return user
+    
+    user = await db.scalar(select(User).where(User.id == int(user_id)))
     if user is None:
         raise credentials_exception
     
+    # Cached users are detached; handlers that modify them must merge them first
+    db.expunge(user)
+    principal_cache.set(cache_key, user)
     return user
 
+def invalidate_principal(user_id: int) -> None:
+    """Drop cached principals for a user after their row changes"""
+    principal_cache.invalidate_user(user_id)
+
+@event.listens_for(User, "after_update")
+def _invalidate_principal_on_update(mapper, connection, target):
+    """Evict users when any of their columns change through an ORM flush"""
+    state = inspect(target)
+    if any(state.attrs[attr.key].history.has_changes() for attr in mapper.column_attrs):
+        invalidate_principal(target.id)
+
+@event.listens_for(User, "after_delete")
+def _invalidate_principal_on_delete(mapper, connection, target):
+    invalidate_principal(target.id)
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current active user"""
     if not current_user.is_active:
@@ -107,3 +151,13 @@ def require_role(required_role: str):
 # Role-specific dependencies
 require_teacher = require_role("teacher")
 require_student = require_role("student")
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Require the configured ADMIN_API_KEY in X-Admin-Key; the admin API is off when it is unset"""
+    if not settings.ADMIN_API_KEY or not x_admin_key or not hmac.compare_digest(
+        x_admin_key.encode(), settings.ADMIN_API_KEY.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin key required"
+        )
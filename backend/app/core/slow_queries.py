@@ -0,0 +1,191 @@
+"""
+Slow-query recorder
+
+Statements taking at least SLOW_QUERY_THRESHOLD_MS are grouped by
+fingerprint (see query_tracking.fingerprint) with their count, total and
+maximum time and a window of recent durations for percentiles. With
+SLOW_QUERY_EXPLAIN the first slow SELECT of each fingerprint is also
+EXPLAINed on the same connection, and with SLOW_QUERY_LOG_FILE each slow
+statement is written as a JSON line to a rotating log file. Statements
+under the threshold cost one clock read and a comparison.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .query_tracking import fingerprint
+
+logger = logging.getLogger(__name__)
+
+DURATION_WINDOW = 256  # Recent durations kept per fingerprint for percentiles
+STATEMENT_CHARS = 2000  # Longest example statement kept
+
+# EXPLAIN prefix per dialect
+_EXPLAIN = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+}
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class SlowQueryStats:
+    """Aggregate for one fingerprint"""
+
+    __slots__ = ("fingerprint", "example", "count", "total", "max", "durations", "last_seen", "plan")
+
+    def __init__(self, fingerprint: str, example: str):
+        self.fingerprint = fingerprint
+        self.example = example[:STATEMENT_CHARS]
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.durations: Deque[float] = deque(maxlen=DURATION_WINDOW)
+        self.last_seen: Optional[datetime] = None
+        self.plan: Optional[List[Any]] = None
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.durations.append(seconds)
+        self.last_seen = datetime.utcnow()
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.durations)
+        return {
+            "fingerprint": self.fingerprint,
+            "example": self.example,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 2),
+            "p50_ms": round(_percentile(ordered, 0.5) * 1000, 2),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "plan": self.plan,
+        }
+
+class SlowQueryLog:
+    """Process-wide slow statement aggregates, bounded to max_fingerprints entries"""
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        max_fingerprints: int,
+        explain: bool = False,
+        log_file: Optional[str] = None,
+        log_max_bytes: int = 10 * 1024 * 1024,
+        log_backups: int = 5
+    ):
+        self.threshold = threshold_ms / 1000
+        self.max_fingerprints = max_fingerprints
+        self.explain = explain
+        self._entries: Dict[str, SlowQueryStats] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0  # Slow statements of fingerprints beyond max_fingerprints
+        self._file_logger: Optional[logging.Logger] = None
+        if log_file:
+            # Unregistered, so it only writes to this file whatever the logging config
+            self._file_logger = logging.Logger(f"{__name__}.file", logging.INFO)
+            handler = RotatingFileHandler(log_file, maxBytes=log_max_bytes, backupCount=log_backups)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._file_logger.addHandler(handler)
+
+    def record(self, conn, statement: str, parameters: Any, seconds: float, explainable: bool) -> None:
+        """Add a slow statement to its fingerprint, EXPLAINing the first of each when enabled"""
+        key = fingerprint(statement)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    self.dropped += 1
+                    return
+                entry = self._entries[key] = SlowQueryStats(key, statement)
+                explain = self.explain and explainable
+                if explain:
+                    entry.plan = []  # Claimed, so concurrent statements do not EXPLAIN it again
+            else:
+                explain = False
+            entry.add(seconds)
+
+        if explain:
+            entry.plan = self._explain(conn, statement, parameters)
+        if self._file_logger is not None:
+            self._file_logger.info(json.dumps({
+                "ts": datetime.utcnow().isoformat(),
+                "ms": round(seconds * 1000, 2),
+                "fingerprint": key,
+                "statement": statement[:STATEMENT_CHARS],
+                "plan": entry.plan if explain else None,
+            }, default=str))
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters: Any) -> List[Any]:
+        """Plan rows for statement, run on a raw cursor so it is neither tracked nor timed itself"""
+        prefix = _EXPLAIN.get(conn.dialect.name)
+        if prefix is None:
+            return []
+        try:
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters)
+                return [list(row) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as exc:  # A failed EXPLAIN must not fail the query it describes
+            logger.warning("EXPLAIN of slow statement failed: %s", exc)
+            return [f"EXPLAIN failed: {exc}"]
+
+    def top(self, limit: int = 50, order_by: str = "total") -> List[Dict[str, Any]]:
+        """Aggregates ordered by total, p95, max or count, largest first"""
+        with self._lock:
+            snapshots = [entry.snapshot() for entry in self._entries.values()]
+        key = {"total": "total_ms", "p95": "p95_ms", "max": "max_ms", "count": "count"}[order_by]
+        snapshots.sort(key=lambda snapshot: snapshot[key], reverse=True)
+        return snapshots[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.dropped = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "fingerprints": len(self._entries),
+            "dropped": self.dropped,
+        }
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    max_fingerprints=settings.SLOW_QUERY_MAX_FINGERPRINTS,
+    explain=settings.SLOW_QUERY_EXPLAIN,
+    log_file=settings.SLOW_QUERY_LOG_FILE,
+    log_max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+    log_backups=settings.SLOW_QUERY_LOG_BACKUPS
+)
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_slow_statement(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if elapsed < slow_query_log.threshold:
+        return
+    explainable = (
+        not executemany
+        and statement.split(None, 1)[0].upper() in ("SELECT", "WITH")
+        and not (context is not None and context.execution_options.get("stream_results"))
+    )
+    slow_query_log.record(conn, statement, parameters, elapsed, explainable)
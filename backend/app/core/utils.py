@@ -4,26 +4,101 @@ Utility functions
 
 import os
 import uuid
-from typing import Optional
+import hashlib
+from typing import BinaryIO, NamedTuple, Optional
 from datetime import datetime
 import json
 
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+
+from .config import settings
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+class StoredFile(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+    deduplicated: bool  # The same content was already stored
+
+class FileTooLargeError(Exception):
+    """Raised when a streamed file grows past its size limit"""
+
 def generate_unique_filename(original_filename: str) -> str:
     """Generate unique filename with UUID"""
     file_extension = os.path.splitext(original_filename)[1]
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     return unique_filename
 
-def save_uploaded_file(file_content: bytes, filename: str, upload_dir: str = "uploads") -> str:
-    """Save uploaded file and return file path"""
-    os.makedirs(upload_dir, exist_ok=True)
-    unique_filename = generate_unique_filename(filename)
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    with open(file_path, "wb") as f:
-        f.write(file_content)
-    
-    return file_path
+def blob_path(sha256: str, upload_dir: str) -> str:
+    """Content-addressed location of a stored file: <upload_dir>/ab/cd/<sha256>"""
+    return os.path.join(upload_dir, sha256[:2], sha256[2:4], sha256)
+
+def copy_file_stream(
+    source: BinaryIO,
+    upload_dir: str,
+    max_size: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> StoredFile:
+    """Copy a file object into the blob store chunk by chunk, keeping one copy per distinct content"""
+    staging_dir = os.path.join(upload_dir, "tmp")
+    os.makedirs(staging_dir, exist_ok=True)
+    partial_path = os.path.join(staging_dir, f"{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with open(partial_path, "wb") as destination:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeError(f"File exceeds {max_size} bytes")
+                digest.update(chunk)
+                destination.write(chunk)
+
+        sha256 = digest.hexdigest()
+        file_path = blob_path(sha256, upload_dir)
+        if os.path.exists(file_path):
+            # Refresh the mtime so garbage collection leaves a blob that is being re-referenced alone
+            os.utime(file_path)
+            os.remove(partial_path)
+            return StoredFile(file_path, size, sha256, True)
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        os.replace(partial_path, file_path)
+        return StoredFile(file_path, size, sha256, False)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+async def save_upload_stream(
+    file: UploadFile,
+    upload_dir: Optional[str] = None,
+    max_size: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> StoredFile:
+    """Stream an upload to disk in a worker thread, rejecting it with 413 past MAX_FILE_SIZE"""
+    upload_dir = upload_dir or settings.UPLOAD_DIR
+    max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large (max {max_size} bytes)"
+    )
+
+    # Size is known up front when the client sent it; otherwise the copy aborts once it passes the limit
+    if file.size is not None and file.size > max_size:
+        raise too_large
+    try:
+        return await run_in_threadpool(
+            copy_file_stream, file.file, upload_dir, max_size, chunk_size
+        )
+    except FileTooLargeError:
+        raise too_large
 
 def mock_ocr_processing(image_path: str) -> dict:
     """Mock OCR processing for Write & Fix feature"""
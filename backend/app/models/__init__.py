@@ -10,6 +10,14 @@ from .progress import ProgressStats
 from .quest import Quest, QuestAttempt
 from .correction import Correction
 from .subscription import Subscription
+from .dashboard_rollup import TeacherDashboardRollup
+from .upload_blob import UploadBlob
+from .job import Job
+from .analysis_cache import AnalysisCacheEntry
+from .daily_stats import StudentDailyStats
+from .activity_event import ActivityEvent
+from .quest_progress import StudentQuestProgress, StudentQuestAttempted
+from . import ownership  # noqa: F401  registers owner_teacher_id consistency events
 
 # Export all models
 __all__ = [
@@ -23,5 +31,13 @@ __all__ = [
     "Quest",
     "QuestAttempt",
     "Correction",
-    "Subscription"
+    "Subscription",
+    "TeacherDashboardRollup",
+    "UploadBlob",
+    "Job",
+    "AnalysisCacheEntry",
+    "ActivityEvent",
+    "StudentDailyStats",
+    "StudentQuestProgress",
+    "StudentQuestAttempted"
 ]
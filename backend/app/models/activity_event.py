@@ -0,0 +1,172 @@
+"""
+Activity event log
+
+Append-only record of what students and teachers did: submissions, grades,
+enrollments, quest attempts and corrections. Rows are written by the mapper
+events below in the same transaction as the action itself, and never
+updated. Feeds and parent stats read them as range scans over the
+(actor_id, ts), (student_id, ts) and (class_id, ts) indexes, and each
+event is also added to the student's row in student_daily_stats.
+
+The table has no foreign keys so that on MySQL it can be range-partitioned
+by month on ts (see migration 0010 and ActivityService.ensure_partitions);
+events also outlive the rows they describe.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, Index, event, select, insert, inspect, literal, func, case
+
+from ..core.database import Base, accumulate_statement
+from .daily_stats import StudentDailyStats, COUNTERS
+from .class_model import Class, StudentClass
+from .assignment import Assignment
+from .submission import Submission
+from .quest import Quest, QuestAttempt
+from .correction import Correction
+
+SUBMISSION = "submission"
+GRADE = "grade"
+ENROLLMENT = "enrollment"
+QUEST_ATTEMPT = "quest_attempt"
+CORRECTION = "correction"
+
+class ActivityEvent(Base):
+    __tablename__ = "activity_events"
+    __table_args__ = (
+        Index("ix_activity_events_actor_ts", "actor_id", "ts"),
+        Index("ix_activity_events_student_ts", "student_id", "ts"),
+        Index("ix_activity_events_class_ts", "class_id", "ts"),
+        Index("ix_activity_events_kind_ref", "kind", "ref_id"),  # Finds the event of a given row
+    )
+
+    id = Column(Integer, primary_key=True)
+    ts = Column(DateTime, nullable=False)  # Naive UTC; the partitioning key on MySQL
+    kind = Column(String(32), nullable=False)
+    actor_id = Column(Integer, nullable=False)  # User who acted
+    student_id = Column(Integer, nullable=True)  # Student the event concerns
+    class_id = Column(Integer, nullable=True)
+    ref_id = Column(Integer, nullable=True)  # Id of the submission, attempt, correction or enrollment
+    score = Column(Float, nullable=True)  # 0-100 where the action was scored
+    points = Column(Integer, nullable=True)  # Stars earned
+    duration = Column(Integer, nullable=True)  # Seconds spent, when known
+    errors = Column(Integer, nullable=True)  # Errors found, for corrections
+    correct = Column(Boolean, nullable=True)  # Whether a quest attempt was judged correct
+
+    def __repr__(self):
+        return f"<ActivityEvent(id={self.id}, kind='{self.kind}', actor_id={self.actor_id})>"
+
+events_table = ActivityEvent.__table__
+
+def roll_up_events(dialect_name, *criteria):
+    """INSERT ... SELECT adding the events matching criteria to their students' daily rows"""
+    def when(condition, value=1):
+        return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
+
+    is_quest = events_table.c.kind == QUEST_ATTEMPT
+    is_correction = events_table.c.kind == CORRECTION
+    day = func.date(events_table.c.ts)
+    source = select(
+        events_table.c.student_id,
+        day,
+        func.coalesce(func.sum(events_table.c.duration), 0),
+        when(is_quest),
+        when(is_quest & (events_table.c.correct == True)),
+        when(is_correction),
+        when(is_correction, func.coalesce(events_table.c.errors, 0)),
+        when(events_table.c.kind == SUBMISSION),
+        func.coalesce(func.sum(events_table.c.score), 0),
+        func.count(events_table.c.score),
+    ).where(events_table.c.student_id.isnot(None), *criteria).group_by(events_table.c.student_id, day)
+    return accumulate_statement(
+        dialect_name, StudentDailyStats.__table__, ["student_id", "day"] + COUNTERS, source,
+        ["student_id", "day"], COUNTERS
+    )
+
+def _log(connection, kind, actor_id, **values):
+    """Append one event and roll it up; values may be scalar subqueries"""
+    result = connection.execute(insert(events_table).values(ts=datetime.utcnow(), kind=kind, actor_id=actor_id, **values))
+    connection.execute(roll_up_events(connection.dialect.name, events_table.c.id == result.inserted_primary_key[0]))
+
+def _class_of_assignment(assignment_id):
+    return select(Assignment.__table__.c.class_id).where(Assignment.__table__.c.id == assignment_id).scalar_subquery()
+
+def _class_owner(class_id):
+    return select(Class.__table__.c.owner_teacher_id).where(Class.__table__.c.id == class_id).scalar_subquery()
+
+def quest_attempt_events(*criteria, ts=None):
+    """
+    INSERT ... SELECT appending a quest_attempt event for each attempt
+    matching criteria, stamped now or with the ts column expression given.
+    Correct attempts score 100; others score the share of the quest's
+    points they earned, which partial credit can round up to the full reward.
+    """
+    attempts = QuestAttempt.__table__
+    quests = Quest.__table__
+    source = select(
+        literal(datetime.utcnow(), DateTime) if ts is None else ts,
+        literal(QUEST_ATTEMPT),
+        attempts.c.student_id,
+        attempts.c.student_id,
+        attempts.c.id,
+        case(
+            (attempts.c.is_correct == True, 100.0),
+            else_=attempts.c.points_earned * 100.0 / func.nullif(quests.c.points_reward, 0)
+        ),
+        attempts.c.points_earned,
+        attempts.c.time_taken,
+        attempts.c.is_correct,
+    ).join_from(attempts, quests, quests.c.id == attempts.c.quest_id).where(*criteria)
+    return insert(events_table).from_select(
+        ["ts", "kind", "actor_id", "student_id", "ref_id", "score", "points", "duration", "correct"], source
+    )
+
+@event.listens_for(Submission, "after_insert")
+def _submitted(mapper, connection, target):
+    _log(
+        connection, SUBMISSION, target.student_id,
+        student_id=target.student_id, class_id=_class_of_assignment(target.assignment_id), ref_id=target.id
+    )
+
+@event.listens_for(Submission, "after_update")
+def _graded(mapper, connection, target):
+    state = inspect(target)
+    if target.is_graded and (state.attrs.is_graded.history.has_changes() or state.attrs.grade.history.has_changes()):
+        _log(
+            connection, GRADE, target.owner_teacher_id,
+            student_id=target.student_id, class_id=_class_of_assignment(target.assignment_id),
+            ref_id=target.id, score=target.grade
+        )
+
+@event.listens_for(StudentClass, "after_insert")
+def _enrolled(mapper, connection, target):
+    _log(
+        connection, ENROLLMENT, _class_owner(target.class_id),
+        student_id=target.student_id, class_id=target.class_id, ref_id=target.id
+    )
+
+@event.listens_for(QuestAttempt, "after_insert")
+def _attempted(mapper, connection, target):
+    connection.execute(quest_attempt_events(QuestAttempt.__table__.c.id == target.id))
+    connection.execute(roll_up_events(
+        connection.dialect.name, events_table.c.kind == QUEST_ATTEMPT, events_table.c.ref_id == target.id
+    ))
+
+def _log_correction(connection, target):
+    _log(
+        connection, CORRECTION, target.student_id,
+        student_id=target.student_id, ref_id=target.id, score=target.ai_score,
+        errors=len(target.corrections_data or [])
+    )
+
+@event.listens_for(Correction, "after_insert")
+def _corrected(mapper, connection, target):
+    # Uploads are inserted empty and logged once the background job scores them
+    if target.ai_score is not None:
+        _log_correction(connection, target)
+
+@event.listens_for(Correction, "after_update")
+def _correction_scored(mapper, connection, target):
+    history = inspect(target).attrs.ai_score.history
+    if history.has_changes() and target.ai_score is not None and not any(score is not None for score in history.deleted):
+        _log_correction(connection, target)
@@ -0,0 +1,23 @@
+"""
+Persisted correction/dictation analysis results
+"""
+
+from sqlalchemy import Column, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+
+from ..core.database import Base
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache_entries"
+    __table_args__ = (
+        Index("ix_analysis_cache_entries_expires_at", "expires_at"),
+    )
+
+    cache_key = Column(String(64), primary_key=True)  # sha256 of kind, language, exercise and normalized text
+    kind = Column(String(50), nullable=False)  # "correction" or "dictation"
+    result = Column(JSON, nullable=False)
+    expires_at = Column(DateTime, nullable=False)  # Naive UTC
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<AnalysisCacheEntry(cache_key={self.cache_key}, kind={self.kind})>"
@@ -2,7 +2,7 @@
 Assignment model
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -18,10 +18,15 @@ class AssignmentType(str, enum.Enum):
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (
+        Index("ix_assignments_class_created", "class_id", "created_at"),
+        Index("ix_assignments_owner_created", "owner_teacher_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
     created_by_teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Denormalized classes.owner_teacher_id
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
     assignment_type = Column(Enum(AssignmentType), default=AssignmentType.HOMEWORK)
@@ -33,7 +38,7 @@ class Assignment(Base):
 
     # Relationships
     class_obj = relationship("Class", back_populates="assignments")
-    teacher = relationship("User", back_populates="assignments_created")
+    teacher = relationship("User", back_populates="assignments_created", foreign_keys=[created_by_teacher_id])
     submissions = relationship("Submission", back_populates="assignment", cascade="all, delete-orphan")
 
     def __repr__(self):
@@ -2,7 +2,7 @@
 Class model
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -10,9 +10,14 @@ from ..core.database import Base
 
 class Class(Base):
     __tablename__ = "classes"
+    __table_args__ = (
+        Index("ix_classes_school_id", "school_id"),
+        Index("ix_classes_owner_created", "owner_teacher_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     school_id = Column(Integer, ForeignKey("schools.id"), nullable=False)
+    owner_teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Denormalized schools.teacher_id
     name = Column(String(200), nullable=False)  # e.g. "French 4ème primaire groupe A"
     description = Column(String(500), nullable=True)
     subject = Column(String(100), nullable=True)  # e.g. "French", "Math", "Arabic"
@@ -31,6 +36,10 @@ class Class(Base):
 class StudentClass(Base):
     """Many-to-many relationship between students and classes"""
     __tablename__ = "student_classes"
+    __table_args__ = (
+        Index("uq_student_classes_student_class", "student_id", "class_id", unique=True),
+        Index("ix_student_classes_class_id", "class_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
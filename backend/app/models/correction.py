@@ -2,7 +2,7 @@
 Correction model for Write & Fix feature
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -10,10 +10,14 @@ from ..core.database import Base
 
 class Correction(Base):
     __tablename__ = "corrections"
+    __table_args__ = (
+        Index("ix_corrections_student_created", "student_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     uploaded_image_url = Column(String(500), nullable=True)  # Path to uploaded image
+    content_hash = Column(String(64), ForeignKey("upload_blobs.sha256"), nullable=True, index=True)  # sha256 of the uploaded image
     original_text = Column(Text, nullable=True)  # OCR extracted text
     corrected_text = Column(Text, nullable=True)  # AI corrected text
     corrections_data = Column(JSON, nullable=True)  # Detailed corrections info
@@ -0,0 +1,36 @@
+"""
+Per-student daily statistics rollup
+
+One row per student per UTC day holding the sums weekly and monthly stats
+need, so a month is assembled from at most 31 rows however much history a
+student has. Rows are added to by each activity event as it is logged (see
+roll_up_events in models/activity_event.py) and can be rebuilt from the
+event log with scripts/backfill_daily_stats.py.
+"""
+
+from sqlalchemy import Column, Integer, Float, Date
+
+from ..core.database import Base
+
+# Columns summed when events are rolled up
+COUNTERS = [
+    "time_spent", "quests_completed", "quests_correct", "lessons_completed",
+    "errors_corrected", "submissions", "score_sum", "score_count",
+]
+
+class StudentDailyStats(Base):
+    __tablename__ = "student_daily_stats"
+
+    student_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC
+    time_spent = Column(Integer, nullable=False, default=0, server_default="0")  # in seconds
+    quests_completed = Column(Integer, nullable=False, default=0, server_default="0")
+    quests_correct = Column(Integer, nullable=False, default=0, server_default="0")
+    lessons_completed = Column(Integer, nullable=False, default=0, server_default="0")  # Scored corrections
+    errors_corrected = Column(Integer, nullable=False, default=0, server_default="0")
+    submissions = Column(Integer, nullable=False, default=0, server_default="0")
+    score_sum = Column(Float, nullable=False, default=0, server_default="0")  # Over scored events
+    score_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<StudentDailyStats(student_id={self.student_id}, day={self.day})>"
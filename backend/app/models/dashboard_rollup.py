@@ -0,0 +1,192 @@
+"""
+Teacher dashboard rollup model
+
+One row per class holding the counters the teacher dashboards need. Rows
+are created with their class and kept current by the mapper events below,
+which apply atomic ``column = column + delta`` updates on every enrollment,
+assignment, submission and grade write, so dashboards read a handful of
+indexed rows instead of aggregating over the ownership joins.
+"""
+
+from sqlalchemy import (
+    Column, Integer, Float, DateTime, ForeignKey, Index, event, select, insert, update, delete,
+    func, case, inspect
+)
+
+from ..core.database import Base
+from .school import School
+from .class_model import Class, StudentClass
+from .assignment import Assignment
+from .submission import Submission
+
+class TeacherDashboardRollup(Base):
+    __tablename__ = "teacher_dashboard_rollup"
+    __table_args__ = (
+        Index("ix_teacher_dashboard_rollup_teacher", "teacher_id", "class_id"),
+    )
+
+    class_id = Column(Integer, ForeignKey("classes.id", ondelete="CASCADE"), primary_key=True)
+    teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    student_count = Column(Integer, nullable=False, default=0, server_default="0")
+    assignment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    submission_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_count = Column(Integer, nullable=False, default=0, server_default="0")  # Not yet graded
+    graded_count = Column(Integer, nullable=False, default=0, server_default="0")  # Graded with a grade
+    grade_sum = Column(Float, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def average_grade(self):
+        return self.grade_sum / self.graded_count if self.graded_count else None
+
+    @property
+    def completion_rate(self) -> float:
+        """Share of expected submissions (assignments x enrolled students) received"""
+        expected = self.assignment_count * self.student_count
+        return min(1.0, self.submission_count / expected) if expected else 0.0
+
+    def __repr__(self):
+        return f"<TeacherDashboardRollup(class_id={self.class_id}, teacher_id={self.teacher_id})>"
+
+rollup_table = TeacherDashboardRollup.__table__
+
+def _bump(connection, class_id, **deltas):
+    """Atomically add deltas to a class's counters; class_id may be a scalar subquery"""
+    values = {rollup_table.c[name]: rollup_table.c[name] + delta for name, delta in deltas.items() if delta}
+    if values:
+        connection.execute(update(rollup_table).where(rollup_table.c.class_id == class_id).values(values))
+
+def _submission_class_id(assignment_id):
+    return select(Assignment.__table__.c.class_id).where(
+        Assignment.__table__.c.id == assignment_id
+    ).scalar_subquery()
+
+def _grade_counters(is_graded, grade, sign=1):
+    """Counter deltas contributed by one submission in the given grading state"""
+    graded = bool(is_graded) and grade is not None
+    return {
+        "pending_count": sign * (0 if is_graded else 1),
+        "graded_count": sign * (1 if graded else 0),
+        "grade_sum": sign * (grade if graded else 0),
+    }
+
+def rebuild_dashboard_rollup(connection, class_ids=None):
+    """Recompute rollup rows from the source tables (all classes, or just class_ids)"""
+    classes = Class.__table__
+    enrollments = StudentClass.__table__
+    assignments = Assignment.__table__
+    submissions = Submission.__table__
+
+    def class_submissions(*columns):
+        return select(*columns).select_from(
+            submissions.join(assignments, assignments.c.id == submissions.c.assignment_id)
+        ).where(assignments.c.class_id == classes.c.id).scalar_subquery()
+
+    source = select(
+        classes.c.id,
+        classes.c.owner_teacher_id,
+        select(func.count(enrollments.c.id)).where(enrollments.c.class_id == classes.c.id).scalar_subquery(),
+        select(func.count(assignments.c.id)).where(assignments.c.class_id == classes.c.id).scalar_subquery(),
+        class_submissions(func.count(submissions.c.id)),
+        class_submissions(func.coalesce(func.sum(case((submissions.c.is_graded == True, 0), else_=1)), 0)),
+        class_submissions(func.count(case(
+            ((submissions.c.is_graded == True) & submissions.c.grade.isnot(None), 1)
+        ))),
+        class_submissions(func.coalesce(func.sum(case((submissions.c.is_graded == True, submissions.c.grade))), 0)),
+    )
+    clear = delete(rollup_table)
+    if class_ids is not None:
+        source = source.where(classes.c.id.in_(class_ids))
+        clear = clear.where(rollup_table.c.class_id.in_(class_ids))
+
+    connection.execute(clear)
+    connection.execute(insert(rollup_table).from_select(
+        [
+            "class_id", "teacher_id", "student_count", "assignment_count",
+            "submission_count", "pending_count", "graded_count", "grade_sum",
+        ],
+        source
+    ))
+
+@event.listens_for(Class, "after_insert")
+def _class_created(mapper, connection, target):
+    connection.execute(insert(rollup_table).values(class_id=target.id, teacher_id=target.owner_teacher_id))
+
+@event.listens_for(Class, "before_delete")
+def _class_deleted(mapper, connection, target):
+    connection.execute(delete(rollup_table).where(rollup_table.c.class_id == target.id))
+
+@event.listens_for(Class, "after_update")
+def _class_reowned(mapper, connection, target):
+    if inspect(target).attrs.owner_teacher_id.history.has_changes():
+        connection.execute(
+            update(rollup_table)
+            .where(rollup_table.c.class_id == target.id)
+            .values(teacher_id=target.owner_teacher_id)
+        )
+
+@event.listens_for(School, "after_update")
+def _school_reowned(mapper, connection, target):
+    if inspect(target).attrs.teacher_id.history.has_changes():
+        class_ids = select(Class.__table__.c.id).where(Class.__table__.c.school_id == target.id)
+        connection.execute(
+            update(rollup_table)
+            .where(rollup_table.c.class_id.in_(class_ids))
+            .values(teacher_id=target.teacher_id)
+        )
+
+@event.listens_for(StudentClass, "after_insert")
+def _student_enrolled(mapper, connection, target):
+    _bump(connection, target.class_id, student_count=1)
+
+@event.listens_for(StudentClass, "before_delete")
+def _student_removed(mapper, connection, target):
+    _bump(connection, target.class_id, student_count=-1)
+
+@event.listens_for(Assignment, "after_insert")
+def _assignment_created(mapper, connection, target):
+    _bump(connection, target.class_id, assignment_count=1)
+
+@event.listens_for(Assignment, "before_delete")
+def _assignment_deleted(mapper, connection, target):
+    _bump(connection, target.class_id, assignment_count=-1)
+
+@event.listens_for(Assignment, "after_update")
+def _assignment_moved(mapper, connection, target):
+    history = inspect(target).attrs.class_id.history
+    if history.has_changes():
+        rebuild_dashboard_rollup(connection, list(history.deleted) + [target.class_id])
+
+@event.listens_for(Submission, "after_insert")
+def _submission_created(mapper, connection, target):
+    _bump(
+        connection,
+        _submission_class_id(target.assignment_id),
+        submission_count=1,
+        **_grade_counters(target.is_graded, target.grade)
+    )
+
+@event.listens_for(Submission, "before_delete")
+def _submission_deleted(mapper, connection, target):
+    _bump(
+        connection,
+        _submission_class_id(target.assignment_id),
+        submission_count=-1,
+        **_grade_counters(target.is_graded, target.grade, sign=-1)
+    )
+
+@event.listens_for(Submission, "before_update")
+def _submission_graded(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.is_graded.history.has_changes() or state.attrs.grade.history.has_changes()):
+        return
+
+    # Read the stored grading state rather than trusting attribute history,
+    # which cannot tell an unloaded old value from NULL
+    submissions = Submission.__table__
+    was_graded, old_grade = connection.execute(
+        select(submissions.c.is_graded, submissions.c.grade).where(submissions.c.id == target.id)
+    ).one()
+    old = _grade_counters(was_graded, old_grade)
+    new = _grade_counters(target.is_graded, target.grade)
+    _bump(connection, _submission_class_id(target.assignment_id), **{name: new[name] - old[name] for name in new})
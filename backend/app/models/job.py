@@ -0,0 +1,43 @@
+"""
+Background job model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Enum, Index
+from sqlalchemy.sql import func
+import enum
+
+from ..core.database import Base
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_status_locked_until", "status", "locked_until"),
+        Index("uq_jobs_user_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # Handler name, e.g. "write_fix"
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    payload = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)  # Last failure
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    idempotency_key = Column(String(100), nullable=True)  # Client-supplied, unique per user
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    # Naive UTC, always written by the application so comparisons do not depend on the database clock
+    run_after = Column(DateTime, nullable=False)  # Not claimable before this (retry backoff)
+    locked_until = Column(DateTime, nullable=True)  # Visibility timeout of the current claim
+    locked_by = Column(String(100), nullable=True)  # Worker holding the claim
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job(id={self.id}, kind={self.kind}, status={self.status})>"
@@ -0,0 +1,88 @@
+"""
+Consistency rules for the denormalized owner_teacher_id columns
+
+classes, assignments and submissions carry the id of the teacher who owns
+them (the school's teacher) so authorization checks are single-table
+lookups. These mapper events fill the column on insert and push changes
+down the chain when a school changes hands or a row moves to another parent.
+"""
+
+from sqlalchemy import event, select, update, inspect
+
+from .school import School
+from .class_model import Class
+from .assignment import Assignment
+from .submission import Submission
+
+def _parent_changed(target, attribute: str) -> bool:
+    return inspect(target).attrs[attribute].history.has_changes()
+
+@event.listens_for(Class, "before_insert")
+@event.listens_for(Class, "before_update")
+def _set_class_owner(mapper, connection, target):
+    """Take the owner from the class's school"""
+    if target.owner_teacher_id is None or _parent_changed(target, "school_id"):
+        target.owner_teacher_id = connection.scalar(
+            select(School.teacher_id).where(School.id == target.school_id)
+        )
+
+@event.listens_for(Assignment, "before_insert")
+@event.listens_for(Assignment, "before_update")
+def _set_assignment_owner(mapper, connection, target):
+    """Take the owner from the assignment's class"""
+    if target.owner_teacher_id is None or _parent_changed(target, "class_id"):
+        target.owner_teacher_id = connection.scalar(
+            select(Class.owner_teacher_id).where(Class.id == target.class_id)
+        )
+
+@event.listens_for(Submission, "before_insert")
+@event.listens_for(Submission, "before_update")
+def _set_submission_owner(mapper, connection, target):
+    """Take the owner from the submission's assignment"""
+    if target.owner_teacher_id is None or _parent_changed(target, "assignment_id"):
+        target.owner_teacher_id = connection.scalar(
+            select(Assignment.owner_teacher_id).where(Assignment.id == target.assignment_id)
+        )
+
+def _cascade_class_owner(connection, class_ids, owner_teacher_id):
+    """Propagate a class owner change to its assignments and submissions"""
+    connection.execute(
+        update(Assignment.__table__)
+        .where(Assignment.__table__.c.class_id.in_(class_ids))
+        .values(owner_teacher_id=owner_teacher_id)
+    )
+    assignment_ids = select(Assignment.__table__.c.id).where(Assignment.__table__.c.class_id.in_(class_ids))
+    connection.execute(
+        update(Submission.__table__)
+        .where(Submission.__table__.c.assignment_id.in_(assignment_ids))
+        .values(owner_teacher_id=owner_teacher_id)
+    )
+
+@event.listens_for(School, "after_update")
+def _cascade_school_owner(mapper, connection, target):
+    """Re-own everything under a school whose teacher changed"""
+    if not _parent_changed(target, "teacher_id"):
+        return
+    class_ids = select(Class.__table__.c.id).where(Class.__table__.c.school_id == target.id)
+    connection.execute(
+        update(Class.__table__)
+        .where(Class.__table__.c.school_id == target.id)
+        .values(owner_teacher_id=target.teacher_id)
+    )
+    _cascade_class_owner(connection, class_ids, target.teacher_id)
+
+@event.listens_for(Class, "after_update")
+def _cascade_moved_class(mapper, connection, target):
+    """Re-own a class's assignments and submissions after it moves school"""
+    if _parent_changed(target, "school_id"):
+        _cascade_class_owner(connection, [target.id], target.owner_teacher_id)
+
+@event.listens_for(Assignment, "after_update")
+def _cascade_moved_assignment(mapper, connection, target):
+    """Re-own an assignment's submissions after it moves class"""
+    if _parent_changed(target, "class_id"):
+        connection.execute(
+            update(Submission.__table__)
+            .where(Submission.__table__.c.assignment_id == target.id)
+            .values(owner_teacher_id=target.owner_teacher_id)
+        )
@@ -2,7 +2,7 @@
 Quest models for mini-games and exercises
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Enum, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Enum, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -45,6 +45,11 @@ class Quest(Base):
 
 class QuestAttempt(Base):
     __tablename__ = "quest_attempts"
+    __table_args__ = (
+        Index("ix_quest_attempts_student_quest", "student_id", "quest_id"),
+        Index("ix_quest_attempts_student_attempted", "student_id", "attempted_at"),
+        Index("uq_quest_attempts_student_client_attempt", "student_id", "client_attempt_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     quest_id = Column(Integer, ForeignKey("quests.id"), nullable=False)
@@ -53,6 +58,7 @@ class QuestAttempt(Base):
     is_correct = Column(Boolean, nullable=False)
     points_earned = Column(Integer, default=0)
     time_taken = Column(Integer, nullable=True)  # in seconds
+    client_attempt_id = Column(String(64), nullable=True)  # Offline clients' idempotency id, unique per student
     attempted_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -0,0 +1,72 @@
+"""
+Per-student quest progress aggregate
+
+student_quest_progress holds one row per student with running attempt,
+correct-attempt and points totals and the number of distinct quests
+attempted; student_quests_attempted is the set of (student, quest) pairs
+behind that count. Both are maintained when attempts are recorded (the
+QuestAttempt mapper event below, or QuestAttemptService for batches), so
+quest progress is one primary key read however many attempts a student
+has made.
+"""
+
+from sqlalchemy import Column, Integer, event
+
+from ..core.database import Base, upsert_statement, insert_ignore_statement
+from .quest import QuestAttempt
+
+class StudentQuestProgress(Base):
+    __tablename__ = "student_quest_progress"
+
+    student_id = Column(Integer, primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    correct_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    points_total = Column(Integer, nullable=False, default=0, server_default="0")
+    quests_attempted = Column(Integer, nullable=False, default=0, server_default="0")  # Distinct quests
+
+    @property
+    def accuracy_rate(self) -> float:
+        return self.correct_attempts / self.attempts if self.attempts else 0
+
+    def __repr__(self):
+        return f"<StudentQuestProgress(student_id={self.student_id}, attempts={self.attempts})>"
+
+class StudentQuestAttempted(Base):
+    __tablename__ = "student_quests_attempted"
+
+    student_id = Column(Integer, primary_key=True)
+    quest_id = Column(Integer, primary_key=True)
+
+    def __repr__(self):
+        return f"<StudentQuestAttempted(student_id={self.student_id}, quest_id={self.quest_id})>"
+
+progress_table = StudentQuestProgress.__table__
+attempted_table = StudentQuestAttempted.__table__
+
+def mark_attempted(dialect_name, student_id, quest_ids):
+    """INSERT of the (student, quest) pairs not yet in the set; its rowcount is the number of new quests"""
+    rows = [{"student_id": student_id, "quest_id": quest_id} for quest_id in sorted(set(quest_ids))]
+    return insert_ignore_statement(dialect_name, attempted_table, rows)
+
+def add_to_progress(dialect_name, student_id, attempts, correct_attempts, points, new_quests):
+    """Upsert adding to a student's running totals"""
+    deltas = {
+        "attempts": attempts,
+        "correct_attempts": correct_attempts,
+        "points_total": points,
+        "quests_attempted": new_quests,
+    }
+    return upsert_statement(
+        dialect_name,
+        progress_table,
+        {"student_id": student_id, **deltas},
+        {name: progress_table.c[name] + delta for name, delta in deltas.items()}
+    )
+
+@event.listens_for(QuestAttempt, "after_insert")
+def _attempt_recorded(mapper, connection, target):
+    dialect_name = connection.dialect.name
+    new_quests = connection.execute(mark_attempted(dialect_name, target.student_id, [target.quest_id])).rowcount
+    connection.execute(add_to_progress(
+        dialect_name, target.student_id, 1, 1 if target.is_correct else 0, target.points_earned or 0, max(new_quests, 0)
+    ))
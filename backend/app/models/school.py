@@ -2,7 +2,7 @@
 School model
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,9 @@ from ..core.database import Base
 
 class School(Base):
     __tablename__ = "schools"
+    __table_args__ = (
+        Index("ix_schools_teacher_id", "teacher_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)
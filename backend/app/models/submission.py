@@ -2,7 +2,7 @@
 Submission model
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -10,11 +10,20 @@ from ..core.database import Base
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("uq_submissions_assignment_student", "assignment_id", "student_id", unique=True),
+        Index("ix_submissions_graded_assignment", "is_graded", "assignment_id"),
+        Index("ix_submissions_student_submitted", "student_id", "submitted_at"),
+        Index("ix_submissions_owner_graded", "owner_teacher_id", "is_graded"),
+        Index("ix_submissions_owner_submitted", "owner_teacher_id", "submitted_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("assignments.id"), nullable=False)
     student_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_teacher_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Denormalized assignments.owner_teacher_id
     file_url = Column(String(500), nullable=True)  # Path to uploaded file
+    content_hash = Column(String(64), ForeignKey("upload_blobs.sha256"), nullable=True, index=True)  # sha256 of the uploaded file
     text_content = Column(Text, nullable=True)  # Direct text submission
     grade = Column(Float, nullable=True)  # 0-100 scale
     feedback = Column(Text, nullable=True)
@@ -24,7 +33,7 @@ class Submission(Base):
 
     # Relationships
     assignment = relationship("Assignment", back_populates="submissions")
-    student = relationship("User", back_populates="submissions")
+    student = relationship("User", back_populates="submissions", foreign_keys=[student_id])
 
     def __repr__(self):
         return f"<Submission(id={self.id}, assignment_id={self.assignment_id}, student_id={self.student_id})>"
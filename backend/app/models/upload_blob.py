@@ -0,0 +1,92 @@
+"""
+Upload blob model
+
+Uploaded files are stored once per distinct content under
+``UPLOAD_DIR/ab/cd/<sha256>`` (see app/core/utils.py). Each stored blob has a
+row here counting the submissions and corrections that point at it; the
+mapper events below keep ``ref_count`` current with atomic upserts, and
+blobs whose count drops to zero are removed by
+``UploadService.collect_garbage``.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, event, select, update, func, inspect
+
+from ..core.database import Base, upsert_statement
+from .submission import Submission
+from .correction import Correction
+
+class UploadBlob(Base):
+    __tablename__ = "upload_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UploadBlob(sha256={self.sha256}, ref_count={self.ref_count})>"
+
+blob_table = UploadBlob.__table__
+
+def _add_reference(connection, sha256):
+    """Create the blob row or bump its count in one statement"""
+    statement = upsert_statement(
+        connection.dialect.name,
+        blob_table,
+        {"sha256": sha256, "ref_count": 1},
+        {"ref_count": blob_table.c.ref_count + 1, "updated_at": func.now()}
+    )
+    if statement is None:
+        result = connection.execute(
+            update(blob_table)
+            .where(blob_table.c.sha256 == sha256)
+            .values(ref_count=blob_table.c.ref_count + 1)
+        )
+        if result.rowcount:
+            return
+        statement = blob_table.insert().values(sha256=sha256, ref_count=1)
+    connection.execute(statement)
+
+def _drop_reference(connection, sha256):
+    connection.execute(
+        update(blob_table)
+        .where(blob_table.c.sha256 == sha256, blob_table.c.ref_count > 0)
+        .values(ref_count=blob_table.c.ref_count - 1)
+    )
+
+def recount_blob_references(connection):
+    """Recompute every ref_count from the referencing tables"""
+    submissions = Submission.__table__
+    corrections = Correction.__table__
+    connection.execute(update(blob_table).values(
+        ref_count=(
+            select(func.count()).where(submissions.c.content_hash == blob_table.c.sha256).scalar_subquery()
+            + select(func.count()).where(corrections.c.content_hash == blob_table.c.sha256).scalar_subquery()
+        )
+    ))
+
+@event.listens_for(Submission, "before_insert")
+@event.listens_for(Correction, "before_insert")
+def _blob_referenced(mapper, connection, target):
+    if target.content_hash is not None:
+        _add_reference(connection, target.content_hash)
+
+@event.listens_for(Submission, "before_delete")
+@event.listens_for(Correction, "before_delete")
+def _blob_dereferenced(mapper, connection, target):
+    if target.content_hash is not None:
+        _drop_reference(connection, target.content_hash)
+
+@event.listens_for(Submission, "before_update")
+@event.listens_for(Correction, "before_update")
+def _blob_replaced(mapper, connection, target):
+    if not inspect(target).attrs.content_hash.history.has_changes():
+        return
+    table = mapper.local_table
+    old = connection.scalar(select(table.c.content_hash).where(table.c.id == target.id))
+    if old == target.content_hash:
+        return
+    if old is not None:
+        _drop_reference(connection, old)
+    if target.content_hash is not None:
+        _add_reference(connection, target.content_hash)
@@ -43,8 +43,10 @@ class User(Base):
     # Relationships
     schools = relationship("School", back_populates="teacher", cascade="all, delete-orphan")
     student_classes = relationship("StudentClass", back_populates="student")
-    assignments_created = relationship("Assignment", back_populates="teacher")
-    submissions = relationship("Submission", back_populates="student")
+    assignments_created = relationship(
+        "Assignment", back_populates="teacher", foreign_keys="Assignment.created_by_teacher_id"
+    )
+    submissions = relationship("Submission", back_populates="student", foreign_keys="Submission.student_id")
     progress_stats = relationship("ProgressStats", back_populates="student", uselist=False)
     corrections = relationship("Correction", back_populates="student")
     subscription = relationship("Subscription", back_populates="teacher", uselist=False)
@@ -0,0 +1,29 @@
+"""
+Admin router - Operational views behind ADMIN_API_KEY
+"""
+
+from typing import Any, Dict, Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from ..core.slow_queries import slow_query_log
+from ..core.security import require_admin_key
+
+router = APIRouter(dependencies=[Depends(require_admin_key)])
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    order_by: Literal["total", "p95", "max", "count"] = "total"
+) -> Dict[str, Any]:
+    """Slow statement fingerprints with count, p50/p95/max and total time, and their plan when captured"""
+    return {
+        **slow_query_log.stats(),
+        "queries": slow_query_log.top(limit, order_by),
+    }
+
+@router.delete("/slow-queries")
+async def reset_slow_queries() -> Dict[str, str]:
+    """Forget recorded slow statements"""
+    slow_query_log.reset()
+    return {"message": "Slow query log cleared"}
@@ -2,21 +2,24 @@
 Assignments router
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from ..core.database import get_db
+from ..core.database import get_async_db
+from ..core.pagination import PageParams, keyset_page, finish_page
 from ..core.security import require_teacher, require_student, get_current_active_user
 from ..models.user import User
-from ..models.school import School
 from ..models.class_model import Class, StudentClass
 from ..models.assignment import Assignment
 from ..models.submission import Submission
+from ..models.dashboard_rollup import TeacherDashboardRollup
 from ..schemas.assignment import (
     AssignmentCreate, AssignmentUpdate, AssignmentResponse,
     AssignmentWithSubmissions, AssignmentStats
 )
+from ..services.ownership_service import OwnershipService
 
 router = APIRouter()
 
@@ -24,14 +27,11 @@ router = APIRouter()
 async def create_assignment(
     assignment_data: AssignmentCreate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new assignment"""
     # Verify class belongs to teacher
-    class_obj = db.query(Class).join(School).filter(
-        Class.id == assignment_data.class_id,
-        School.teacher_id == current_user.id
-    ).first()
+    class_obj = await OwnershipService.get_owned(db, Class, assignment_data.class_id, current_user.id)
     
     if not class_obj:
         raise HTTPException(
@@ -42,6 +42,7 @@ async def create_assignment(
     assignment = Assignment(
         class_id=assignment_data.class_id,
         created_by_teacher_id=current_user.id,
+        owner_teacher_id=class_obj.owner_teacher_id,
         title=assignment_data.title,
         description=assignment_data.description,
         assignment_type=assignment_data.assignment_type,
@@ -51,59 +52,60 @@ async def create_assignment(
     )
     
     db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     
     return AssignmentResponse.from_orm(assignment)
 
 @router.get("/", response_model=List[AssignmentResponse])
 async def get_assignments(
+    response: Response,
     class_id: int = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get assignments"""
+    """Get assignments, newest first"""
     if current_user.role == "teacher":
         # Teachers see assignments from their classes
-        query = db.query(Assignment).join(Class).join(School).filter(
-            School.teacher_id == current_user.id
-        )
+        query = select(Assignment).where(OwnershipService.owned_by(Assignment, current_user.id))
         if class_id:
-            query = query.filter(Assignment.class_id == class_id)
+            query = query.where(Assignment.class_id == class_id)
     else:
         # Students see assignments from their enrolled classes
-        query = db.query(Assignment).join(Class).join(StudentClass).filter(
+        query = select(Assignment).join(Class).join(StudentClass).where(
             StudentClass.student_id == current_user.id
         )
         if class_id:
             # Verify student is enrolled in the class
-            enrollment = db.query(StudentClass).filter(
+            enrollment = await db.scalar(select(StudentClass).where(
                 StudentClass.student_id == current_user.id,
                 StudentClass.class_id == class_id
-            ).first()
+            ))
             if not enrollment:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not enrolled in this class"
                 )
-            query = query.filter(Assignment.class_id == class_id)
+            query = query.where(Assignment.class_id == class_id)
     
-    assignments = query.all()
+    result = await db.scalars(keyset_page(query, Assignment.created_at, Assignment.id, page))
+    assignments = finish_page(result.all(), page, response, lambda a: (a.created_at, a.id))
     return [AssignmentResponse.from_orm(assignment) for assignment in assignments]
 
 @router.get("/{assignment_id}")
 async def get_assignment(
     assignment_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get assignment by ID with submissions"""
     try:
-        from sqlalchemy.orm import joinedload
+        from sqlalchemy.orm import selectinload
 
-        assignment = db.query(Assignment).options(
-            joinedload(Assignment.submissions).joinedload(Submission.student)
-        ).filter(Assignment.id == assignment_id).first()
+        assignment = await db.scalar(select(Assignment).options(
+            selectinload(Assignment.submissions).selectinload(Submission.student)
+        ).where(Assignment.id == assignment_id))
 
         if not assignment:
             raise HTTPException(
@@ -116,21 +118,17 @@ async def get_assignment(
 
         if user_role == "teacher":
             # Verify assignment belongs to teacher's class
-            class_obj = db.query(Class).join(School).filter(
-                Class.id == assignment.class_id,
-                School.teacher_id == current_user.id
-            ).first()
-            if not class_obj:
+            if assignment.owner_teacher_id != current_user.id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not enough permissions"
                 )
         else:
             # Verify student is enrolled in the class
-            enrollment = db.query(StudentClass).filter(
+            enrollment = await db.scalar(select(StudentClass).where(
                 StudentClass.student_id == current_user.id,
                 StudentClass.class_id == assignment.class_id
-            ).first()
+            ))
             if not enrollment:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
@@ -180,13 +178,10 @@ async def update_assignment(
     assignment_id: int,
     assignment_update: AssignmentUpdate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update assignment"""
-    assignment = db.query(Assignment).join(Class).join(School).filter(
-        Assignment.id == assignment_id,
-        School.teacher_id == current_user.id
-    ).first()
+    assignment = await OwnershipService.get_owned(db, Assignment, assignment_id, current_user.id)
     
     if not assignment:
         raise HTTPException(
@@ -199,8 +194,8 @@ async def update_assignment(
     for field, value in update_data.items():
         setattr(assignment, field, value)
     
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     
     return AssignmentResponse.from_orm(assignment)
 
@@ -208,13 +203,10 @@ async def update_assignment(
 async def delete_assignment(
     assignment_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete assignment"""
-    assignment = db.query(Assignment).join(Class).join(School).filter(
-        Assignment.id == assignment_id,
-        School.teacher_id == current_user.id
-    ).first()
+    assignment = await OwnershipService.get_owned(db, Assignment, assignment_id, current_user.id)
     
     if not assignment:
         raise HTTPException(
@@ -222,8 +214,8 @@ async def delete_assignment(
             detail="Assignment not found"
         )
     
-    db.delete(assignment)
-    db.commit()
+    await db.delete(assignment)
+    await db.commit()
     
     return {"message": "Assignment deleted successfully"}
 
@@ -231,13 +223,10 @@ async def delete_assignment(
 async def get_assignment_stats(
     assignment_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get assignment statistics"""
-    assignment = db.query(Assignment).join(Class).join(School).filter(
-        Assignment.id == assignment_id,
-        School.teacher_id == current_user.id
-    ).first()
+    assignment = await OwnershipService.get_owned(db, Assignment, assignment_id, current_user.id)
     
     if not assignment:
         raise HTTPException(
@@ -245,13 +234,20 @@ async def get_assignment_stats(
             detail="Assignment not found"
         )
     
-    # Calculate stats (simplified for demo)
-    total_submissions = len(assignment.submissions)
-    graded_submissions = len([s for s in assignment.submissions if s.is_graded])
+    total_submissions, graded_submissions, average_grade = (await db.execute(
+        select(
+            func.count(Submission.id),
+            func.count(case((Submission.is_graded == True, Submission.id))),
+            func.avg(case((Submission.is_graded == True, Submission.grade)))
+        ).where(Submission.assignment_id == assignment_id)
+    )).one()
+    student_count = await db.scalar(
+        select(TeacherDashboardRollup.student_count).where(TeacherDashboardRollup.class_id == assignment.class_id)
+    )
     
     return AssignmentStats(
         total_submissions=total_submissions,
         graded_submissions=graded_submissions,
-        average_grade=85.0,  # Mock data
-        completion_rate=0.8  # Mock data
+        average_grade=average_grade,
+        completion_rate=min(1.0, total_submissions / student_count) if student_count else 0.0
     )
@@ -3,9 +3,10 @@ Authentication router
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.security import get_current_active_user, verify_token
 from ..schemas.user import UserCreate, UserLogin, Token, TokenRefresh, PasswordChange, UserResponse
 from ..services.auth_service import AuthService
@@ -13,9 +14,9 @@ from ..services.auth_service import AuthService
 router = APIRouter()
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
-    user = AuthService.create_user(db, user_data)
+    user = await AuthService.create_user(db, user_data)
     tokens = AuthService.create_tokens(user)
     
     return Token(
@@ -26,9 +27,9 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
 @router.post("/login", response_model=Token)
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user"""
-    user = AuthService.authenticate_user(db, login_data)
+    user = await AuthService.authenticate_user(db, login_data)
     tokens = AuthService.create_tokens(user)
     
     return Token(
@@ -39,7 +40,7 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     )
 
 @router.post("/refresh", response_model=dict)
-async def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db)):
+async def refresh_token(token_data: TokenRefresh, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token"""
     payload = verify_token(token_data.refresh_token)
     
@@ -57,7 +58,7 @@ async def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db))
         )
     
     from ..models.user import User
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.scalar(select(User).where(User.id == int(user_id)))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,10 +75,10 @@ async def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db))
 async def change_password(
     password_data: PasswordChange,
     current_user = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Change user password"""
-    AuthService.change_password(
+    await AuthService.change_password(
         db, current_user, password_data.current_password, password_data.new_password
     )
     return {"message": "Password changed successfully"}
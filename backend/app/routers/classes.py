@@ -2,20 +2,26 @@
 Classes router
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from ..core.database import get_db
+from ..core.database import get_async_db
+from ..core.pagination import PageParams, keyset_page, finish_page
 from ..core.security import require_teacher, get_current_active_user
 from ..models.user import User, UserRole
 from ..models.school import School
 from ..models.class_model import Class, StudentClass
+from ..models.assignment import Assignment
+from ..models.dashboard_rollup import TeacherDashboardRollup
 from ..schemas.class_schema import (
     ClassCreate, ClassUpdate, ClassResponse, ClassWithStudents, ClassWithStudentCount,
     StudentClassCreate, StudentClassResponse, ClassStats
 )
 from ..schemas.user import UserResponse
+from ..services.ownership_service import OwnershipService
+from ..services.leaderboard_service import leaderboard
 
 router = APIRouter()
 
@@ -28,14 +34,14 @@ async def test_endpoint():
 async def create_class(
     class_data: ClassCreate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new class"""
     # Verify school belongs to teacher
-    school = db.query(School).filter(
+    school = await db.scalar(select(School).where(
         School.id == class_data.school_id,
         School.teacher_id == current_user.id
-    ).first()
+    ))
     
     if not school:
         raise HTTPException(
@@ -45,6 +51,7 @@ async def create_class(
     
     class_obj = Class(
         school_id=class_data.school_id,
+        owner_teacher_id=school.teacher_id,
         name=class_data.name,
         description=class_data.description,
         subject=class_data.subject,
@@ -52,33 +59,36 @@ async def create_class(
     )
     
     db.add(class_obj)
-    db.commit()
-    db.refresh(class_obj)
+    await db.commit()
+    await db.refresh(class_obj)
     
     return ClassResponse.from_orm(class_obj)
 
 @router.get("/", response_model=List[ClassWithStudentCount])
 async def get_classes(
+    response: Response,
     school_id: int = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all classes for current teacher with student counts"""
+    """Get classes for current teacher with student counts, newest first"""
     try:
         from sqlalchemy import func
 
-        query = db.query(
+        query = select(
             Class,
             School.name.label('school_name'),
             func.count(StudentClass.student_id).label('student_count')
-        ).join(School).outerjoin(StudentClass).filter(
-            School.teacher_id == current_user.id
+        ).join(School).outerjoin(StudentClass).where(
+            OwnershipService.owned_by(Class, current_user.id)
         ).group_by(Class.id, School.name)
 
         if school_id:
-            query = query.filter(Class.school_id == school_id)
+            query = query.where(Class.school_id == school_id)
 
-        results = query.all()
+        results = (await db.execute(keyset_page(query, Class.created_at, Class.id, page))).all()
+        results = finish_page(results, page, response, lambda row: (row[0].created_at, row[0].id))
 
         classes_with_counts = []
         for class_obj, school_name, student_count in results:
@@ -99,6 +109,8 @@ async def get_classes(
 
         return classes_with_counts
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Log the error and return mock data as fallback to prevent frontend crashes
         print(f"Error in get_classes: {e}")
@@ -139,13 +151,10 @@ async def get_classes(
 async def get_class(
     class_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get class by ID with students"""
-    class_obj = db.query(Class).join(School).filter(
-        Class.id == class_id,
-        School.teacher_id == current_user.id
-    ).first()
+    class_obj = await OwnershipService.get_owned(db, Class, class_id, current_user.id)
 
     if not class_obj:
         raise HTTPException(
@@ -154,10 +163,11 @@ async def get_class(
         )
 
     # Get students enrolled in this class
-    students = db.query(User).join(StudentClass).filter(
+    result = await db.scalars(select(User).join(StudentClass).where(
         StudentClass.class_id == class_id,
         User.role == UserRole.STUDENT
-    ).all()
+    ))
+    students = result.all()
 
     # Create response with students
     class_data = ClassWithStudents.from_orm(class_obj)
@@ -170,13 +180,10 @@ async def update_class(
     class_id: int,
     class_update: ClassUpdate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update class"""
-    class_obj = db.query(Class).join(School).filter(
-        Class.id == class_id,
-        School.teacher_id == current_user.id
-    ).first()
+    class_obj = await OwnershipService.get_owned(db, Class, class_id, current_user.id)
     
     if not class_obj:
         raise HTTPException(
@@ -189,8 +196,8 @@ async def update_class(
     for field, value in update_data.items():
         setattr(class_obj, field, value)
     
-    db.commit()
-    db.refresh(class_obj)
+    await db.commit()
+    await db.refresh(class_obj)
     
     return ClassResponse.from_orm(class_obj)
 
@@ -198,13 +205,10 @@ async def update_class(
 async def delete_class(
     class_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete class"""
-    class_obj = db.query(Class).join(School).filter(
-        Class.id == class_id,
-        School.teacher_id == current_user.id
-    ).first()
+    class_obj = await OwnershipService.get_owned(db, Class, class_id, current_user.id)
     
     if not class_obj:
         raise HTTPException(
@@ -212,8 +216,9 @@ async def delete_class(
             detail="Class not found"
         )
     
-    db.delete(class_obj)
-    db.commit()
+    await db.delete(class_obj)
+    await db.commit()
+    leaderboard.drop_class(class_id)
     
     return {"message": "Class deleted successfully"}
 
@@ -222,14 +227,11 @@ async def enroll_student(
     class_id: int,
     student_data: StudentClassCreate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enroll student in class"""
     # Verify class belongs to teacher
-    class_obj = db.query(Class).join(School).filter(
-        Class.id == class_id,
-        School.teacher_id == current_user.id
-    ).first()
+    class_obj = await OwnershipService.get_owned(db, Class, class_id, current_user.id)
     
     if not class_obj:
         raise HTTPException(
@@ -238,10 +240,10 @@ async def enroll_student(
         )
     
     # Check if student exists and is a student
-    student = db.query(User).filter(
+    student = await db.scalar(select(User).where(
         User.id == student_data.student_id,
         User.role == "student"
-    ).first()
+    ))
     
     if not student:
         raise HTTPException(
@@ -250,10 +252,10 @@ async def enroll_student(
         )
     
     # Check if already enrolled
-    existing = db.query(StudentClass).filter(
+    existing = await db.scalar(select(StudentClass).where(
         StudentClass.student_id == student_data.student_id,
         StudentClass.class_id == class_id
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(
@@ -268,8 +270,9 @@ async def enroll_student(
     )
     
     db.add(enrollment)
-    db.commit()
-    db.refresh(enrollment)
+    await db.commit()
+    await db.refresh(enrollment)
+    leaderboard.enroll(enrollment.student_id, class_id, class_obj.school_id)
     
     return StudentClassResponse.from_orm(enrollment)
 
@@ -278,14 +281,11 @@ async def remove_student(
     class_id: int,
     student_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Remove student from class"""
     # Verify class belongs to teacher
-    class_obj = db.query(Class).join(School).filter(
-        Class.id == class_id,
-        School.teacher_id == current_user.id
-    ).first()
+    class_obj = await OwnershipService.get_owned(db, Class, class_id, current_user.id)
     
     if not class_obj:
         raise HTTPException(
@@ -294,10 +294,10 @@ async def remove_student(
         )
     
     # Find enrollment
-    enrollment = db.query(StudentClass).filter(
+    enrollment = await db.scalar(select(StudentClass).where(
         StudentClass.student_id == student_id,
         StudentClass.class_id == class_id
-    ).first()
+    ))
     
     if not enrollment:
         raise HTTPException(
@@ -305,8 +305,9 @@ async def remove_student(
             detail="Student not enrolled in this class"
         )
     
-    db.delete(enrollment)
-    db.commit()
+    await db.delete(enrollment)
+    await db.commit()
+    leaderboard.unenroll(student_id, class_id)
     
     return {"message": "Student removed from class successfully"}
 
@@ -314,14 +315,11 @@ async def remove_student(
 async def get_class_stats(
     class_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get class statistics"""
     # Verify class belongs to teacher
-    class_obj = db.query(Class).join(School).filter(
-        Class.id == class_id,
-        School.teacher_id == current_user.id
-    ).first()
+    class_obj = await OwnershipService.get_owned(db, Class, class_id, current_user.id)
     
     if not class_obj:
         raise HTTPException(
@@ -329,13 +327,11 @@ async def get_class_stats(
             detail="Class not found"
         )
     
-    # Calculate stats (simplified for demo)
-    total_students = db.query(StudentClass).filter(StudentClass.class_id == class_id).count()
-    total_assignments = len(class_obj.assignments)
+    rollup = await db.get(TeacherDashboardRollup, class_id)
     
     return ClassStats(
-        total_students=total_students,
-        total_assignments=total_assignments,
-        average_grade=85.0,  # Mock data
-        completion_rate=0.75  # Mock data
+        total_students=rollup.student_count if rollup else 0,
+        total_assignments=rollup.assignment_count if rollup else 0,
+        average_grade=rollup.average_grade if rollup else None,
+        completion_rate=rollup.completion_rate if rollup else 0.0
     )
@@ -0,0 +1,48 @@
+"""
+Background jobs router
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.database import get_async_db
+from ..core.jobs import job_queue
+from ..core.security import get_current_active_user
+from ..models.user import User
+from ..models.job import Job, JobStatus
+from ..schemas.job import JobResponse
+
+router = APIRouter()
+
+FINISHED = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+async def _get_own_job(db: AsyncSession, job_id: int, user_id: int) -> Job:
+    job = await db.scalar(
+        select(Job)
+        .where(Job.id == job_id, Job.user_id == user_id)
+        .execution_options(populate_existing=True)
+    )
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    wait: int = Query(0, ge=0, le=settings.JOB_MAX_WAIT_SECONDS),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a job's status and result; with wait, hold the request until it finishes or wait seconds pass"""
+    job = await _get_own_job(db, job_id, current_user.id)
+    if wait and job.status not in FINISHED:
+        # End the read transaction so the reload below sees the worker's commit
+        await db.rollback()
+        await job_queue.wait(job_id, wait)
+        job = await _get_own_job(db, job_id, current_user.id)
+    return JobResponse.from_orm(job)
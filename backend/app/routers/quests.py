@@ -2,22 +2,36 @@
 Quests router - Mini-games and exercises for students
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, UploadFile, File
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..core.database import get_db
+from ..core.config import settings
+from ..core.database import get_async_db
+from ..core.pagination import PageParams, keyset_page, finish_page
 from ..core.security import require_student, require_teacher, get_current_active_user
-from ..core.utils import save_uploaded_file, mock_ocr_processing, mock_ai_feedback
+from ..core.jobs import job_queue
+from ..core.dictation import check_dictation as check_dictation_text, reference_text
+from ..core.quest_validators import compiled_quest, points_for, score_answers
+from ..core.utils import save_upload_stream, mock_ai_feedback
 from ..models.user import User
-from ..models.quest import Quest, QuestAttempt
+from ..models.quest import Quest, QuestAttempt, QuestType
+from ..models.quest_progress import StudentQuestProgress
 from ..models.correction import Correction
-from ..models.progress import ProgressStats
+from ..models.job import Job
 from ..schemas.quest import (
     QuestCreate, QuestUpdate, QuestResponse, QuestAttemptCreate,
-    QuestAttemptResponse, QuestAttemptResult, QuestProgress
+    QuestAttemptResponse, QuestAttemptResult, QuestProgress, QuestAttemptBatch, QuestAttemptBatchResult
 )
 from ..schemas.correction import CorrectionCreate, CorrectionResponse, CorrectionResult, DictationCheck, DictationResult
+from ..schemas.job import JobResponse
+from ..services.analysis_service import AnalysisService, CORRECTION, DICTATION
+from ..services.leaderboard_service import leaderboard
+from ..services.progress_service import ProgressService
+from ..services.quest_attempt_service import QuestAttemptService, CREATED
+from ..services.write_fix_service import WriteFixService
 
 router = APIRouter()
 
@@ -26,7 +40,7 @@ router = APIRouter()
 async def create_quest(
     quest_data: QuestCreate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new quest (teachers only)"""
     quest = Quest(
@@ -41,58 +55,44 @@ async def create_quest(
     )
     
     db.add(quest)
-    db.commit()
-    db.refresh(quest)
+    await db.commit()
+    await db.refresh(quest)
     
     return QuestResponse.from_orm(quest)
 
 @router.get("/", response_model=List[QuestResponse])
 async def get_quests(
+    response: Response,
     quest_type: Optional[str] = None,
     difficulty: Optional[str] = None,
     subject: Optional[str] = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get available quests"""
-    query = db.query(Quest).filter(Quest.is_active == True)
+    """Get available quests, newest first"""
+    query = select(Quest).where(Quest.is_active == True)
     
     if quest_type:
-        query = query.filter(Quest.quest_type == quest_type)
+        query = query.where(Quest.quest_type == quest_type)
     if difficulty:
-        query = query.filter(Quest.difficulty == difficulty)
+        query = query.where(Quest.difficulty == difficulty)
     if subject:
-        query = query.filter(Quest.subject == subject)
+        query = query.where(Quest.subject == subject)
     
-    quests = query.all()
+    result = await db.scalars(keyset_page(query, Quest.created_at, Quest.id, page))
+    quests = finish_page(result.all(), page, response, lambda q: (q.created_at, q.id))
     return [QuestResponse.from_orm(quest) for quest in quests]
 
-@router.get("/{quest_id}", response_model=QuestResponse)
-async def get_quest(
-    quest_id: int,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Get quest by ID"""
-    quest = db.query(Quest).filter(Quest.id == quest_id, Quest.is_active == True).first()
-    
-    if not quest:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Quest not found"
-        )
-    
-    return QuestResponse.from_orm(quest)
-
 # Quest Attempts (Students)
 @router.post("/attempt", response_model=QuestAttemptResult)
 async def attempt_quest(
     attempt_data: QuestAttemptCreate,
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Attempt a quest"""
-    quest = db.query(Quest).filter(Quest.id == attempt_data.quest_id, Quest.is_active == True).first()
+    quest = await db.scalar(select(Quest).where(Quest.id == attempt_data.quest_id, Quest.is_active == True))
     
     if not quest:
         raise HTTPException(
@@ -100,25 +100,10 @@ async def attempt_quest(
             detail="Quest not found"
         )
     
-    # Simple validation logic (would be more complex in production)
-    is_correct = False
-    points_earned = 0
-    
-    if quest.quest_type == "fill_in_blank":
-        correct_answers = quest.content_json.get("correct_answers", [])
-        user_answers = attempt_data.answer_data.get("answers", [])
-        is_correct = user_answers == correct_answers
-    elif quest.quest_type == "multiple_choice":
-        correct_answer = quest.content_json.get("correct_answer")
-        user_answer = attempt_data.answer_data.get("selected_option")
-        is_correct = user_answer == correct_answer
-    elif quest.quest_type == "reorder":
-        correct_order = quest.content_json.get("correct_order", [])
-        user_order = attempt_data.answer_data.get("order", [])
-        is_correct = user_order == correct_order
-    
-    if is_correct:
-        points_earned = quest.points_reward
+    compiled = compiled_quest(quest)
+    score = (await score_answers([(compiled, attempt_data.answer_data)]))[0]
+    is_correct = score >= 1
+    points_earned = points_for(compiled, score, quest.points_reward)
     
     # Save attempt
     attempt = QuestAttempt(
@@ -132,109 +117,127 @@ async def attempt_quest(
     db.add(attempt)
     
     # Update student progress
-    progress = db.query(ProgressStats).filter(ProgressStats.student_id == current_user.id).first()
-    if progress:
-        progress.quests_completed += 1
-        progress.stars_earned += points_earned
-        if is_correct:
-            progress.streak_days = max(progress.streak_days, 1)  # Simplified streak logic
+    stars = await ProgressService.record(db, current_user.id, quests=1, stars=points_earned)
     
-    db.commit()
-    db.refresh(attempt)
+    await db.commit()
+    leaderboard.set_stars(current_user.id, stars)
+    await db.refresh(attempt)
     
     return QuestAttemptResult(
         is_correct=is_correct,
         points_earned=points_earned,
-        correct_answer=quest.content_json.get("correct_answers", quest.content_json.get("correct_answer")),
+        score=round(score, 4),
+        correct_answer=compiled.correct_answer,
         explanation=quest.content_json.get("explanation", "Good job!")
     )
 
+@router.post("/attempts/batch", response_model=QuestAttemptBatchResult)
+async def attempt_quests_batch(
+    batch: QuestAttemptBatch,
+    current_user: User = Depends(require_student),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Record attempts played offline in one transaction; resent client_attempt_ids are reported as duplicates"""
+    if len(batch.attempts) > settings.QUEST_ATTEMPT_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.QUEST_ATTEMPT_BATCH_MAX} attempts per batch"
+        )
+
+    try:
+        results, stars = await QuestAttemptService.record_batch(db, current_user.id, batch.attempts)
+        await db.commit()
+    except IntegrityError:
+        # A concurrent resend of the same batch won the insert; what it stored now reads as duplicates
+        await db.rollback()
+        results, stars = await QuestAttemptService.record_batch(db, current_user.id, batch.attempts)
+        await db.commit()
+    if stars is not None:
+        leaderboard.set_stars(current_user.id, stars)
+
+    created = [result for result in results if result.status == CREATED]
+    return QuestAttemptBatchResult(
+        results=results,
+        created=len(created),
+        points_earned=sum(result.points_earned for result in created)
+    )
+
 @router.get("/attempts", response_model=List[QuestAttemptResponse])
 async def get_quest_attempts(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get student's quest attempts"""
-    attempts = db.query(QuestAttempt).filter(QuestAttempt.student_id == current_user.id).all()
+    """Get student's quest attempts, newest first"""
+    query = select(QuestAttempt).where(QuestAttempt.student_id == current_user.id)
+    result = await db.scalars(keyset_page(query, QuestAttempt.attempted_at, QuestAttempt.id, page))
+    attempts = finish_page(result.all(), page, response, lambda a: (a.attempted_at, a.id))
     return [QuestAttemptResponse.from_orm(attempt) for attempt in attempts]
 
 @router.get("/progress", response_model=QuestProgress)
 async def get_quest_progress(
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get student's quest progress"""
-    total_quests = db.query(Quest).filter(Quest.is_active == True).count()
-    attempts = db.query(QuestAttempt).filter(QuestAttempt.student_id == current_user.id).all()
-    
-    completed_quests = len(set(attempt.quest_id for attempt in attempts))
-    total_points = sum(attempt.points_earned for attempt in attempts)
-    correct_attempts = len([a for a in attempts if a.is_correct])
-    accuracy_rate = correct_attempts / len(attempts) if attempts else 0
-    
+    """Get student's quest progress from the per-student aggregate"""
+    total_quests = await db.scalar(select(func.count(Quest.id)).where(Quest.is_active == True))
+    progress = await db.get(StudentQuestProgress, current_user.id)
+    if progress is None:
+        return QuestProgress(total_quests=total_quests, completed_quests=0, total_points=0, accuracy_rate=0)
+
     return QuestProgress(
         total_quests=total_quests,
-        completed_quests=completed_quests,
-        total_points=total_points,
-        accuracy_rate=accuracy_rate
+        completed_quests=progress.quests_attempted,
+        total_points=progress.points_total,
+        accuracy_rate=progress.accuracy_rate
     )
 
 # Write & Fix Feature
-@router.post("/write-fix/upload", response_model=CorrectionResult)
+@router.post("/write-fix/upload", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_image_for_correction(
+    response: Response,
     file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None, max_length=100),
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Upload image for OCR and correction"""
-    # Save uploaded file
-    file_content = await file.read()
-    file_path = save_uploaded_file(file_content, file.filename)
-    
-    # Mock OCR processing
-    ocr_result = mock_ocr_processing(file_path)
-    
-    # Mock AI feedback
-    ai_feedback = mock_ai_feedback(ocr_result["extracted_text"], ocr_result["corrections"])
-    
-    # Save correction record
-    correction = Correction(
-        student_id=current_user.id,
-        uploaded_image_url=file_path,
-        original_text=ocr_result["extracted_text"],
-        corrected_text=ocr_result["extracted_text"],  # Would be corrected in production
-        corrections_data=ocr_result["corrections"],
-        feedback=ai_feedback["feedback"],
-        ai_score=ai_feedback["score"],
-        mini_lesson_data=ai_feedback["mini_lesson"]
-    )
-    
-    db.add(correction)
-    
-    # Update student progress
-    progress = db.query(ProgressStats).filter(ProgressStats.student_id == current_user.id).first()
-    if progress:
-        progress.lessons_completed += 1
-        progress.stars_earned += 5  # Points for completing correction
-    
-    db.commit()
-    db.refresh(correction)
-    
-    return CorrectionResult(
-        original_text=ocr_result["extracted_text"],
-        corrected_text=ocr_result["extracted_text"],
-        corrections=ocr_result["corrections"],
-        feedback=ai_feedback["feedback"],
-        score=ai_feedback["score"],
-        mini_lesson=ai_feedback["mini_lesson"],
-        suggestions=ai_feedback["suggestions"]
-    )
+    """Upload image for OCR and correction; poll the returned job for the result"""
+    job = None
+    if idempotency_key:
+        job = await db.scalar(select(Job).where(
+            Job.user_id == current_user.id,
+            Job.idempotency_key == idempotency_key
+        ))
+
+    if job is None:
+        # Save uploaded file
+        stored = await save_upload_stream(file)
+        job = await WriteFixService.enqueue(
+            db, current_user.id, stored.path, stored.sha256, idempotency_key
+        )
+        try:
+            await db.commit()
+        except IntegrityError:
+            # A concurrent retry with the same key won the insert
+            await db.rollback()
+            job = await db.scalar(select(Job).where(
+                Job.user_id == current_user.id,
+                Job.idempotency_key == idempotency_key
+            ))
+            if job is None:
+                raise
+        else:
+            job_queue.notify()
+
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return JobResponse.from_orm(job)
 
 @router.post("/write-fix/text", response_model=CorrectionResult)
 async def submit_text_for_correction(
     correction_data: CorrectionCreate,
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Submit text for correction"""
     if not correction_data.text_content:
@@ -243,8 +246,15 @@ async def submit_text_for_correction(
             detail="Text content is required"
         )
     
-    # Mock AI feedback
-    ai_feedback = mock_ai_feedback(correction_data.text_content, [])
+    # Mock AI feedback, shared by every identical submission
+    ai_feedback = await AnalysisService.get_or_compute(
+        db,
+        CORRECTION,
+        correction_data.text_content,
+        lambda: mock_ai_feedback(correction_data.text_content, []),
+        correction_data.language,
+        correction_data.quest_id
+    )
     
     # Save correction record
     correction = Correction(
@@ -259,13 +269,11 @@ async def submit_text_for_correction(
     db.add(correction)
     
     # Update student progress
-    progress = db.query(ProgressStats).filter(ProgressStats.student_id == current_user.id).first()
-    if progress:
-        progress.lessons_completed += 1
-        progress.stars_earned += 5
+    stars = await ProgressService.record(db, current_user.id, lessons=1, stars=5)
     
-    db.commit()
-    db.refresh(correction)
+    await db.commit()
+    leaderboard.set_stars(current_user.id, stars)
+    await db.refresh(correction)
     
     return CorrectionResult(
         original_text=correction_data.text_content,
@@ -282,32 +290,49 @@ async def submit_text_for_correction(
 async def check_dictation(
     dictation_data: DictationCheck,
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Check dictation text for spelling and grammar"""
-    # Mock dictation checking
-    errors = [
-        {"word": "mistakse", "correction": "mistakes", "position": 10, "type": "spelling"},
-        {"word": "there", "correction": "their", "position": 25, "type": "grammar"}
-    ]
+    """Check dictation text against the quest's reference text"""
+    quest = await db.scalar(select(Quest).where(Quest.id == dictation_data.quest_id, Quest.is_active == True))
+    if not quest:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quest not found"
+        )
     
-    corrected_text = dictation_data.text
-    for error in errors:
-        corrected_text = corrected_text.replace(error["word"], error["correction"])
+    reference = reference_text(quest.content_json)
+    if quest.quest_type != QuestType.DICTATION or reference is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Quest is not a dictation with a reference text"
+        )
     
-    score = max(0, 100 - len(errors) * 10)
+    def analyze():
+        report = check_dictation_text(reference, dictation_data.text)
+        return {"errors": [error.to_dict() for error in report.errors], "score": report.score}
+    
+    # Shared by every identical submission until the quest is edited
+    analysis = await AnalysisService.get_or_compute(
+        db,
+        DICTATION,
+        dictation_data.text,
+        analyze,
+        dictation_data.language,
+        quest.id,
+        quest.updated_at
+    )
+    errors = analysis["errors"]
+    score = analysis["score"]
     
     # Update student progress
-    progress = db.query(ProgressStats).filter(ProgressStats.student_id == current_user.id).first()
-    if progress:
-        progress.lessons_completed += 1
-        progress.stars_earned += max(1, score // 20)
+    stars = await ProgressService.record(db, current_user.id, lessons=1, stars=max(1, int(score // 20)))
     
-    db.commit()
+    await db.commit()
+    leaderboard.set_stars(current_user.id, stars)
     
     return DictationResult(
         original_text=dictation_data.text,
-        corrected_text=corrected_text,
+        corrected_text=reference,
         errors=errors,
         score=score,
         feedback=f"You scored {score}%. {'Great job!' if score >= 80 else 'Keep practicing!'}"
@@ -315,9 +340,31 @@ async def check_dictation(
 
 @router.get("/corrections", response_model=List[CorrectionResponse])
 async def get_corrections(
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get student's correction history"""
-    corrections = db.query(Correction).filter(Correction.student_id == current_user.id).all()
+    """Get student's correction history, newest first"""
+    query = select(Correction).where(Correction.student_id == current_user.id)
+    result = await db.scalars(keyset_page(query, Correction.created_at, Correction.id, page))
+    corrections = finish_page(result.all(), page, response, lambda c: (c.created_at, c.id))
     return [CorrectionResponse.from_orm(correction) for correction in corrections]
+
+# Registered last so /{quest_id} does not shadow /attempts, /progress and /corrections
+@router.get("/{quest_id}", response_model=QuestResponse)
+async def get_quest(
+    quest_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get quest by ID"""
+    quest = await db.scalar(select(Quest).where(Quest.id == quest_id, Quest.is_active == True))
+    
+    if not quest:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quest not found"
+        )
+    
+    return QuestResponse.from_orm(quest)
@@ -3,14 +3,17 @@ Schools router
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.security import require_teacher
 from ..models.user import User
 from ..models.school import School
 from ..schemas.school import SchoolCreate, SchoolUpdate, SchoolResponse, SchoolWithClasses, SchoolWithCounts
+from ..services.leaderboard_service import leaderboard
 
 router = APIRouter()
 
@@ -18,7 +21,7 @@ router = APIRouter()
 async def create_school(
     school_data: SchoolCreate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new school"""
     school = School(
@@ -28,57 +31,58 @@ async def create_school(
     )
     
     db.add(school)
-    db.commit()
-    db.refresh(school)
+    await db.commit()
+    await db.refresh(school)
     
     return SchoolResponse.from_orm(school)
 
 @router.get("/", response_model=List[SchoolWithCounts])
 async def get_schools(
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all schools for current teacher with class and student counts"""
     from sqlalchemy import func
     from ..models.class_model import Class, StudentClass
 
-    schools = db.query(School).filter(School.teacher_id == current_user.id).all()
+    result = await db.scalars(select(School).where(School.teacher_id == current_user.id))
+    schools = result.all()
 
-    schools_with_counts = []
-    for school in schools:
-        # Count classes for this school
-        class_count = db.query(Class).filter(Class.school_id == school.id).count()
+    # One grouped count each rather than two queries per school
+    owned = select(School.id).where(School.teacher_id == current_user.id)
+    class_counts = dict((await db.execute(
+        select(Class.school_id, func.count(Class.id)).where(Class.school_id.in_(owned)).group_by(Class.school_id)
+    )).all())
+    student_counts = dict((await db.execute(
+        select(Class.school_id, func.count(StudentClass.id)).join(Class)
+        .where(Class.school_id.in_(owned)).group_by(Class.school_id)
+    )).all())
 
-        # Count students across all classes in this school
-        student_count = db.query(StudentClass).join(Class).filter(
-            Class.school_id == school.id
-        ).count()
-
-        school_data = SchoolWithCounts(
+    return [
+        SchoolWithCounts(
             id=school.id,
             teacher_id=school.teacher_id,
             name=school.name,
             description=school.description,
             created_at=school.created_at,
             updated_at=school.updated_at,
-            class_count=class_count,
-            student_count=student_count
+            class_count=class_counts.get(school.id, 0),
+            student_count=student_counts.get(school.id, 0)
         )
-        schools_with_counts.append(school_data)
-
-    return schools_with_counts
+        for school in schools
+    ]
 
 @router.get("/{school_id}", response_model=SchoolWithClasses)
 async def get_school(
     school_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get school by ID with classes"""
-    school = db.query(School).filter(
+    school = await db.scalar(select(School).options(selectinload(School.classes)).where(
         School.id == school_id,
         School.teacher_id == current_user.id
-    ).first()
+    ))
     
     if not school:
         raise HTTPException(
@@ -93,13 +97,13 @@ async def update_school(
     school_id: int,
     school_update: SchoolUpdate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update school"""
-    school = db.query(School).filter(
+    school = await db.scalar(select(School).where(
         School.id == school_id,
         School.teacher_id == current_user.id
-    ).first()
+    ))
     
     if not school:
         raise HTTPException(
@@ -112,8 +116,8 @@ async def update_school(
     for field, value in update_data.items():
         setattr(school, field, value)
     
-    db.commit()
-    db.refresh(school)
+    await db.commit()
+    await db.refresh(school)
     
     return SchoolResponse.from_orm(school)
 
@@ -121,13 +125,13 @@ async def update_school(
 async def delete_school(
     school_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete school"""
-    school = db.query(School).filter(
+    school = await db.scalar(select(School).where(
         School.id == school_id,
         School.teacher_id == current_user.id
-    ).first()
+    ))
     
     if not school:
         raise HTTPException(
@@ -135,7 +139,8 @@ async def delete_school(
             detail="School not found"
         )
     
-    db.delete(school)
-    db.commit()
+    await db.delete(school)
+    await db.commit()
+    leaderboard.drop_school(school_id)
     
     return {"message": "School deleted successfully"}
@@ -2,11 +2,12 @@
 Statistics and dashboard router
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
 
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.security import require_student, require_teacher, get_current_active_user
 from ..core.utils import format_progress_data, calculate_streak
 from ..models.user import User
@@ -16,34 +17,38 @@ from ..models.assignment import Assignment
 from ..models.submission import Submission
 from ..models.progress import ProgressStats
 from ..models.quest import Quest, QuestAttempt
+from ..models.dashboard_rollup import TeacherDashboardRollup
 from ..schemas.progress import (
     ProgressStatsResponse, StudentDashboard, ParentStats,
     TeacherDashboard, ClassDashboard
 )
+from ..schemas.class_schema import ClassResponse
+from ..schemas.submission import SubmissionResponse
+from ..services.ownership_service import OwnershipService
+from ..services.leaderboard_service import leaderboard, GLOBAL, CLASS
+from ..services.progress_service import ProgressService
+from ..services.activity_service import ActivityService
+from ..services.stats_rollup_service import StatsRollupService
 
 router = APIRouter()
 
 @router.get("/dashboard/student", response_model=StudentDashboard)
 async def get_student_dashboard(
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get student dashboard data"""
-    # Get or create progress stats
-    progress = db.query(ProgressStats).filter(ProgressStats.student_id == current_user.id).first()
-    if not progress:
-        progress = ProgressStats(student_id=current_user.id)
-        db.add(progress)
-        db.commit()
-        db.refresh(progress)
+    progress = await ProgressService.get_or_create(db, current_user.id)
     
     # Get available quests
-    available_quests = db.query(Quest).filter(Quest.is_active == True).limit(5).all()
+    result = await db.scalars(select(Quest).where(Quest.is_active == True).limit(5))
+    available_quests = result.all()
     
     # Get recent assignments from enrolled classes
-    recent_assignments = db.query(Assignment).join(Class).join(StudentClass).filter(
+    result = await db.scalars(select(Assignment).join(Class).join(StudentClass).where(
         StudentClass.student_id == current_user.id
-    ).order_by(Assignment.created_at.desc()).limit(5).all()
+    ).order_by(Assignment.created_at.desc()).limit(5))
+    recent_assignments = result.all()
     
     # Format progress data
     progress_data = format_progress_data({
@@ -74,54 +79,42 @@ async def get_student_dashboard(
 @router.get("/dashboard/teacher", response_model=TeacherDashboard)
 async def get_teacher_dashboard(
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get teacher dashboard data"""
-    # Get teacher's schools and classes
-    schools = db.query(School).filter(School.teacher_id == current_user.id).all()
-    total_schools = len(schools)
-    total_classes = db.query(Class).join(School).filter(School.teacher_id == current_user.id).count()
-
-    # Get total students across all classes
-    total_students = db.query(StudentClass).join(Class).join(School).filter(
-        School.teacher_id == current_user.id
-    ).count()
-
-    # Get total assignments
-    total_assignments = db.query(Assignment).join(Class).join(School).filter(
-        School.teacher_id == current_user.id
-    ).count()
+    total_schools = await db.scalar(
+        select(func.count(School.id)).where(School.teacher_id == current_user.id)
+    )
 
-    # Get pending submissions
-    pending_submissions = db.query(Submission).join(Assignment).join(Class).join(School).filter(
-        School.teacher_id == current_user.id,
-        Submission.is_graded == False
-    ).count()
+    # Per-class counters maintained on every write (see models/dashboard_rollup.py)
+    rollups = (await db.execute(
+        select(TeacherDashboardRollup, Class.name)
+        .join(Class, Class.id == TeacherDashboardRollup.class_id)
+        .where(TeacherDashboardRollup.teacher_id == current_user.id)
+        .order_by(TeacherDashboardRollup.class_id)
+    )).all()
     
-    # Mock recent activities
-    recent_activities = [
-        {"type": "submission", "message": "New submission from John Doe", "timestamp": "2024-01-15T10:30:00"},
-        {"type": "enrollment", "message": "Sarah Smith joined French Class A", "timestamp": "2024-01-15T09:15:00"},
-        {"type": "assignment", "message": "Math homework due tomorrow", "timestamp": "2024-01-14T16:45:00"}
-    ]
+    recent_activities = await ActivityService.class_feed(db, [rollup.class_id for rollup, _ in rollups])
     
-    # Mock class performance
-    class_performance = []
-    for school in schools:
-        for class_obj in school.classes:
-            class_performance.append({
-                "class_name": class_obj.name,
-                "student_count": len(class_obj.student_classes),
-                "average_grade": 85.0,  # Mock data
-                "completion_rate": 0.8   # Mock data
-            })
+    class_performance = [
+        {
+            "class_id": rollup.class_id,
+            "class_name": class_name,
+            "student_count": rollup.student_count,
+            "assignment_count": rollup.assignment_count,
+            "pending_submissions": rollup.pending_count,
+            "average_grade": rollup.average_grade,
+            "completion_rate": rollup.completion_rate
+        }
+        for rollup, class_name in rollups
+    ]
     
     return TeacherDashboard(
         total_schools=total_schools,
-        total_students=total_students,
-        total_classes=total_classes,
-        total_assignments=total_assignments,
-        pending_submissions=pending_submissions,
+        total_students=sum(rollup.student_count for rollup, _ in rollups),
+        total_classes=len(rollups),
+        total_assignments=sum(rollup.assignment_count for rollup, _ in rollups),
+        pending_submissions=sum(rollup.pending_count for rollup, _ in rollups),
         recent_activities=recent_activities,
         class_performance=class_performance
     )
@@ -130,51 +123,81 @@ async def get_teacher_dashboard(
 async def get_class_dashboard(
     class_id: int,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get class dashboard data"""
-    # Verify class belongs to teacher
-    class_obj = db.query(Class).join(School).filter(
-        Class.id == class_id,
-        School.teacher_id == current_user.id
-    ).first()
+    # Verify class belongs to teacher and fetch its rollup counters
+    row = (await db.execute(
+        select(Class, TeacherDashboardRollup)
+        .outerjoin(TeacherDashboardRollup, TeacherDashboardRollup.class_id == Class.id)
+        .where(Class.id == class_id, OwnershipService.owned_by(Class, current_user.id))
+    )).first()
     
-    if not class_obj:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Class not found"
         )
+    class_obj, rollup = row
+    
+    # Roster with progress and per-student submission stats in one query
+    submission_stats = (
+        select(
+            Submission.student_id,
+            func.count(Submission.id).label("submission_count"),
+            func.avg(case((Submission.is_graded == True, Submission.grade))).label("average_grade")
+        )
+        .join(Assignment, Assignment.id == Submission.assignment_id)
+        .where(Assignment.class_id == class_id)
+        .group_by(Submission.student_id)
+        .subquery()
+    )
+    roster = (await db.execute(
+        select(
+            User.id,
+            User.name,
+            ProgressStats.lessons_completed,
+            ProgressStats.stars_earned,
+            ProgressStats.last_activity_date,
+            func.coalesce(submission_stats.c.submission_count, 0),
+            submission_stats.c.average_grade
+        )
+        .select_from(StudentClass)
+        .join(User, User.id == StudentClass.student_id)
+        .outerjoin(ProgressStats, ProgressStats.student_id == User.id)
+        .outerjoin(submission_stats, submission_stats.c.student_id == User.id)
+        .where(StudentClass.class_id == class_id)
+        .order_by(User.name, User.id)
+    )).all()
     
-    # Get class statistics
-    student_count = db.query(StudentClass).filter(StudentClass.class_id == class_id).count()
-    assignment_count = db.query(Assignment).filter(Assignment.class_id == class_id).count()
+    assignment_count = rollup.assignment_count if rollup else 0
+    student_progress = [
+        {
+            "student_id": student_id,
+            "student_name": name,
+            "lessons_completed": lessons_completed or 0,
+            "stars_earned": stars_earned or 0,
+            "last_activity": last_activity,
+            "submission_count": submission_count,
+            "average_grade": average_grade,
+            "completion_rate": min(1.0, submission_count / assignment_count) if assignment_count else 0.0
+        }
+        for student_id, name, lessons_completed, stars_earned, last_activity, submission_count, average_grade in roster
+    ]
     
     # Get recent submissions
-    recent_submissions = db.query(Submission).join(Assignment).filter(
+    result = await db.scalars(select(Submission).join(Assignment).where(
         Assignment.class_id == class_id
-    ).order_by(Submission.submitted_at.desc()).limit(10).all()
-    
-    # Mock student progress
-    student_progress = []
-    enrollments = db.query(StudentClass).filter(StudentClass.class_id == class_id).all()
-    for enrollment in enrollments:
-        student = enrollment.student
-        progress = db.query(ProgressStats).filter(ProgressStats.student_id == student.id).first()
-        student_progress.append({
-            "student_id": student.id,
-            "student_name": student.name,
-            "lessons_completed": progress.lessons_completed if progress else 0,
-            "stars_earned": progress.stars_earned if progress else 0,
-            "last_activity": progress.last_activity_date if progress else None
-        })
+    ).order_by(Submission.submitted_at.desc(), Submission.id.desc()).limit(10))
+    recent_submissions = result.all()
     
     return ClassDashboard(
-        class_info={},  # Would be ClassResponse
-        student_count=student_count,
+        class_info=ClassResponse.from_orm(class_obj),
+        student_count=len(roster),
         assignment_count=assignment_count,
-        average_grade=85.0,  # Mock data
-        completion_rate=0.75,  # Mock data
-        recent_submissions=[],  # Would be SubmissionResponse list
+        average_grade=rollup.average_grade if rollup else None,
+        completion_rate=rollup.completion_rate if rollup else 0.0,
+        recent_submissions=[SubmissionResponse.from_orm(submission) for submission in recent_submissions],
         student_progress=student_progress
     )
 
@@ -182,11 +205,11 @@ async def get_class_dashboard(
 async def get_parent_stats(
     student_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get parent statistics for student"""
     # Verify access (student can view own stats, or parent email matches)
-    student = db.query(User).filter(User.id == student_id, User.role == "student").first()
+    student = await db.scalar(select(User).where(User.id == student_id, User.role == "student"))
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -201,31 +224,14 @@ async def get_parent_stats(
         )
     
     # Get student progress
-    progress = db.query(ProgressStats).filter(ProgressStats.student_id == student_id).first()
+    progress = await db.scalar(select(ProgressStats).where(ProgressStats.student_id == student_id))
     
-    # Mock weekly and monthly stats
-    weekly_stats = {
-        "time_spent": 120,  # minutes
-        "lessons_completed": 5,
-        "quests_completed": 8,
-        "errors_corrected": 12,
-        "streak_days": 4
-    }
+    # Weekly and monthly totals from the daily rollups
+    stats = await StatsRollupService.student_stats(db, student_id)
+    weekly_stats = {**stats["weekly"], "streak_days": progress.streak_days if progress else 0}
+    monthly_stats = stats["monthly"]
     
-    monthly_stats = {
-        "time_spent": 480,  # minutes
-        "lessons_completed": 20,
-        "quests_completed": 35,
-        "errors_corrected": 45,
-        "average_score": 85.5
-    }
-    
-    # Mock recent activities
-    recent_activities = [
-        {"date": "2024-01-15", "activity": "Completed French dictation", "score": 90},
-        {"date": "2024-01-14", "activity": "Submitted math homework", "score": 85},
-        {"date": "2024-01-13", "activity": "Completed spelling quest", "score": 95}
-    ]
+    recent_activities = await ActivityService.student_feed(db, student_id)
     
     # Mock improvement areas and achievements
     improvement_areas = ["Spelling accuracy", "Grammar usage"]
@@ -243,39 +249,73 @@ async def get_parent_stats(
 @router.get("/progress", response_model=ProgressStatsResponse)
 async def get_progress_stats(
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get student's progress statistics"""
-    progress = db.query(ProgressStats).filter(ProgressStats.student_id == current_user.id).first()
-    
-    if not progress:
-        # Create initial progress record
-        progress = ProgressStats(student_id=current_user.id)
-        db.add(progress)
-        db.commit()
-        db.refresh(progress)
+    progress = await ProgressService.get_or_create(db, current_user.id)
     
     return ProgressStatsResponse.from_orm(progress)
 
 @router.get("/leaderboard")
 async def get_leaderboard(
+    scope: str = Query(GLOBAL, pattern="^(global|class|school)$"),
+    scope_id: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=100),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get student leaderboard"""
-    # Get top students by stars earned
-    top_students = db.query(ProgressStats, User).join(User).filter(
-        User.role == "student"
-    ).order_by(ProgressStats.stars_earned.desc()).limit(10).all()
-    
-    leaderboard = []
-    for i, (progress, user) in enumerate(top_students, 1):
-        leaderboard.append({
-            "rank": i,
-            "student_name": user.name,
-            "stars_earned": progress.stars_earned,
-            "lessons_completed": progress.lessons_completed,
-            "streak_days": progress.streak_days
+    """Get student leaderboard, globally or for one class or school, with the caller's rank"""
+    if scope == GLOBAL:
+        scope_id = None
+    elif scope_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="scope_id is required for class and school leaderboards"
+        )
+
+    await leaderboard.ensure_loaded(db)
+
+    if scope != GLOBAL:
+        if current_user.role == "teacher":
+            if scope == CLASS:
+                allowed = await OwnershipService.owns(db, Class, scope_id, current_user.id)
+            else:
+                allowed = await db.scalar(select(School.id).where(
+                    School.id == scope_id,
+                    School.teacher_id == current_user.id
+                )) is not None
+        else:
+            allowed = leaderboard.is_member(current_user.id, scope, scope_id)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+
+    ranked = leaderboard.top(limit, scope, scope_id)
+    details = {}
+    if ranked:
+        rows = (await db.execute(
+            select(User.id, User.name, ProgressStats.lessons_completed, ProgressStats.streak_days)
+            .outerjoin(ProgressStats, ProgressStats.student_id == User.id)
+            .where(User.id.in_([student_id for _, student_id, _ in ranked]))
+        )).all()
+        details = {row[0]: row for row in rows}
+
+    entries = []
+    for rank, student_id, stars in ranked:
+        _, name, lessons_completed, streak_days = details.get(student_id, (student_id, None, 0, 0))
+        entries.append({
+            "rank": rank,
+            "student_id": student_id,
+            "student_name": name,
+            "stars_earned": stars,
+            "lessons_completed": lessons_completed or 0,
+            "streak_days": streak_days or 0
         })
-    
-    return {"leaderboard": leaderboard}
+
+    return {
+        "leaderboard": entries,
+        "my_rank": leaderboard.rank(current_user.id, scope, scope_id),
+        "total_students": leaderboard.size(scope, scope_id)
+    }
@@ -2,22 +2,24 @@
 Submissions router
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from ..core.database import get_db
+from ..core.database import get_async_db
+from ..core.pagination import PageParams, keyset_page, finish_page
 from ..core.security import require_teacher, require_student, get_current_active_user
-from ..core.utils import save_uploaded_file
+from ..core.utils import save_upload_stream
 from ..models.user import User
-from ..models.school import School
-from ..models.class_model import Class, StudentClass
+from ..models.class_model import StudentClass
 from ..models.assignment import Assignment
 from ..models.submission import Submission
 from ..schemas.submission import (
     SubmissionCreate, SubmissionUpdate, SubmissionResponse,
     SubmissionGrade, SubmissionWithDetails
 )
+from ..services.ownership_service import OwnershipService
 
 router = APIRouter()
 
@@ -25,11 +27,11 @@ router = APIRouter()
 async def create_submission(
     submission_data: SubmissionCreate,
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new submission"""
     # Verify assignment exists and student is enrolled
-    assignment = db.query(Assignment).filter(Assignment.id == submission_data.assignment_id).first()
+    assignment = await db.scalar(select(Assignment).where(Assignment.id == submission_data.assignment_id))
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -37,10 +39,10 @@ async def create_submission(
         )
     
     # Check if student is enrolled in the class
-    enrollment = db.query(StudentClass).filter(
+    enrollment = await db.scalar(select(StudentClass).where(
         StudentClass.student_id == current_user.id,
         StudentClass.class_id == assignment.class_id
-    ).first()
+    ))
     
     if not enrollment:
         raise HTTPException(
@@ -49,10 +51,10 @@ async def create_submission(
         )
     
     # Check if submission already exists
-    existing = db.query(Submission).filter(
+    existing = await db.scalar(select(Submission).where(
         Submission.assignment_id == submission_data.assignment_id,
         Submission.student_id == current_user.id
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(
@@ -63,12 +65,13 @@ async def create_submission(
     submission = Submission(
         assignment_id=submission_data.assignment_id,
         student_id=current_user.id,
+        owner_teacher_id=assignment.owner_teacher_id,
         text_content=submission_data.text_content
     )
     
     db.add(submission)
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    await db.refresh(submission)
 
     return SubmissionResponse.from_orm(submission)
 
@@ -77,21 +80,21 @@ async def upload_submission(
     assignment_id: int,
     file: UploadFile = File(...),
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload file submission"""
     # Verify assignment and enrollment (same as above)
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    assignment = await db.scalar(select(Assignment).where(Assignment.id == assignment_id))
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Assignment not found"
         )
     
-    enrollment = db.query(StudentClass).filter(
+    enrollment = await db.scalar(select(StudentClass).where(
         StudentClass.student_id == current_user.id,
         StudentClass.class_id == assignment.class_id
-    ).first()
+    ))
     
     if not enrollment:
         raise HTTPException(
@@ -100,10 +103,10 @@ async def upload_submission(
         )
     
     # Check if submission already exists
-    existing = db.query(Submission).filter(
+    existing = await db.scalar(select(Submission).where(
         Submission.assignment_id == assignment_id,
         Submission.student_id == current_user.id
-    ).first()
+    ))
     
     if existing:
         raise HTTPException(
@@ -112,29 +115,32 @@ async def upload_submission(
         )
     
     # Save uploaded file
-    file_content = await file.read()
-    file_path = save_uploaded_file(file_content, file.filename)
+    stored = await save_upload_stream(file)
     
     submission = Submission(
         assignment_id=assignment_id,
         student_id=current_user.id,
-        file_url=file_path
+        owner_teacher_id=assignment.owner_teacher_id,
+        file_url=stored.path,
+        content_hash=stored.sha256
     )
     
     db.add(submission)
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    await db.refresh(submission)
     
     return SubmissionResponse.from_orm(submission)
 
 @router.get("/", response_model=List[SubmissionWithDetails])
 async def get_submissions(
+    response: Response,
     assignment_id: int = None,
     student_id: int = None,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get submissions with student and assignment details"""
+    """Get submissions with student and assignment details, newest first"""
     try:
         from sqlalchemy.orm import joinedload
 
@@ -142,25 +148,25 @@ async def get_submissions(
 
         if user_role == "teacher":
             # Teachers can see all submissions from their classes
-            query = db.query(Submission).options(
+            query = select(Submission).options(
                 joinedload(Submission.student),
                 joinedload(Submission.assignment)
-            ).join(Assignment).join(Class).join(School).filter(
-                School.teacher_id == current_user.id
-            )
+            ).where(OwnershipService.owned_by(Submission, current_user.id))
             if assignment_id:
-                query = query.filter(Submission.assignment_id == assignment_id)
+                query = query.where(Submission.assignment_id == assignment_id)
             if student_id:
-                query = query.filter(Submission.student_id == student_id)
+                query = query.where(Submission.student_id == student_id)
         else:
             # Students can only see their own submissions
-            query = db.query(Submission).options(
+            query = select(Submission).options(
+                joinedload(Submission.student),
                 joinedload(Submission.assignment)
-            ).filter(Submission.student_id == current_user.id)
+            ).where(Submission.student_id == current_user.id)
             if assignment_id:
-                query = query.filter(Submission.assignment_id == assignment_id)
+                query = query.where(Submission.assignment_id == assignment_id)
 
-        submissions = query.all()
+        result = await db.scalars(keyset_page(query, Submission.submitted_at, Submission.id, page))
+        submissions = finish_page(result.all(), page, response, lambda s: (s.submitted_at, s.id))
 
         # Create detailed response with proper names and grades
         detailed_submissions = []
@@ -183,6 +189,8 @@ async def get_submissions(
 
         return detailed_submissions
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_submissions: {e}")
         import traceback
@@ -196,16 +204,16 @@ async def get_submissions(
 async def get_submission(
     submission_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get submission by ID with full details"""
     try:
         from sqlalchemy.orm import joinedload
 
-        submission = db.query(Submission).options(
+        submission = await db.scalar(select(Submission).options(
             joinedload(Submission.student),
             joinedload(Submission.assignment)
-        ).filter(Submission.id == submission_id).first()
+        ).where(Submission.id == submission_id))
 
         if not submission:
             raise HTTPException(
@@ -218,11 +226,7 @@ async def get_submission(
         # Check permissions
         if user_role == "teacher":
             # Verify submission belongs to teacher's class
-            assignment = db.query(Assignment).join(Class).join(School).filter(
-                Assignment.id == submission.assignment_id,
-                School.teacher_id == current_user.id
-            ).first()
-            if not assignment:
+            if submission.owner_teacher_id != current_user.id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not enough permissions"
@@ -268,16 +272,16 @@ async def grade_submission(
     submission_id: int,
     grade_data: SubmissionGrade,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Grade a submission (teacher only)"""
     try:
         from sqlalchemy.orm import joinedload
 
-        submission = db.query(Submission).options(
+        submission = await db.scalar(select(Submission).options(
             joinedload(Submission.student),
             joinedload(Submission.assignment)
-        ).filter(Submission.id == submission_id).first()
+        ).where(Submission.id == submission_id))
 
         if not submission:
             raise HTTPException(
@@ -286,12 +290,7 @@ async def grade_submission(
             )
 
         # Verify submission belongs to teacher's class
-        assignment = db.query(Assignment).join(Class).join(School).filter(
-            Assignment.id == submission.assignment_id,
-            School.teacher_id == current_user.id
-        ).first()
-
-        if not assignment:
+        if submission.owner_teacher_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
@@ -302,8 +301,7 @@ async def grade_submission(
         submission.feedback = grade_data.feedback
         submission.is_graded = True
 
-        db.commit()
-        db.refresh(submission)
+        await db.commit()
 
         # Return detailed response
         detailed_submission = SubmissionWithDetails(
@@ -338,13 +336,13 @@ async def update_submission(
     submission_id: int,
     submission_update: SubmissionUpdate,
     current_user: User = Depends(require_student),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update submission (students only, before grading)"""
-    submission = db.query(Submission).filter(
+    submission = await db.scalar(select(Submission).where(
         Submission.id == submission_id,
         Submission.student_id == current_user.id
-    ).first()
+    ))
     
     if not submission:
         raise HTTPException(
@@ -363,8 +361,8 @@ async def update_submission(
     for field, value in update_data.items():
         setattr(submission, field, value)
     
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    await db.refresh(submission)
     
     return SubmissionResponse.from_orm(submission)
 
@@ -373,13 +371,10 @@ async def grade_submission(
     submission_id: int,
     grade_data: SubmissionGrade,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Grade submission (teachers only)"""
-    submission = db.query(Submission).join(Assignment).join(Class).join(School).filter(
-        Submission.id == submission_id,
-        School.teacher_id == current_user.id
-    ).first()
+    submission = await OwnershipService.get_owned(db, Submission, submission_id, current_user.id)
     
     if not submission:
         raise HTTPException(
@@ -390,9 +385,9 @@ async def grade_submission(
     submission.grade = grade_data.grade
     submission.feedback = grade_data.feedback
     submission.is_graded = True
-    submission.graded_at = db.func.now()
+    submission.graded_at = func.now()
     
-    db.commit()
-    db.refresh(submission)
+    await db.commit()
+    await db.refresh(submission)
     
     return SubmissionResponse.from_orm(submission)
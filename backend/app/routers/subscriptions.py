@@ -3,12 +3,13 @@ Subscriptions router - Teacher payment and subscription management
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import List
 
-from ..core.database import get_db
-from ..core.security import require_teacher, get_current_active_user
+from ..core.database import get_async_db
+from ..core.security import require_teacher, get_current_active_user, invalidate_principal
 from ..core.config import settings
 from ..models.user import User, SubscriptionStatus
 from ..models.subscription import Subscription, SubscriptionPlan, PaymentStatus
@@ -23,11 +24,11 @@ router = APIRouter()
 async def create_subscription(
     subscription_data: SubscriptionCreate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new subscription for teacher"""
     # Check if teacher already has a subscription
-    existing = db.query(Subscription).filter(Subscription.teacher_id == current_user.id).first()
+    existing = await db.scalar(select(Subscription).where(Subscription.teacher_id == current_user.id))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -49,18 +50,18 @@ async def create_subscription(
     )
     
     db.add(subscription)
-    db.commit()
-    db.refresh(subscription)
+    await db.commit()
+    await db.refresh(subscription)
     
     return SubscriptionResponse.from_orm(subscription)
 
 @router.get("/", response_model=SubscriptionResponse)
 async def get_subscription(
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get teacher's subscription"""
-    subscription = db.query(Subscription).filter(Subscription.teacher_id == current_user.id).first()
+    subscription = await db.scalar(select(Subscription).where(Subscription.teacher_id == current_user.id))
     
     if not subscription:
         raise HTTPException(
@@ -74,10 +75,10 @@ async def get_subscription(
 async def update_subscription(
     subscription_update: SubscriptionUpdate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update teacher's subscription"""
-    subscription = db.query(Subscription).filter(Subscription.teacher_id == current_user.id).first()
+    subscription = await db.scalar(select(Subscription).where(Subscription.teacher_id == current_user.id))
     
     if not subscription:
         raise HTTPException(
@@ -97,8 +98,8 @@ async def update_subscription(
             price = price * 12 * 0.9
         subscription.price = price
     
-    db.commit()
-    db.refresh(subscription)
+    await db.commit()
+    await db.refresh(subscription)
     
     return SubscriptionResponse.from_orm(subscription)
 
@@ -106,13 +107,13 @@ async def update_subscription(
 async def process_payment(
     payment_data: PaymentCreate,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Process subscription payment (mock implementation)"""
-    subscription = db.query(Subscription).filter(
+    subscription = await db.scalar(select(Subscription).where(
         Subscription.id == payment_data.subscription_id,
         Subscription.teacher_id == current_user.id
-    ).first()
+    ))
     
     if not subscription:
         raise HTTPException(
@@ -136,10 +137,12 @@ async def process_payment(
             subscription.end_date = subscription.start_date + timedelta(days=365)
         
         # Update user subscription status
-        current_user.subscription_status = SubscriptionStatus.ACTIVE
+        user = await db.merge(current_user, load=False)
+        user.subscription_status = SubscriptionStatus.ACTIVE
         
-        db.commit()
-        db.refresh(subscription)
+        await db.commit()
+        await db.refresh(subscription)
+        invalidate_principal(user.id)
         
         return PaymentResponse(
             success=True,
@@ -149,7 +152,7 @@ async def process_payment(
         )
     else:
         subscription.status = PaymentStatus.FAILED
-        db.commit()
+        await db.commit()
         
         return PaymentResponse(
             success=False,
@@ -161,10 +164,10 @@ async def process_payment(
 @router.post("/cancel")
 async def cancel_subscription(
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cancel teacher's subscription"""
-    subscription = db.query(Subscription).filter(Subscription.teacher_id == current_user.id).first()
+    subscription = await db.scalar(select(Subscription).where(Subscription.teacher_id == current_user.id))
     
     if not subscription:
         raise HTTPException(
@@ -175,19 +178,21 @@ async def cancel_subscription(
     # Cancel subscription
     subscription.status = PaymentStatus.CANCELLED
     subscription.auto_renew = False
-    current_user.subscription_status = SubscriptionStatus.EXPIRED
+    user = await db.merge(current_user, load=False)
+    user.subscription_status = SubscriptionStatus.EXPIRED
     
-    db.commit()
+    await db.commit()
+    invalidate_principal(user.id)
     
     return {"message": "Subscription cancelled successfully"}
 
 @router.post("/renew", response_model=SubscriptionResponse)
 async def renew_subscription(
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Renew teacher's subscription"""
-    subscription = db.query(Subscription).filter(Subscription.teacher_id == current_user.id).first()
+    subscription = await db.scalar(select(Subscription).where(Subscription.teacher_id == current_user.id))
     
     if not subscription:
         raise HTTPException(
@@ -203,9 +208,11 @@ async def renew_subscription(
         else:  # YEARLY
             subscription.end_date = subscription.end_date + timedelta(days=365)
         
-        current_user.subscription_status = SubscriptionStatus.ACTIVE
-        db.commit()
-        db.refresh(subscription)
+        user = await db.merge(current_user, load=False)
+        user.subscription_status = SubscriptionStatus.ACTIVE
+        await db.commit()
+        await db.refresh(subscription)
+        invalidate_principal(user.id)
         
         return SubscriptionResponse.from_orm(subscription)
     else:
@@ -217,10 +224,10 @@ async def renew_subscription(
 @router.get("/status")
 async def get_subscription_status(
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get subscription status and details"""
-    subscription = db.query(Subscription).filter(Subscription.teacher_id == current_user.id).first()
+    subscription = await db.scalar(select(Subscription).where(Subscription.teacher_id == current_user.id))
     
     if not subscription:
         return {
@@ -235,8 +242,10 @@ async def get_subscription_status(
     
     if is_expired and subscription.status == PaymentStatus.COMPLETED:
         subscription.status = PaymentStatus.CANCELLED
-        current_user.subscription_status = SubscriptionStatus.EXPIRED
-        db.commit()
+        user = await db.merge(current_user, load=False)
+        user.subscription_status = SubscriptionStatus.EXPIRED
+        await db.commit()
+        invalidate_principal(user.id)
     
     return {
         "has_subscription": True,
@@ -3,11 +3,12 @@ Users router
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from ..core.database import get_db
-from ..core.security import get_current_active_user, require_teacher
+from ..core.database import get_async_db
+from ..core.security import get_current_active_user, require_teacher, invalidate_principal
 from ..models.user import User
 from ..schemas.user import UserResponse, UserUpdate
 
@@ -18,17 +19,18 @@ async def get_users(
     skip: int = 0,
     limit: int = 100,
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all users (teachers only)"""
-    users = db.query(User).offset(skip).limit(limit).all()
+    result = await db.scalars(select(User).offset(skip).limit(limit))
+    users = result.all()
     return [UserResponse.from_orm(user) for user in users]
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user by ID"""
     # Users can only view their own profile, teachers can view any
@@ -38,7 +40,7 @@ async def get_user(
             detail="Not enough permissions"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -52,7 +54,7 @@ async def update_user(
     user_id: int,
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user"""
     # Users can only update their own profile
@@ -62,7 +64,7 @@ async def update_user(
             detail="Not enough permissions"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,8 +76,9 @@ async def update_user(
     for field, value in update_data.items():
         setattr(user, field, value)
     
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.id)
     
     return UserResponse.from_orm(user)
 
@@ -83,12 +86,13 @@ async def update_user(
 async def search_students(
     q: str = "",
     current_user: User = Depends(require_teacher),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search students by name or email (teachers only)"""
-    students = db.query(User).filter(
+    result = await db.scalars(select(User).where(
         User.role == "student",
         (User.name.contains(q) | User.email.contains(q))
-    ).limit(50).all()
+    ).limit(50))
+    students = result.all()
     
     return [UserResponse.from_orm(student) for student in students]
@@ -2,12 +2,14 @@
 Correction schemas for Write & Fix feature
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class CorrectionCreate(BaseModel):
     text_content: Optional[str] = None  # Direct text input
+    language: Optional[str] = Field(None, max_length=10)  # e.g. "fr", "ar"
+    quest_id: Optional[int] = None  # Exercise the text answers, if any
 
 class CorrectionResponse(BaseModel):
     id: int
@@ -15,7 +17,7 @@ class CorrectionResponse(BaseModel):
     uploaded_image_url: Optional[str] = None
     original_text: Optional[str] = None
     corrected_text: Optional[str] = None
-    corrections_data: Optional[Dict[str, Any]] = None
+    corrections_data: Optional[List[Dict[str, Any]]] = None
     feedback: Optional[str] = None
     ai_score: Optional[float] = None
     mini_lesson_data: Optional[Dict[str, Any]] = None
@@ -35,10 +37,12 @@ class CorrectionResult(BaseModel):
 
 class DictationCheck(BaseModel):
     text: str
+    language: Optional[str] = Field(None, max_length=10)
+    quest_id: int  # Dictation quest whose content_json["text"] is the reference
 
 class DictationResult(BaseModel):
     original_text: str
-    corrected_text: str
-    errors: List[Dict[str, Any]]
+    corrected_text: str  # The reference text
+    errors: List[Dict[str, Any]]  # type, word, correction, position (word index in original_text)
     score: float
     feedback: str
@@ -0,0 +1,28 @@
+"""
+Background job schemas
+"""
+
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    payload: Optional[Dict[str, Any]] = None  # e.g. {"correction_id": 12} for write_fix jobs
+    result: Optional[Dict[str, Any]] = None  # Set once the job succeeds
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -72,9 +72,34 @@ class QuestAttemptResponse(BaseModel):
 class QuestAttemptResult(BaseModel):
     is_correct: bool
     points_earned: int
-    correct_answer: Dict[str, Any]
+    score: float  # Fraction of the answer that was right, 0 to 1
+    correct_answer: Any  # Shape depends on the quest type
     explanation: Optional[str] = None
 
+class QuestAttemptBatchItem(BaseModel):
+    client_attempt_id: str = Field(..., min_length=1, max_length=64)  # Unique per student; resending is a no-op
+    quest_id: int
+    answer_data: Dict[str, Any]
+    time_taken: Optional[int] = Field(None, ge=0)
+    attempted_at: Optional[datetime] = None  # When played on the device; defaults to now
+
+class QuestAttemptBatch(BaseModel):
+    attempts: List[QuestAttemptBatchItem] = Field(..., min_length=1)
+
+class QuestAttemptBatchItemResult(BaseModel):
+    client_attempt_id: str
+    status: str  # "created", "duplicate" or "rejected"
+    attempt_id: Optional[int] = None
+    is_correct: Optional[bool] = None
+    points_earned: Optional[int] = None
+    score: Optional[float] = None
+    error: Optional[str] = None
+
+class QuestAttemptBatchResult(BaseModel):
+    results: List[QuestAttemptBatchItemResult]  # In request order
+    created: int
+    points_earned: int
+
 class QuestProgress(BaseModel):
     total_quests: int
     completed_quests: int
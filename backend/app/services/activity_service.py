@@ -0,0 +1,115 @@
+"""
+Activity feeds from the activity event log
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..core.config import settings
+from ..models.activity_event import (
+    ActivityEvent, SUBMISSION, GRADE, ENROLLMENT, QUEST_ATTEMPT, CORRECTION
+)
+from ..models.class_model import Class
+from ..models.user import User
+
+_TEACHER_MESSAGES = {
+    SUBMISSION: "New submission from {student} in {class_name}",
+    GRADE: "Graded {student}'s submission in {class_name}",
+    ENROLLMENT: "{student} joined {class_name}",
+}
+
+_STUDENT_ACTIVITIES = {
+    SUBMISSION: "Submitted homework",
+    GRADE: "Homework graded",
+    ENROLLMENT: "Joined a class",
+    QUEST_ATTEMPT: "Completed a quest",
+    CORRECTION: "Completed a Write & Fix correction",
+}
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+class ActivityService:
+    @staticmethod
+    async def class_feed(db: AsyncSession, class_ids: Sequence[int], limit: int = 10) -> List[Dict[str, Any]]:
+        """Latest events in the given classes, newest first"""
+        if not class_ids:
+            return []
+        student = aliased(User)
+        rows = (await db.execute(
+            select(ActivityEvent.kind, ActivityEvent.ts, student.name, Class.name)
+            .outerjoin(student, student.id == ActivityEvent.student_id)
+            .outerjoin(Class, Class.id == ActivityEvent.class_id)
+            .where(ActivityEvent.class_id.in_(class_ids))
+            .order_by(ActivityEvent.ts.desc(), ActivityEvent.id.desc())
+            .limit(limit)
+        )).all()
+        return [
+            {
+                "type": kind,
+                "message": _TEACHER_MESSAGES.get(kind, kind).format(
+                    student=student_name or "A student", class_name=class_name or "a class"
+                ),
+                "timestamp": ts.isoformat(),
+            }
+            for kind, ts, student_name, class_name in rows
+        ]
+
+    @staticmethod
+    async def student_feed(db: AsyncSession, student_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        """Latest events concerning a student, newest first"""
+        rows = (await db.execute(
+            select(ActivityEvent.kind, ActivityEvent.ts, ActivityEvent.score)
+            .where(ActivityEvent.student_id == student_id)
+            .order_by(ActivityEvent.ts.desc(), ActivityEvent.id.desc())
+            .limit(limit)
+        )).all()
+        return [
+            {
+                "date": ts.date().isoformat(),
+                "activity": _STUDENT_ACTIVITIES.get(kind, kind),
+                "score": round(score, 1) if score is not None else None,
+            }
+            for kind, ts, score in rows
+        ]
+
+    @staticmethod
+    async def ensure_partitions(db: AsyncSession, months_ahead: Optional[int] = None) -> List[str]:
+        """
+        On MySQL, split the catch-all partition so every month up to
+        months_ahead has its own; returns the partitions added. Other
+        databases keep one table and rely on the ts indexes.
+        """
+        if db.bind.dialect.name != "mysql":
+            return []
+        months_ahead = settings.ACTIVITY_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        existing = set((await db.scalars(text(
+            "SELECT partition_name FROM information_schema.partitions "
+            "WHERE table_schema = DATABASE() AND table_name = 'activity_events' AND partition_name IS NOT NULL"
+        ))).all())
+        if "p_future" not in existing:
+            return []  # Not partitioned
+
+        month = _month_start(datetime.utcnow().date())
+        added = []
+        for _ in range(months_ahead + 1):
+            name = f"p{month:%Y%m}"
+            if name not in existing:
+                added.append((name, _next_month(month)))
+            month = _next_month(month)
+        if not added:
+            return []
+        partitions = ", ".join(f"PARTITION {name} VALUES LESS THAN ('{end:%Y-%m-%d}')" for name, end in added)
+        await db.execute(text(
+            f"ALTER TABLE activity_events REORGANIZE PARTITION p_future INTO "
+            f"({partitions}, PARTITION p_future VALUES LESS THAN (MAXVALUE))"
+        ))
+        await db.commit()
+        return [name for name, _ in added]
@@ -0,0 +1,113 @@
+"""
+Correction and dictation analysis cache
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.database import upsert_statement
+from ..models.analysis_cache import AnalysisCacheEntry
+
+CORRECTION = "correction"
+DICTATION = "dictation"
+
+_WHITESPACE = re.compile(r"\s+")
+_TATWEEL = "ـ"  # Arabic elongation mark; typographic only
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+analysis_cache = TTLCache(
+    maxsize=settings.ANALYSIS_CACHE_SIZE,
+    ttl=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    maxbytes=settings.ANALYSIS_CACHE_MAX_BYTES,
+    sizeof=_json_size
+)
+
+class AnalysisService:
+    # Lookups answered by the persisted table after an in-memory miss
+    persisted_hits = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Canonical form for cache keys: NFC, no tatweel, single spaces, trimmed"""
+        text = unicodedata.normalize("NFC", text).replace(_TATWEEL, "")
+        return _WHITESPACE.sub(" ", text).strip()
+
+    @staticmethod
+    def cache_key(
+        kind: str,
+        text: str,
+        language: Optional[str] = None,
+        exercise_id: Optional[int] = None,
+        version: Optional[Any] = None
+    ) -> str:
+        """version (e.g. the exercise's updated_at) retires results computed against older content"""
+        parts = (kind, language or "", str(exercise_id or ""), str(version or ""), AnalysisService.normalize(text))
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    async def get_or_compute(
+        db: AsyncSession,
+        kind: str,
+        text: str,
+        compute: Callable[[], Dict[str, Any]],
+        language: Optional[str] = None,
+        exercise_id: Optional[int] = None,
+        version: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """Return the cached analysis of text, running compute in a worker thread only on a miss"""
+        key = AnalysisService.cache_key(kind, text, language, exercise_id, version)
+        result = analysis_cache.get(key)
+        if result is not None:
+            return result
+
+        if settings.ANALYSIS_CACHE_PERSIST:
+            entry = await db.scalar(select(AnalysisCacheEntry).where(
+                AnalysisCacheEntry.cache_key == key,
+                AnalysisCacheEntry.expires_at > datetime.utcnow()
+            ))
+            if entry is not None:
+                AnalysisService.persisted_hits += 1
+                analysis_cache.set(key, entry.result)
+                return entry.result
+
+        result = await run_in_threadpool(compute)
+        analysis_cache.set(key, result)
+
+        if settings.ANALYSIS_CACHE_PERSIST:
+            # Written in the caller's transaction, so it commits with the request
+            expires_at = datetime.utcnow() + timedelta(seconds=settings.ANALYSIS_CACHE_TTL_SECONDS)
+            values = {"cache_key": key, "kind": kind, "result": result, "expires_at": expires_at}
+            statement = upsert_statement(
+                db.bind.dialect.name,
+                AnalysisCacheEntry.__table__,
+                values,
+                {"result": result, "expires_at": expires_at}
+            )
+            if statement is None:
+                await db.merge(AnalysisCacheEntry(**values))
+            else:
+                await db.execute(statement)
+        return result
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession) -> int:
+        """Delete persisted results past their expiry"""
+        result = await db.execute(delete(AnalysisCacheEntry).where(AnalysisCacheEntry.expires_at <= datetime.utcnow()))
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    def stats() -> dict:
+        return {**analysis_cache.stats(), "persisted_hits": AnalysisService.persisted_hits}
@@ -2,21 +2,26 @@
 Authentication service
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from datetime import datetime, timedelta
 
 from ..models.user import User
 from ..models.progress import ProgressStats
 from ..schemas.user import UserCreate, UserLogin
-from ..core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from ..core.security import (
+    verify_password_async, get_password_hash_async, create_access_token, create_refresh_token,
+    invalidate_principal
+)
+from .leaderboard_service import leaderboard
 
 class AuthService:
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """Create a new user"""
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+        existing_user = await db.scalar(select(User).where(User.email == user_data.email))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -24,7 +29,7 @@ class AuthService:
             )
         
         # Create new user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         db_user = User(
             name=user_data.name,
             email=user_data.email,
@@ -35,23 +40,24 @@ class AuthService:
         )
         
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         
         # Create progress stats for students
         if user_data.role == "student":
             progress_stats = ProgressStats(student_id=db_user.id)
             db.add(progress_stats)
-            db.commit()
+            await db.commit()
+            leaderboard.set_stars(db_user.id, 0)
         
         return db_user
     
     @staticmethod
-    def authenticate_user(db: Session, login_data: UserLogin) -> User:
+    async def authenticate_user(db: AsyncSession, login_data: UserLogin) -> User:
         """Authenticate user and return user object"""
-        user = db.query(User).filter(User.email == login_data.email).first()
+        user = await db.scalar(select(User).where(User.email == login_data.email))
 
-        if not user or not verify_password(login_data.password, user.password_hash):
+        if not user or not await verify_password_async(login_data.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password"
@@ -78,14 +84,16 @@ class AuthService:
         }
     
     @staticmethod
-    def change_password(db: Session, user: User, current_password: str, new_password: str) -> bool:
+    async def change_password(db: AsyncSession, user: User, current_password: str, new_password: str) -> bool:
         """Change user password"""
-        if not verify_password(current_password, user.password_hash):
+        if not await verify_password_async(current_password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
             )
         
-        user.password_hash = get_password_hash(new_password)
-        db.commit()
+        user = await db.merge(user, load=False)
+        user.password_hash = await get_password_hash_async(new_password)
+        await db.commit()
+        invalidate_principal(user.id)
         return True
@@ -0,0 +1,255 @@
+"""
+Leaderboard service
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.ranking import IndexedSkipList
+from ..models.user import User
+from ..models.progress import ProgressStats
+from ..models.class_model import Class, StudentClass
+
+GLOBAL = "global"
+CLASS = "class"
+SCHOOL = "school"
+SCOPES = (GLOBAL, CLASS, SCHOOL)
+
+BoardKey = Tuple[str, Optional[int]]
+
+class LeaderboardService:
+    """
+    In-memory rankings of students by stars, globally and per class and school.
+
+    Boards are indexable skip lists keyed by (-stars, student_id), so top-K and
+    rank-of-student are O(log n). The service is rebuilt from the database on
+    startup and kept current by the write paths that change stars or
+    enrollments. Each worker process holds its own copy and only sees the
+    writes it handled itself, so ensure_loaded rebuilds it once it is
+    LEADERBOARD_RESYNC_SECONDS old; that bounds how far workers disagree and
+    picks up rows written outside the app (e.g. scripts/generate_data.py).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_lock: Optional[asyncio.Lock] = None  # Created on first use, inside the event loop
+        self._loaded = False
+        self._loaded_at = 0.0  # time.monotonic() of the last rebuild
+        self._loading = False
+        self._pending: List[Tuple[str, tuple]] = []
+        self._reset()
+
+    def _reset(self):
+        self._boards: Dict[BoardKey, IndexedSkipList] = {(GLOBAL, None): IndexedSkipList()}
+        self._stars: Dict[int, int] = {}
+        self._classes_by_student: Dict[int, Set[int]] = {}
+        self._school_by_class: Dict[int, int] = {}
+        self._schools_by_student: Dict[int, Dict[int, int]] = {}  # student -> {school_id: classes there}
+
+    # Queries
+
+    def top(self, limit: int, scope: str = GLOBAL, scope_id: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """(rank, student_id, stars) for the first entries of a board"""
+        with self._lock:
+            board = self._boards.get((scope, scope_id))
+            if board is None:
+                return []
+            return [
+                (rank, student_id, -negative_stars)
+                for rank, (negative_stars, student_id) in enumerate(board.range(1, limit), 1)
+            ]
+
+    def rank(self, student_id: int, scope: str = GLOBAL, scope_id: Optional[int] = None) -> Optional[int]:
+        """1-based rank of a student on a board, or None if not on it"""
+        with self._lock:
+            board = self._boards.get((scope, scope_id))
+            stars = self._stars.get(student_id)
+            if board is None or stars is None:
+                return None
+            return board.rank((-stars, student_id))
+
+    def size(self, scope: str = GLOBAL, scope_id: Optional[int] = None) -> int:
+        with self._lock:
+            board = self._boards.get((scope, scope_id))
+            return len(board) if board is not None else 0
+
+    def is_member(self, student_id: int, scope: str, scope_id: Optional[int] = None) -> bool:
+        return self.rank(student_id, scope, scope_id) is not None
+
+    # Updates
+
+    def _deferred(self, method: str, args: tuple) -> bool:
+        """Queue an update that arrives mid-rebuild so it is replayed on the new boards"""
+        if self._loading:
+            self._pending.append((method, args))
+            return True
+        return False
+
+    def _scopes_of(self, student_id: int) -> List[BoardKey]:
+        scopes = [(GLOBAL, None)]
+        for class_id in self._classes_by_student.get(student_id, ()):
+            scopes.append((CLASS, class_id))
+        for school_id in self._schools_by_student.get(student_id, ()):
+            scopes.append((SCHOOL, school_id))
+        return scopes
+
+    def _board(self, key: BoardKey) -> IndexedSkipList:
+        board = self._boards.get(key)
+        if board is None:
+            board = self._boards[key] = IndexedSkipList()
+        return board
+
+    def set_stars(self, student_id: int, stars: int) -> None:
+        """Record a student's new star total on every board they belong to"""
+        with self._lock:
+            if self._deferred("set_stars", (student_id, stars)):
+                return
+            self._set_stars(student_id, stars)
+
+    def _set_stars(self, student_id: int, stars: int) -> None:
+        scopes = self._scopes_of(student_id)
+        old = self._stars.get(student_id)
+        if old is not None:
+            for key in scopes:
+                self._board(key).remove((-old, student_id))
+        self._stars[student_id] = stars
+        for key in scopes:
+            self._board(key).insert((-stars, student_id))
+
+    def enroll(self, student_id: int, class_id: int, school_id: int) -> None:
+        """Add a student to a class board and, on their first class there, the school board"""
+        with self._lock:
+            if self._deferred("enroll", (student_id, class_id, school_id)):
+                return
+            self._enroll(student_id, class_id, school_id)
+
+    def _enroll(self, student_id: int, class_id: int, school_id: int) -> None:
+        classes = self._classes_by_student.setdefault(student_id, set())
+        if class_id in classes:
+            return
+        if student_id not in self._stars:
+            self._stars[student_id] = 0
+            self._board((GLOBAL, None)).insert((0, student_id))
+        key = (-self._stars[student_id], student_id)
+
+        classes.add(class_id)
+        self._school_by_class[class_id] = school_id
+        self._board((CLASS, class_id)).insert(key)
+        schools = self._schools_by_student.setdefault(student_id, {})
+        schools[school_id] = schools.get(school_id, 0) + 1
+        if schools[school_id] == 1:
+            self._board((SCHOOL, school_id)).insert(key)
+
+    def unenroll(self, student_id: int, class_id: int) -> None:
+        """Remove a student from a class board (and the school board after their last class there)"""
+        with self._lock:
+            if self._deferred("unenroll", (student_id, class_id)):
+                return
+            self._unenroll(student_id, class_id)
+
+    def _unenroll(self, student_id: int, class_id: int) -> None:
+        classes = self._classes_by_student.get(student_id)
+        if not classes or class_id not in classes:
+            return
+        key = (-self._stars[student_id], student_id)
+        classes.discard(class_id)
+        self._board((CLASS, class_id)).remove(key)
+
+        school_id = self._school_by_class[class_id]
+        schools = self._schools_by_student[student_id]
+        schools[school_id] -= 1
+        if not schools[school_id]:
+            del schools[school_id]
+            self._board((SCHOOL, school_id)).remove(key)
+
+    def drop_class(self, class_id: int) -> None:
+        """Forget a deleted class"""
+        with self._lock:
+            if self._deferred("drop_class", (class_id,)):
+                return
+            self._drop_class(class_id)
+
+    def _drop_class(self, class_id: int) -> None:
+        board = self._boards.get((CLASS, class_id))
+        for _, student_id in list(board or ()):
+            self._unenroll(student_id, class_id)
+        self._boards.pop((CLASS, class_id), None)
+        self._school_by_class.pop(class_id, None)
+
+    def drop_school(self, school_id: int) -> None:
+        """Forget a deleted school and its classes"""
+        with self._lock:
+            if self._deferred("drop_school", (school_id,)):
+                return
+            self._drop_school(school_id)
+
+    def _drop_school(self, school_id: int) -> None:
+        for class_id in [c for c, s in self._school_by_class.items() if s == school_id]:
+            self._drop_class(class_id)
+        self._boards.pop((SCHOOL, school_id), None)
+
+    # Loading
+
+    def _stale(self) -> bool:
+        resync = settings.LEADERBOARD_RESYNC_SECONDS
+        return not self._loaded or (resync > 0 and time.monotonic() - self._loaded_at >= resync)
+
+    async def load(self, db: AsyncSession, only_if_stale: bool = False) -> None:
+        """Rebuild every board from the database (unless only_if_stale and another request just did)"""
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if only_if_stale and not self._stale():
+                return
+            with self._lock:
+                self._loading = True
+                self._pending = []
+            try:
+                students = (await db.execute(
+                    select(ProgressStats.student_id, ProgressStats.stars_earned)
+                    .join(User, User.id == ProgressStats.student_id)
+                    .where(User.role == "student")
+                )).all()
+                enrollments = (await db.execute(
+                    select(StudentClass.student_id, StudentClass.class_id, Class.school_id)
+                    .join(Class, Class.id == StudentClass.class_id)
+                )).all()
+            except BaseException:
+                with self._lock:
+                    self._loading = False
+                    self._pending = []
+                raise
+
+            with self._lock:
+                self._loading = False
+                self._reset()
+                for student_id, stars in students:
+                    self._set_stars(student_id, stars or 0)
+                for student_id, class_id, school_id in enrollments:
+                    self._enroll(student_id, class_id, school_id)
+                for method, args in self._pending:
+                    getattr(self, f"_{method}")(*args)
+                self._pending = []
+                self._loaded = True
+                self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load the boards on first use and re-sync them once older than LEADERBOARD_RESYNC_SECONDS"""
+        if self._stale():
+            await self.load(db, only_if_stale=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "students": len(self._boards[(GLOBAL, None)]),
+                "boards": len(self._boards),
+            }
+
+leaderboard = LeaderboardService()
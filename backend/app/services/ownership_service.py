@@ -0,0 +1,44 @@
+"""
+Ownership service
+"""
+
+from typing import Optional, Type, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import Base
+
+OwnedModel = TypeVar("OwnedModel", bound=Base)
+
+class OwnershipService:
+    @staticmethod
+    def owned_by(model: Type[OwnedModel], teacher_id: int):
+        """Filter clause restricting a query to rows owned by a teacher"""
+        return model.owner_teacher_id == teacher_id
+
+    @staticmethod
+    async def get_owned(
+        db: AsyncSession,
+        model: Type[OwnedModel],
+        object_id: int,
+        teacher_id: int,
+        *options
+    ) -> Optional[OwnedModel]:
+        """Load a class, assignment or submission only if the teacher owns it"""
+        query = select(model).where(
+            model.id == object_id,
+            OwnershipService.owned_by(model, teacher_id)
+        )
+        if options:
+            query = query.options(*options)
+        return await db.scalar(query)
+
+    @staticmethod
+    async def owns(db: AsyncSession, model: Type[OwnedModel], object_id: int, teacher_id: int) -> bool:
+        """Check ownership without loading the row"""
+        owned_id = await db.scalar(select(model.id).where(
+            model.id == object_id,
+            OwnershipService.owned_by(model, teacher_id)
+        ))
+        return owned_id is not None
@@ -0,0 +1,95 @@
+"""
+Student progress counters
+"""
+
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import select, update, insert, case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.database import upsert_statement
+from ..models.progress import ProgressStats
+from .leaderboard_service import leaderboard
+
+class ProgressService:
+    """
+    Increments to ProgressStats applied in SQL.
+
+    Each call is one ``INSERT ... ON CONFLICT/DUPLICATE KEY UPDATE x = x + :d``
+    on student_id, so concurrent requests for the same student (several tabs,
+    batch sync, background jobs) never overwrite each other's counts and the
+    row lock is held only from the statement to the caller's commit. The
+    streak and last activity date are worked out in the same statement.
+    """
+
+    @staticmethod
+    def _streak(now: datetime):
+        """Streak after activity at now: kept today, extended from yesterday, otherwise restarted"""
+        today = datetime.combine(now.date(), time())
+        return case(
+            (ProgressStats.last_activity_date >= today, case((ProgressStats.streak_days < 1, 1), else_=ProgressStats.streak_days)),
+            (ProgressStats.last_activity_date >= today - timedelta(days=1), ProgressStats.streak_days + 1),
+            else_=1
+        )
+
+    @staticmethod
+    async def record(
+        db: AsyncSession,
+        student_id: int,
+        lessons: int = 0,
+        quests: int = 0,
+        stars: int = 0,
+        minutes: int = 0
+    ) -> int:
+        """Add to a student's counters as activity now, in the caller's transaction; returns the new star total"""
+        now = datetime.utcnow()
+        table = ProgressStats.__table__
+        increments = {
+            # The streak reads last_activity_date, so it is assigned first
+            "streak_days": ProgressService._streak(now),
+            "lessons_completed": ProgressStats.lessons_completed + lessons,
+            "quests_completed": ProgressStats.quests_completed + quests,
+            "stars_earned": ProgressStats.stars_earned + stars,
+            "total_time_spent": ProgressStats.total_time_spent + minutes,
+            "last_activity_date": now,
+            "updated_at": func.now(),
+        }
+        first = {
+            "student_id": student_id,
+            "lessons_completed": lessons,
+            "quests_completed": quests,
+            "stars_earned": stars,
+            "total_time_spent": minutes,
+            "streak_days": 1,
+            "last_activity_date": now,
+        }
+
+        statement = upsert_statement(db.bind.dialect.name, table, first, increments, ["student_id"])
+        if statement is not None:
+            await db.execute(statement)
+        else:
+            result = await db.execute(
+                update(table).where(table.c.student_id == student_id).ordered_values(*increments.items())
+            )
+            if result.rowcount == 0:
+                await db.execute(insert(table).values(first))
+        return await db.scalar(select(ProgressStats.stars_earned).where(ProgressStats.student_id == student_id))
+
+    @staticmethod
+    async def get_or_create(db: AsyncSession, student_id: int) -> ProgressStats:
+        """The student's ProgressStats, created with zero counters (and ranked) if missing and committed"""
+        progress = await db.scalar(select(ProgressStats).where(ProgressStats.student_id == student_id))
+        if progress is not None:
+            return progress
+        statement = upsert_statement(
+            db.bind.dialect.name,
+            ProgressStats.__table__,
+            {"student_id": student_id},
+            {"student_id": ProgressStats.student_id},
+            ["student_id"]
+        )
+        await db.execute(statement if statement is not None else insert(ProgressStats.__table__).values(student_id=student_id))
+        await db.commit()
+        progress = await db.scalar(select(ProgressStats).where(ProgressStats.student_id == student_id))
+        leaderboard.set_stars(student_id, progress.stars_earned)
+        return progress
@@ -0,0 +1,144 @@
+"""
+Batched quest attempt ingestion for offline clients
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.quest_validators import compiled_quest, points_for, score_answers
+from ..models.quest import Quest, QuestAttempt
+from ..models.activity_event import quest_attempt_events, roll_up_events, events_table, QUEST_ATTEMPT
+from ..models.quest_progress import mark_attempted, add_to_progress
+from ..schemas.quest import QuestAttemptBatchItem, QuestAttemptBatchItemResult
+from .progress_service import ProgressService
+
+CREATED = "created"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+def _as_utc(moment: Optional[datetime], now: datetime) -> datetime:
+    """Naive UTC like the rest of the tables; device clocks ahead of ours are clamped to now"""
+    if moment is None:
+        return now
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(moment, now)
+
+class QuestAttemptService:
+    @staticmethod
+    async def _stored(db: AsyncSession, student_id: int, client_ids: List[str]) -> Dict[str, Tuple[int, bool, int]]:
+        """client_attempt_id -> (attempt id, is_correct, points_earned) for ids already recorded"""
+        rows = await db.execute(
+            select(QuestAttempt.client_attempt_id, QuestAttempt.id, QuestAttempt.is_correct, QuestAttempt.points_earned)
+            .where(QuestAttempt.student_id == student_id, QuestAttempt.client_attempt_id.in_(client_ids))
+        )
+        return {client_id: (attempt_id, is_correct, points) for client_id, attempt_id, is_correct, points in rows}
+
+    @staticmethod
+    async def record_batch(
+        db: AsyncSession,
+        student_id: int,
+        items: List[QuestAttemptBatchItem]
+    ) -> Tuple[List[QuestAttemptBatchItemResult], Optional[int]]:
+        """
+        Validate and record a batch of attempts in the caller's transaction.
+
+        Uses one SELECT for already-recorded ids, one for the quests, one
+        multi-row INSERT, one SELECT for the new ids, INSERT ... SELECT
+        each for their activity events and daily stats, and one aggregated
+        increment each for the quest progress aggregate and overall
+        progress. Returns the per-item results in request order and the
+        student's new star total (None when nothing changed).
+        """
+        client_ids = list(dict.fromkeys(item.client_attempt_id for item in items))
+        stored = await QuestAttemptService._stored(db, student_id, client_ids)
+
+        quest_ids = {item.quest_id for item in items}
+        quests = {
+            quest.id: quest
+            for quest in await db.scalars(select(Quest).where(Quest.id.in_(quest_ids), Quest.is_active == True))
+        }
+
+        now = datetime.utcnow()
+        outcomes: Dict[str, QuestAttemptBatchItemResult] = {}
+        pending = {}  # client_attempt_id -> (item, quest, compiled quest) still to be scored
+        for item in items:
+            if any(item.client_attempt_id in seen for seen in (stored, outcomes, pending)):
+                continue
+            quest = quests.get(item.quest_id)
+            if quest is None:
+                outcomes[item.client_attempt_id] = QuestAttemptBatchItemResult(
+                    client_attempt_id=item.client_attempt_id, status=REJECTED, error="Quest not found"
+                )
+                continue
+            pending[item.client_attempt_id] = (item, quest, compiled_quest(quest))
+
+        scores = await score_answers([(compiled, item.answer_data) for item, _, compiled in pending.values()])
+        rows = []
+        for (item, quest, compiled), score in zip(pending.values(), scores):
+            points_earned = points_for(compiled, score, quest.points_reward)
+            rows.append({
+                "quest_id": quest.id,
+                "student_id": student_id,
+                "answer_data": item.answer_data,
+                "is_correct": score >= 1,
+                "points_earned": points_earned,
+                "time_taken": item.time_taken,
+                "attempted_at": _as_utc(item.attempted_at, now),
+                "client_attempt_id": item.client_attempt_id,
+            })
+            outcomes[item.client_attempt_id] = QuestAttemptBatchItemResult(
+                client_attempt_id=item.client_attempt_id, status=CREATED,
+                is_correct=score >= 1, points_earned=points_earned, score=round(score, 4)
+            )
+
+        stars = None
+        if rows:
+            await db.execute(insert(QuestAttempt.__table__).values(rows))
+            created_ids = await QuestAttemptService._stored(db, student_id, [row["client_attempt_id"] for row in rows])
+            for client_id, (attempt_id, _, _) in created_ids.items():
+                outcomes[client_id].attempt_id = attempt_id
+            # The bulk INSERT bypasses the mapper events, so log the activity and update the aggregates in bulk
+            dialect_name = db.bind.dialect.name
+            attempt_ids = [attempt_id for attempt_id, _, _ in created_ids.values()]
+            # Stamped with when the attempt was played, so offline attempts count towards that day
+            await db.execute(quest_attempt_events(
+                QuestAttempt.id.in_(attempt_ids), ts=QuestAttempt.__table__.c.attempted_at
+            ))
+            await db.execute(roll_up_events(
+                dialect_name, events_table.c.kind == QUEST_ATTEMPT, events_table.c.ref_id.in_(attempt_ids)
+            ))
+
+            total_points = sum(row["points_earned"] for row in rows)
+            new_quests = (await db.execute(
+                mark_attempted(dialect_name, student_id, [row["quest_id"] for row in rows])
+            )).rowcount
+            await db.execute(add_to_progress(
+                dialect_name, student_id, len(rows), sum(1 for row in rows if row["is_correct"]),
+                total_points, max(new_quests, 0)
+            ))
+            stars = await ProgressService.record(db, student_id, quests=len(rows), stars=total_points)
+
+        results = []
+        reported = set()
+        for item in items:
+            client_id = item.client_attempt_id
+            outcome = outcomes.get(client_id)
+            if client_id in stored:
+                # Recorded by an earlier sync
+                attempt_id, is_correct, points_earned = stored[client_id]
+            elif client_id in reported and outcome.status == CREATED:
+                # Repeated within this batch
+                attempt_id, is_correct, points_earned = outcome.attempt_id, outcome.is_correct, outcome.points_earned
+            else:
+                results.append(outcome)
+                reported.add(client_id)
+                continue
+            results.append(QuestAttemptBatchItemResult(
+                client_attempt_id=client_id, status=DUPLICATE,
+                attempt_id=attempt_id, is_correct=is_correct, points_earned=points_earned
+            ))
+        return results, stars
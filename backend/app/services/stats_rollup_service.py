@@ -0,0 +1,167 @@
+"""
+Per-student statistics from the daily rollups
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func, literal, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.activity_event import (
+    events_table, quest_attempt_events, roll_up_events,
+    SUBMISSION, GRADE, ENROLLMENT, QUEST_ATTEMPT, CORRECTION
+)
+from ..models.assignment import Assignment
+from ..models.class_model import Class, StudentClass
+from ..models.correction import Correction
+from ..models.daily_stats import StudentDailyStats
+from ..models.quest import QuestAttempt
+from ..models.submission import Submission
+
+BACKFILL_BATCH_SIZE = 5000
+
+_EVENT_COLUMNS = ["ts", "kind", "actor_id", "student_id", "class_id", "ref_id", "score", "errors"]
+
+def _not_logged(kind: str, ref_id):
+    return ~exists().where(events_table.c.kind == kind, events_table.c.ref_id == ref_id)
+
+def _history_sources(dialect_name: str) -> List[Tuple[str, Any, Callable]]:
+    """(kind, id column, low/high -> INSERT ... SELECT of missing events) for each table events come from"""
+    submissions = Submission.__table__
+    assignments = Assignment.__table__
+    enrollments = StudentClass.__table__
+    classes = Class.__table__
+    corrections = Correction.__table__
+    attempts = QuestAttempt.__table__
+    json_length = func.json_length if dialect_name == "mysql" else func.json_array_length
+
+    def events_from(source):
+        return events_table.insert().from_select(_EVENT_COLUMNS, source)
+
+    def submitted(low, high):
+        return events_from(select(
+            submissions.c.submitted_at, literal(SUBMISSION), submissions.c.student_id, submissions.c.student_id,
+            assignments.c.class_id, submissions.c.id, literal(None), literal(None)
+        ).join_from(submissions, assignments, assignments.c.id == submissions.c.assignment_id).where(
+            submissions.c.id > low, submissions.c.id <= high, _not_logged(SUBMISSION, submissions.c.id)
+        ))
+
+    def graded(low, high):
+        return events_from(select(
+            func.coalesce(submissions.c.graded_at, submissions.c.submitted_at), literal(GRADE),
+            submissions.c.owner_teacher_id, submissions.c.student_id, assignments.c.class_id, submissions.c.id,
+            submissions.c.grade, literal(None)
+        ).join_from(submissions, assignments, assignments.c.id == submissions.c.assignment_id).where(
+            submissions.c.id > low, submissions.c.id <= high, submissions.c.is_graded == True,
+            _not_logged(GRADE, submissions.c.id)
+        ))
+
+    def enrolled(low, high):
+        return events_from(select(
+            enrollments.c.enrolled_at, literal(ENROLLMENT), classes.c.owner_teacher_id, enrollments.c.student_id,
+            enrollments.c.class_id, enrollments.c.id, literal(None), literal(None)
+        ).join_from(enrollments, classes, classes.c.id == enrollments.c.class_id).where(
+            enrollments.c.id > low, enrollments.c.id <= high, _not_logged(ENROLLMENT, enrollments.c.id)
+        ))
+
+    def attempted(low, high):
+        return quest_attempt_events(
+            attempts.c.id > low, attempts.c.id <= high, _not_logged(QUEST_ATTEMPT, attempts.c.id),
+            ts=attempts.c.attempted_at
+        )
+
+    def corrected(low, high):
+        return events_from(select(
+            corrections.c.created_at, literal(CORRECTION), corrections.c.student_id, corrections.c.student_id,
+            literal(None), corrections.c.id, corrections.c.ai_score,
+            func.coalesce(json_length(corrections.c.corrections_data), 0)
+        ).where(
+            corrections.c.id > low, corrections.c.id <= high, corrections.c.ai_score.isnot(None),
+            _not_logged(CORRECTION, corrections.c.id)
+        ))
+
+    return [
+        (SUBMISSION, submissions.c.id, submitted),
+        (GRADE, submissions.c.id, graded),
+        (ENROLLMENT, enrollments.c.id, enrolled),
+        (QUEST_ATTEMPT, attempts.c.id, attempted),
+        (CORRECTION, corrections.c.id, corrected),
+    ]
+
+class StatsRollupService:
+    @staticmethod
+    async def student_stats(db: AsyncSession, student_id: int, today: Optional[date] = None) -> Dict[str, Dict[str, Any]]:
+        """Weekly (last 7 days) and monthly (last 30 days) figures, summed from at most 30 daily rows"""
+        today = today or datetime.utcnow().date()
+        rows = (await db.scalars(
+            select(StudentDailyStats).where(
+                StudentDailyStats.student_id == student_id,
+                StudentDailyStats.day > today - timedelta(days=30)
+            )
+        )).all()
+
+        def summarize(days: List[StudentDailyStats]) -> Dict[str, Any]:
+            quests = sum(day.quests_completed for day in days)
+            scored = sum(day.score_count for day in days)
+            return {
+                "time_spent": sum(day.time_spent for day in days) // 60,  # minutes
+                "lessons_completed": sum(day.lessons_completed for day in days),
+                "quests_completed": quests,
+                "errors_corrected": sum(day.errors_corrected for day in days),
+                "accuracy": round(sum(day.quests_correct for day in days) / quests, 3) if quests else None,
+                "average_score": round(sum(day.score_sum for day in days) / scored, 1) if scored else None,
+            }
+
+        week_start = today - timedelta(days=7)
+        return {
+            "weekly": summarize([row for row in rows if row.day > week_start]),
+            "monthly": summarize(rows),
+        }
+
+    @staticmethod
+    async def backfill(
+        db: AsyncSession,
+        batch_size: int = BACKFILL_BATCH_SIZE,
+        log_history: bool = True,
+        progress: Optional[Callable[[str, int], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Rebuild student_daily_stats from history, committing batch by batch.
+
+        First logs events for rows that predate the activity log (each
+        source table walked in primary key ranges, skipping rows already
+        logged), then clears the rollups and re-adds every event up to the
+        newest one present once they are cleared, in event id ranges. The
+        newest id is read in the transaction that clears them, so events
+        logged after that are rolled up by their own writes and none are
+        lost or counted twice. Returns the number of events added per kind
+        and the number rolled up.
+        """
+        dialect_name = db.bind.dialect.name
+        counts: Dict[str, int] = {}
+
+        if log_history:
+            for kind, id_column, statement in _history_sources(dialect_name):
+                last = await db.scalar(select(func.max(id_column))) or 0
+                counts[kind] = 0
+                for low in range(0, last, batch_size):
+                    result = await db.execute(statement(low, low + batch_size))
+                    await db.commit()
+                    counts[kind] += max(result.rowcount, 0)
+                    if progress:
+                        progress(kind, min(low + batch_size, last))
+
+        await db.execute(delete(StudentDailyStats))
+        last_event = await db.scalar(select(func.max(events_table.c.id))) or 0
+        for low in range(0, last_event, batch_size):
+            high = min(low + batch_size, last_event)
+            await db.execute(roll_up_events(dialect_name, events_table.c.id > low, events_table.c.id <= high))
+            await db.commit()
+            if progress:
+                progress("rollup", high)
+        await db.commit()
+        counts["rolled_up"] = await db.scalar(
+            select(func.count()).select_from(events_table).where(events_table.c.id <= last_event)
+        )
+        return counts
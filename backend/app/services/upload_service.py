@@ -0,0 +1,89 @@
+"""
+Upload storage service
+"""
+
+import os
+import time
+from typing import List, Optional
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.utils import blob_path
+from ..models.upload_blob import UploadBlob, recount_blob_references
+
+GC_BATCH_SIZE = 500
+
+class UploadService:
+    @staticmethod
+    async def collect_garbage(
+        db: AsyncSession,
+        upload_dir: Optional[str] = None,
+        grace_seconds: Optional[int] = None
+    ) -> dict:
+        """Delete stored files nothing references any more; returns counts of what was removed"""
+        upload_dir = upload_dir or settings.UPLOAD_DIR
+        grace_seconds = settings.UPLOAD_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        cutoff = time.time() - grace_seconds
+
+        # Counts drift if rows were removed without going through the ORM; start from the truth
+        await db.run_sync(lambda session: recount_blob_references(session.connection()))
+
+        # Files stored by requests that failed before recording a reference have no row at all
+        orphans = await UploadService._orphaned_files(db, upload_dir, cutoff)
+
+        unreferenced = (await db.scalars(select(UploadBlob.sha256).where(UploadBlob.ref_count == 0))).all()
+        expired = [sha256 for sha256 in unreferenced if UploadService._older_than(blob_path(sha256, upload_dir), cutoff)]
+        for start in range(0, len(expired), GC_BATCH_SIZE):
+            await db.execute(
+                delete(UploadBlob).where(
+                    UploadBlob.sha256.in_(expired[start:start + GC_BATCH_SIZE]),
+                    UploadBlob.ref_count == 0
+                )
+            )
+        await db.commit()
+
+        removed_files = 0
+        for sha256 in expired + orphans:
+            try:
+                os.remove(blob_path(sha256, upload_dir))
+                removed_files += 1
+            except FileNotFoundError:
+                pass
+
+        removed_partials = 0
+        staging_dir = os.path.join(upload_dir, "tmp")
+        if os.path.isdir(staging_dir):
+            for name in os.listdir(staging_dir):
+                path = os.path.join(staging_dir, name)
+                if UploadService._older_than(path, cutoff):
+                    os.remove(path)
+                    removed_partials += 1
+
+        return {"blobs": len(expired), "orphans": len(orphans), "files": removed_files, "partials": removed_partials}
+
+    @staticmethod
+    def _older_than(path: str, cutoff: float) -> bool:
+        """True for missing files and files untouched since cutoff"""
+        try:
+            return os.path.getmtime(path) < cutoff
+        except FileNotFoundError:
+            return True
+
+    @staticmethod
+    async def _orphaned_files(db: AsyncSession, upload_dir: str, cutoff: float) -> List[str]:
+        candidates = []
+        for root, dirs, files in os.walk(upload_dir):
+            if os.path.relpath(root, upload_dir).count(os.sep) != 1:  # Only the ab/cd level holds blobs
+                continue
+            for name in files:
+                if len(name) == 64 and UploadService._older_than(os.path.join(root, name), cutoff):
+                    candidates.append(name)
+
+        orphans = []
+        for start in range(0, len(candidates), GC_BATCH_SIZE):
+            batch = candidates[start:start + GC_BATCH_SIZE]
+            known = set((await db.scalars(select(UploadBlob.sha256).where(UploadBlob.sha256.in_(batch)))).all())
+            orphans.extend(sha256 for sha256 in batch if sha256 not in known)
+        return orphans
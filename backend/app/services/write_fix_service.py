@@ -0,0 +1,82 @@
+"""
+Write & Fix service
+"""
+
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.jobs import JobFailed, job_queue
+from ..core.utils import mock_ocr_processing, mock_ai_feedback
+from ..models.job import Job
+from ..models.correction import Correction
+from .leaderboard_service import leaderboard
+from .progress_service import ProgressService
+
+WRITE_FIX_JOB = "write_fix"
+
+class WriteFixEngine:
+    """OCR and feedback backend; both calls block and run in a worker thread"""
+
+    def extract_text(self, image_path: str) -> dict:
+        return mock_ocr_processing(image_path)
+
+    def feedback(self, text: str, corrections: list) -> dict:
+        return mock_ai_feedback(text, corrections)
+
+class WriteFixService:
+    # Replace with a real OCR/LLM backend, or an in-process stand-in in tests
+    engine: WriteFixEngine = WriteFixEngine()
+
+    @staticmethod
+    async def enqueue(
+        db: AsyncSession,
+        student_id: int,
+        image_path: str,
+        content_hash: Optional[str],
+        idempotency_key: Optional[str] = None
+    ) -> Job:
+        """Record an empty correction for an uploaded image and queue its processing"""
+        correction = Correction(student_id=student_id, uploaded_image_url=image_path, content_hash=content_hash)
+        db.add(correction)
+        await db.flush()
+        return await job_queue.enqueue(
+            db, WRITE_FIX_JOB, student_id, {"correction_id": correction.id}, idempotency_key
+        )
+
+    @staticmethod
+    async def process(db: AsyncSession, job: Job) -> dict:
+        """Run OCR and feedback for a queued upload and fill in its correction"""
+        correction = await db.scalar(select(Correction).where(Correction.id == job.payload["correction_id"]))
+        if correction is None:
+            raise JobFailed("Correction no longer exists")
+
+        engine = WriteFixService.engine
+        ocr_result = await run_in_threadpool(engine.extract_text, correction.uploaded_image_url)
+        ai_feedback = await run_in_threadpool(engine.feedback, ocr_result["extracted_text"], ocr_result["corrections"])
+
+        correction.original_text = ocr_result["extracted_text"]
+        correction.corrected_text = ocr_result["extracted_text"]  # Would be corrected in production
+        correction.corrections_data = ocr_result["corrections"]
+        correction.feedback = ai_feedback["feedback"]
+        correction.ai_score = ai_feedback["score"]
+        correction.mini_lesson_data = ai_feedback["mini_lesson"]
+
+        # Update student progress
+        student_id = correction.student_id
+        stars = await ProgressService.record(db, student_id, lessons=1, stars=5)  # Points for completing correction
+        job_queue.after_commit(db, lambda: leaderboard.set_stars(student_id, stars))
+
+        return {
+            "original_text": ocr_result["extracted_text"],
+            "corrected_text": ocr_result["extracted_text"],
+            "corrections": ocr_result["corrections"],
+            "feedback": ai_feedback["feedback"],
+            "score": ai_feedback["score"],
+            "mini_lesson": ai_feedback["mini_lesson"],
+            "suggestions": ai_feedback["suggestions"],
+        }
+
+job_queue.handler(WRITE_FIX_JOB)(WriteFixService.process)
@@ -5,12 +5,22 @@ FastAPI application with MySQL database
 
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.security import HTTPBearer
 import uvicorn
 
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.routers import auth, users, schools, classes, assignments, submissions, quests, stats, subscriptions
+from app.core.database import engine, Base, AsyncSessionLocal
+from app.core.hashing import password_hasher
+from app.core.jobs import job_queue
+from app.core.metrics import metrics, MetricsMiddleware, CONTENT_TYPE
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_tracking import SQL_STATS_HEADER
+from app.core.slow_queries import slow_query_log
+from app.services.analysis_service import AnalysisService
+from app.services.activity_service import ActivityService
+from app.services.leaderboard_service import leaderboard
+from app.routers import auth, users, schools, classes, assignments, submissions, quests, stats, subscriptions, jobs, admin
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -31,8 +41,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, SQL_STATS_HEADER],
 )
 
+# Request latency, in-flight and per-request statement metrics
+app.add_middleware(MetricsMiddleware)
+
 # Security scheme
 security = HTTPBearer()
 
@@ -46,6 +60,8 @@ app.include_router(submissions.router, prefix="/api/v1/submissions", tags=["Subm
 app.include_router(quests.router, prefix="/api/v1/quests", tags=["Quests"])
 app.include_router(stats.router, prefix="/api/v1/stats", tags=["Statistics"])
 app.include_router(subscriptions.router, prefix="/api/v1/subscriptions", tags=["Subscriptions"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
 
 @app.get("/")
 async def root():
@@ -55,7 +71,36 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "version": "1.0.0"}
+    return {
+        "status": "healthy",
+        "version": "1.0.0",
+        "password_hashing": password_hasher.stats(),
+        "leaderboard": leaderboard.stats(),
+        "jobs": job_queue.stats(),
+        "analysis_cache": AnalysisService.stats(),
+        "slow_queries": slow_query_log.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Request, in-flight and database pool metrics for Prometheus"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+@app.on_event("startup")
+async def startup_event():
+    """Build the in-memory leaderboard, prepare activity partitions and start the background job workers"""
+    async with AsyncSessionLocal() as db:
+        await leaderboard.load(db)
+        if settings.ANALYSIS_CACHE_PERSIST:
+            await AnalysisService.purge_expired(db)
+        await ActivityService.ensure_partitions(db)
+    job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker pools"""
+    await job_queue.stop()
+    password_hasher.shutdown()
 
 if __name__ == "__main__":
     uvicorn.run(
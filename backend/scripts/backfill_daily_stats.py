@@ -0,0 +1,39 @@
+"""
+Rebuild the per-student daily stats rollups from history
+
+Logs activity events for submissions, grades, enrollments, quest attempts
+and corrections that predate the activity log, then recomputes
+student_daily_stats from the events. Works in primary key batches with a
+commit after each, so it streams through any amount of history.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+
+from app.core.database import AsyncSessionLocal
+from app.services.stats_rollup_service import StatsRollupService, BACKFILL_BATCH_SIZE
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="rows per batch")
+    parser.add_argument("--rollups-only", action="store_true", help="only recompute rollups from logged events")
+    args = parser.parse_args()
+
+    def report(stage, position):
+        print(f"  {stage}: through id {position}", flush=True)
+
+    async with AsyncSessionLocal() as db:
+        counts = await StatsRollupService.backfill(
+            db, batch_size=args.batch_size, log_history=not args.rollups_only, progress=report
+        )
+    rolled_up = counts.pop("rolled_up")
+    for kind, added in counts.items():
+        print(f"Logged {added} past {kind} events")
+    print(f"Rolled up {rolled_up} events into daily stats")
+
+if __name__ == "__main__":
+    asyncio.run(main())
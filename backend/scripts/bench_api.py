@@ -0,0 +1,357 @@
+"""
+API load benchmark
+
+Seeds a sized dataset (teachers, schools, classes, students, assignments,
+submissions, quests and their history) into SQLite or MySQL with
+scripts/generate_data.py, then drives the app with concurrent httpx
+clients running scripted teacher and student sessions, in process
+through ASGI or against a running server with --base-url.
+Reports throughput and p50/p95/p99 latency per endpoint and saves them as
+JSON; --baseline compares a run with an earlier one and exits non-zero on
+p95 regressions.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+BENCH_PASSWORD = "bench-password"
+EMAIL_DOMAIN = "bench.example.com"
+NOISE_FLOOR_MS = 1.0  # p95 changes smaller than this are never regressions
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    data = parser.add_argument_group("dataset")
+    data.add_argument("--database-url", default="sqlite:///./bench.db", help="sync SQLAlchemy URL to seed and serve")
+    data.add_argument("--teachers", type=int, default=5)
+    data.add_argument("--schools", type=int, default=2, help="per teacher")
+    data.add_argument("--classes", type=int, default=3, help="per school")
+    data.add_argument("--students", type=int, default=25, help="per class")
+    data.add_argument("--assignments", type=int, default=4, help="per class")
+    data.add_argument("--submission-rate", type=float, default=0.75, help="chance a student submits each assignment")
+    data.add_argument("--attempts", type=float, default=20, help="mean past quest attempts per student")
+    data.add_argument("--corrections", type=float, default=3, help="mean past corrections per student")
+    data.add_argument("--quests", type=int, default=30)
+    data.add_argument("--reuse", action="store_true", help="benchmark an already seeded database")
+    load = parser.add_argument_group("load")
+    load.add_argument("--base-url", help="benchmark a running server instead of the app in process")
+    load.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    load.add_argument("--teacher-share", type=float, default=0.25, help="fraction of virtual users that are teachers")
+    load.add_argument("--iterations", type=int, default=10, help="scripted sessions per virtual user")
+    load.add_argument("--warmup", type=int, default=1, help="leading sessions per user left out of the results")
+    load.add_argument("--seed", type=int, default=42)
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", default="bench-results.json")
+    output.add_argument("--baseline", help="earlier results to compare against")
+    output.add_argument("--max-regression", type=float, default=0.2, help="allowed relative p95 increase")
+    return parser.parse_args()
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the app's settings at the benchmark database; must run before any app import"""
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("DEBUG", "false")
+    os.environ.setdefault("JOB_WORKERS", "0")
+
+def seed(args: argparse.Namespace) -> Dict[str, int]:
+    """Generate the dataset with scripts/generate_data.py, unless the database already holds one"""
+    from sqlalchemy import func, select
+
+    from app.core.database import SessionLocal, engine
+    from app.models import User
+    from scripts.generate_data import default_options, generate
+
+    with SessionLocal() as db:
+        seeded = engine.dialect.has_table(db.connection(), User.__tablename__) and db.scalar(
+            select(func.count(User.id)).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+        )
+    if seeded and not args.reuse:
+        raise SystemExit(f"{args.database_url} already holds benchmark data; pass --reuse or use a fresh database")
+    if not seeded:
+        generate(default_options(
+            seed=args.seed, password=BENCH_PASSWORD, email_domain=EMAIL_DOMAIN,
+            teachers=args.teachers, schools=args.schools, classes=args.classes,
+            class_size=args.students, class_size_stddev=0, assignments=args.assignments, quests=args.quests,
+            submission_rate=args.submission_rate, attempts=args.attempts, corrections=args.corrections
+        ))
+    with SessionLocal() as db:
+        return dataset_counts(db)
+
+def dataset_counts(db) -> Dict[str, int]:
+    from sqlalchemy import func, select
+
+    from app.models import User, School, Class, StudentClass, Assignment, Submission, Quest, QuestAttempt
+
+    counts = {
+        "teachers": db.scalar(select(func.count(User.id)).where(User.role == "teacher")),
+        "students": db.scalar(select(func.count(User.id)).where(User.role == "student")),
+    }
+    for name, model in [
+        ("schools", School), ("classes", Class), ("enrollments", StudentClass), ("assignments", Assignment),
+        ("submissions", Submission), ("quests", Quest), ("quest_attempts", QuestAttempt),
+    ]:
+        counts[name] = db.scalar(select(func.count(model.id)))
+    return counts
+
+def accounts(role: str) -> List[str]:
+    from sqlalchemy import select
+
+    from app.core.database import SessionLocal
+    from app.models import User
+
+    with SessionLocal() as db:
+        return list(db.scalars(
+            select(User.email).where(User.role == role, User.email.like(f"%@{EMAIL_DOMAIN}")).order_by(User.id)
+        ))
+
+class Recorder:
+    """Latencies and statuses per endpoint template"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = True
+
+    def add(self, endpoint: str, seconds: float, status: int) -> None:
+        if not self.recording:
+            return
+        self.latencies[endpoint].append(seconds)
+        if status >= 400:
+            self.errors[endpoint] += 1
+
+class Session:
+    """One virtual user's authenticated client"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.headers: Dict[str, str] = {}
+
+    async def call(self, method: str, template: str, json_body: Any = None, **params) -> Optional[Any]:
+        start = time.perf_counter()
+        response = await self.client.request(method, template.format(**params), headers=self.headers, json=json_body)
+        self.recorder.add(f"{method} {template}", time.perf_counter() - start, response.status_code)
+        return response.json() if response.status_code < 400 else None
+
+    async def login(self, email: str) -> None:
+        body = await self.call("POST", "/api/v1/auth/login", {"email": email, "password": BENCH_PASSWORD})
+        if body is None:
+            raise RuntimeError(f"Login failed for {email}")
+        self.headers = {"Authorization": f"Bearer {body['access_token']}"}
+
+async def teacher_session(session: Session) -> None:
+    """Dashboards, class views and grading one pending submission"""
+    await session.call("GET", "/api/v1/schools/")
+    classes = await session.call("GET", "/api/v1/classes/") or []
+    await session.call("GET", "/api/v1/stats/dashboard/teacher")
+    if classes:
+        class_id = session.rng.choice(classes)["id"]
+        await session.call("GET", "/api/v1/stats/dashboard/class/{class_id}", class_id=class_id)
+        await session.call("GET", "/api/v1/classes/{class_id}", class_id=class_id)
+    await session.call("GET", "/api/v1/assignments/")
+    submissions = await session.call("GET", "/api/v1/submissions/") or []
+    pending = [submission for submission in submissions if not submission["is_graded"]]
+    if pending:
+        await session.call(
+            "PUT", "/api/v1/submissions/{submission_id}/grade",
+            {"grade": session.rng.randint(40, 100), "feedback": "Bien"},
+            submission_id=session.rng.choice(pending)["id"]
+        )
+
+async def student_session(session: Session) -> None:
+    """Browsing and playing quests, then checking progress and dashboards"""
+    quests = await session.call("GET", "/api/v1/quests/") or []
+    for quest in session.rng.sample(quests, min(2, len(quests))):
+        await session.call("POST", "/api/v1/quests/attempt", {
+            "quest_id": quest["id"], "answer_data": {"selected_option": session.rng.choice("abcd")}
+        })
+    await session.call("GET", "/api/v1/quests/progress")
+    await session.call("GET", "/api/v1/quests/attempts")
+    await session.call("GET", "/api/v1/stats/dashboard/student")
+    await session.call("GET", "/api/v1/stats/leaderboard")
+    await session.call("GET", "/api/v1/assignments/")
+
+class StartLine:
+    """Holds virtual users after their warm-up so measurement starts for all of them at once"""
+
+    def __init__(self, parties: int, recorder: Recorder):
+        self.parties = parties
+        self.recorder = recorder
+        self.arrived = 0
+        self.started = 0.0
+        self._go = asyncio.Event()
+
+    async def wait(self) -> None:
+        self.arrived += 1
+        if self.arrived == self.parties:
+            self.recorder.recording = True
+            self.started = time.perf_counter()
+            self._go.set()
+        await self._go.wait()
+
+async def virtual_user(
+    client: httpx.AsyncClient, recorder: Recorder, start_line: StartLine,
+    email: str, is_teacher: bool, iterations: int, warmup: int, seed: int
+) -> None:
+    session = Session(client, recorder, random.Random(seed))
+    await session.login(email)
+    script = teacher_session if is_teacher else student_session
+    for _ in range(warmup):
+        await script(session)
+    await start_line.wait()
+    for _ in range(iterations):
+        await script(session)
+
+async def run_load(args: argparse.Namespace) -> Tuple[Recorder, float]:
+    """Run every virtual user to completion; returns the recorder and the measured wall time"""
+    teachers, students = accounts("teacher"), accounts("student")
+    rng = random.Random(args.seed)
+    plan = []
+    for n in range(args.users):
+        is_teacher = bool(teachers) and (not students or rng.random() < args.teacher_share)
+        pool = teachers if is_teacher else students
+        plan.append((pool[n % len(pool)], is_teacher))
+
+    app = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=httpx.Limits(max_connections=args.users))
+    else:
+        from main import app
+        await app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    recorder = Recorder()
+    recorder.recording = False  # Logins and warm-up sessions are left out
+    start_line = StartLine(len(plan), recorder)
+    try:
+        await asyncio.gather(*[
+            virtual_user(client, recorder, start_line, email, is_teacher, args.iterations, args.warmup, args.seed + n)
+            for n, (email, is_teacher) in enumerate(plan)
+        ])
+        elapsed = time.perf_counter() - start_line.started
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+    return recorder, elapsed
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a sorted list"""
+    return ordered[max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))]
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    endpoints = {}
+    total = 0
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        ordered = sorted(latencies)
+        total += len(ordered)
+        endpoints[endpoint] = {
+            "requests": len(ordered),
+            "errors": recorder.errors.get(endpoint, 0),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+            "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0,
+        }
+    return {
+        "totals": {
+            "requests": total,
+            "errors": sum(recorder.errors.values()),
+            "seconds": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0,
+        },
+        "endpoints": endpoints,
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(results: Dict[str, Any]) -> None:
+    print(f"{'endpoint':<58} {'reqs':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rps':>8}")
+    for endpoint, figures in results["endpoints"].items():
+        print(
+            f"{endpoint:<58} {figures['requests']:>6} {figures['errors']:>4} {figures['p50_ms']:>9.2f} "
+            f"{figures['p95_ms']:>9.2f} {figures['p99_ms']:>9.2f} {figures['throughput_rps']:>8.1f}"
+        )
+    totals = results["totals"]
+    print(
+        f"\n{totals['requests']} requests, {totals['errors']} errors in {totals['seconds']:.1f}s "
+        f"= {totals['throughput_rps']:.1f} req/s"
+    )
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Print p95 changes per endpoint and return the endpoints that regressed beyond max_regression"""
+    regressed = []
+    print(f"\n{'endpoint':<58} {'base p95':>9} {'p95':>9} {'change':>8}")
+    for endpoint, figures in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if before is None:
+            continue
+        old, new = before["p95_ms"], figures["p95_ms"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > max_regression and new - old > NOISE_FLOOR_MS:
+            regressed.append(endpoint)
+            flag = "  REGRESSED"
+        print(f"{endpoint:<58} {old:>9.2f} {new:>9.2f} {change:>+7.0%}{flag}")
+    return regressed
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    started = time.perf_counter()
+    dataset = seed(args)
+    print(f"Dataset ready in {time.perf_counter() - started:.1f}s: {dataset}")
+
+    recorder, elapsed = asyncio.run(run_load(args))
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "database": args.database_url.split(":", 1)[0],
+            "target": args.base_url or "in-process",
+            "users": args.users,
+            "iterations": args.iterations,
+            "teacher_share": args.teacher_share,
+            "seed": args.seed,
+        },
+        "dataset": dataset,
+        **summarize(recorder, elapsed),
+    }
+    print_report(results)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressed = compare(results, json.load(f), args.max_regression)
+        if regressed:
+            print(f"\n{len(regressed)} endpoint(s) regressed beyond {args.max_regression:.0%} at p95")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
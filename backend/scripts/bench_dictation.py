@@ -0,0 +1,62 @@
+"""
+Dictation alignment benchmark
+
+Checks passages of increasing length carrying ~5% errors and reports time
+and alignment cells per word; both should stay roughly flat as passages grow.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+
+from app.core.dictation import check_dictation
+
+VOCABULARY = (
+    "le chat dort sur le tapis près de la fenêtre pendant que les élèves écrivent "
+    "leur dictée avec attention et le maître lit lentement chaque phrase à voix haute "
+    "ذهب الطالب إلى المدرسة في الصباح وقرأ الكتاب مع أصدقائه"
+).split()
+
+def make_passage(words: int, error_rate: float, rng: random.Random):
+    reference = [rng.choice(VOCABULARY) for _ in range(words)]
+    student = []
+    for word in reference:
+        roll = rng.random()
+        if roll < error_rate / 3:
+            continue  # Missing word
+        if roll < 2 * error_rate / 3:
+            student.append(word[:-1] or word)  # Misspelt
+        elif roll < error_rate:
+            student.extend([word, rng.choice(VOCABULARY)])  # Extra word
+        else:
+            student.append(word)
+    return " ".join(reference), " ".join(student)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 5000])
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'words':>8} {'errors':>8} {'best ms':>10} {'us/word':>10} {'cells/word':>12}")
+    for size in args.sizes:
+        reference, student = make_passage(size, args.error_rate, rng)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            report = check_dictation(reference, student)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        print(
+            f"{size:>8} {len(report.errors):>8} {best * 1000:>10.1f} "
+            f"{best * 1e6 / size:>10.1f} {report.cells / size:>12.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
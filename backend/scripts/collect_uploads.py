@@ -0,0 +1,23 @@
+"""
+Remove uploaded files that no submission or correction references
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+from app.core.database import AsyncSessionLocal
+from app.services.upload_service import UploadService
+
+async def main():
+    async with AsyncSessionLocal() as db:
+        removed = await UploadService.collect_garbage(db)
+    print(
+        f"Removed {removed['blobs']} unreferenced blobs, {removed['orphans']} orphaned files "
+        f"and {removed['partials']} stale partial uploads"
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,369 @@
+"""
+Synthetic data generator
+
+Produces teachers, schools, classes, students, enrollments, assignments,
+submissions, quests, quest attempts and corrections at any scale, with
+configurable distributions and deterministic output for a given --seed.
+Rows get their ids up front and are written with batched executemany
+INSERTs (one per table per --batch-size rows), every account shares one
+password hash, and the derived tables the ORM events would maintain
+(progress, quest progress, dashboard rollups, activity events and daily
+stats) are filled in bulk afterwards. Appends to whatever the database
+already holds.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_PASSWORD = "password123"
+DEFAULT_EMAIL_DOMAIN = "generated.example.com"
+
+WORDS = (
+    "le chat dort sur le tapis près de la fenêtre pendant que les élèves écrivent "
+    "leur dictée avec attention et le maître lit lentement chaque phrase"
+).split()
+NAME_LOCALES = ["fr_FR", "ar_AA", "en_US"]
+ERROR_TYPES = ["spelling", "grammar", "accent", "punctuation", "conjugation"]
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL (default: DATABASE_URL)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per INSERT batch")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="password of every generated account")
+    parser.add_argument("--email-domain", default=DEFAULT_EMAIL_DOMAIN)
+    parser.add_argument("--days", type=int, default=90, help="history spread over this many past days")
+    parser.add_argument("--skip-activity", action="store_true", help="leave activity events and daily stats for later")
+    shape = parser.add_argument_group("shape")
+    shape.add_argument("--teachers", type=int, default=10)
+    shape.add_argument("--schools", type=int, default=2, help="per teacher")
+    shape.add_argument("--classes", type=int, default=4, help="per school")
+    shape.add_argument("--class-size", type=float, default=28, help="mean students per class")
+    shape.add_argument("--class-size-stddev", type=float, default=5)
+    shape.add_argument("--assignments", type=int, default=10, help="per class")
+    shape.add_argument("--quests", type=int, default=200)
+    behaviour = parser.add_argument_group("behaviour")
+    behaviour.add_argument("--submission-rate", type=float, default=0.8, help="chance a student submits each assignment")
+    behaviour.add_argument("--graded-share", type=float, default=0.6, help="share of submissions already graded")
+    behaviour.add_argument("--attempts", type=float, default=40, help="mean quest attempts per student (exponential)")
+    behaviour.add_argument("--corrections", type=float, default=5, help="mean Write & Fix corrections per student (exponential)")
+    behaviour.add_argument("--skill-alpha", type=float, default=4, help="beta(alpha, beta) spread of student accuracy")
+    behaviour.add_argument("--skill-beta", type=float, default=2)
+    return parser
+
+def default_options(**overrides) -> argparse.Namespace:
+    """Generator options with defaults, for callers such as benchmarks"""
+    options = build_parser().parse_args([])
+    for name, value in overrides.items():
+        setattr(options, name, value)
+    return options
+
+class BulkWriter:
+    """Per-table row buffers written with one executemany INSERT per batch, in foreign key order"""
+
+    def __init__(self, conn, tables: List[Any], batch_size: int):
+        self.conn = conn
+        self.tables = tables  # Parents first
+        self.batch_size = batch_size
+        self.rows: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.written: Dict[str, int] = defaultdict(int)
+
+    def add(self, table, row: Dict[str, Any]) -> None:
+        self.rows[table.name].append(row)
+        if len(self.rows[table.name]) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every buffered row, parents before children, and commit"""
+        for table in self.tables:
+            rows = self.rows.pop(table.name, None)
+            if rows:
+                self.conn.execute(table.insert(), rows)
+                self.written[table.name] += len(rows)
+        self.conn.commit()
+
+class DataGenerator:
+    """Deterministic row factory; ids continue from the largest already in each table"""
+
+    def __init__(self, conn, options: argparse.Namespace, progress: Optional[Callable[[str], None]] = None):
+        from faker import Faker
+        from sqlalchemy import func, select
+
+        from app.core.security import get_password_hash
+        from app.models import (
+            User, School, Class, StudentClass, Assignment, Submission, Quest, QuestAttempt, Correction,
+            ProgressStats, StudentQuestProgress, StudentQuestAttempted
+        )
+
+        self.options = options
+        self.progress = progress or (lambda message: None)
+        self.rng = random.Random(options.seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.password_hash = get_password_hash(options.password)  # One bcrypt for every account
+
+        self.first_names, self.last_names = [], []
+        for locale in NAME_LOCALES:  # One Faker per locale: a multi-locale Faker picks locales unseeded
+            fake = Faker(locale)
+            fake.seed_instance(options.seed)
+            self.first_names += [fake.first_name() for _ in range(200)]
+            self.last_names += [fake.last_name() for _ in range(200)]
+
+        self.tables = {
+            model.__tablename__: model.__table__
+            for model in (
+                User, School, Class, StudentClass, Assignment, Submission, Quest, QuestAttempt, Correction,
+                ProgressStats, StudentQuestProgress, StudentQuestAttempted
+            )
+        }
+        self.next_id = {
+            name: (conn.scalar(select(func.max(table.c.id))) or 0) + 1
+            for name, table in self.tables.items() if "id" in table.c
+        }
+        self.writer = BulkWriter(conn, list(self.tables.values()), options.batch_size)
+        self.class_ids: List[int] = []
+
+    def _id(self, table: str) -> int:
+        value = self.next_id[table]
+        self.next_id[table] += 1
+        return value
+
+    def _past(self) -> datetime:
+        """A moment in the last --days days, at school or homework hours"""
+        day = self.now - timedelta(days=int(self.rng.uniform(0, self.options.days)))
+        return day.replace(hour=self.rng.choice([8, 9, 10, 11, 14, 15, 16, 17, 19, 20]), minute=self.rng.randrange(60))
+
+    def _user(self, role) -> int:
+        from app.models.user import UserRole
+
+        user_id = self._id("users")
+        self.writer.add(self.tables["users"], {
+            "id": user_id,
+            "name": f"{self.rng.choice(self.first_names)} {self.rng.choice(self.last_names)}",
+            "email": f"{role.value}{user_id}@{self.options.email_domain}",
+            "password_hash": self.password_hash,
+            "role": role,
+            "parent_email": f"parent{user_id}@{self.options.email_domain}" if role == UserRole.STUDENT else None,
+            "created_at": self._past(),
+        })
+        return user_id
+
+    def generate_quests(self) -> List[Dict[str, Any]]:
+        from app.models.quest import QuestType, QuestDifficulty
+
+        quests = []
+        for n in range(self.options.quests):
+            quest_type = self.rng.choice([QuestType.MULTIPLE_CHOICE, QuestType.FILL_IN_BLANK])
+            if quest_type == QuestType.MULTIPLE_CHOICE:
+                content = {"question": f"Question {n}", "options": ["a", "b", "c", "d"], "correct_answer": "b"}
+                answer = {"selected_option": "b"}
+            else:
+                word = self.rng.choice(WORDS)
+                content = {"text": f"Complète : ___ ({n})", "correct_answers": {"1": word}}
+                answer = {"answers": {"1": word}}
+            quest = {
+                "id": self._id("quests"),
+                "title": f"Quest {n}",
+                "quest_type": quest_type,
+                "difficulty": self.rng.choice(list(QuestDifficulty)),
+                "subject": self.rng.choice(["French", "Arabic", "Math"]),
+                "content_json": content,
+                "points_reward": self.rng.choice([5, 10, 10, 15, 20]),
+                "created_at": self._past(),
+            }
+            self.writer.add(self.tables["quests"], quest)
+            quests.append({"id": quest["id"], "points": quest["points_reward"], "answer": answer})
+        return quests
+
+    def generate_student_activity(self, student_id: int, quests: List[Dict[str, Any]]) -> None:
+        """Quest attempts and corrections of one student plus the aggregates derived from them"""
+        rng = self.rng
+        skill = rng.betavariate(self.options.skill_alpha, self.options.skill_beta)
+        attempts = int(rng.expovariate(1 / self.options.attempts)) if quests and self.options.attempts else 0
+        correct = points = 0
+        attempted = set()
+        last_activity = None
+        for _ in range(attempts):
+            quest = rng.choice(quests)
+            is_correct = rng.random() < skill
+            earned = quest["points"] if is_correct else 0
+            attempted_at = self._past()
+            self.writer.add(self.tables["quest_attempts"], {
+                "id": self._id("quest_attempts"),
+                "quest_id": quest["id"],
+                "student_id": student_id,
+                "answer_data": quest["answer"] if is_correct else {"selected_option": "a"},
+                "is_correct": is_correct,
+                "points_earned": earned,
+                "time_taken": int(rng.lognormvariate(3.5, 0.6)),
+                "attempted_at": attempted_at,
+            })
+            correct += is_correct
+            points += earned
+            attempted.add(quest["id"])
+            last_activity = max(last_activity or attempted_at, attempted_at)
+
+        corrections = int(rng.expovariate(1 / self.options.corrections)) if self.options.corrections else 0
+        for _ in range(corrections):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))
+            errors = [
+                {"type": rng.choice(ERROR_TYPES), "original": word, "corrected": word, "explanation": "Correction"}
+                for word in rng.sample(WORDS, rng.randint(0, 5))
+            ]
+            created_at = self._past()
+            self.writer.add(self.tables["corrections"], {
+                "id": self._id("corrections"),
+                "student_id": student_id,
+                "original_text": text,
+                "corrected_text": text,
+                "corrections_data": errors,
+                "feedback": "Bon travail",
+                "ai_score": round(100 * rng.betavariate(5, 2), 1),
+                "created_at": created_at,
+            })
+            last_activity = max(last_activity or created_at, created_at)
+
+        self.writer.add(self.tables["progress_stats"], {
+            "id": self._id("progress_stats"),
+            "student_id": student_id,
+            "lessons_completed": corrections,
+            "quests_completed": attempts,
+            "streak_days": 0,
+            "stars_earned": points,
+            "last_activity_date": last_activity,
+            "total_time_spent": 0,
+        })
+        if attempts:
+            self.writer.add(self.tables["student_quest_progress"], {
+                "student_id": student_id,
+                "attempts": attempts,
+                "correct_attempts": correct,
+                "points_total": points,
+                "quests_attempted": len(attempted),
+            })
+            for quest_id in sorted(attempted):
+                self.writer.add(self.tables["student_quests_attempted"], {"student_id": student_id, "quest_id": quest_id})
+
+    def generate_class(self, teacher_id: int, school_id: int, quests: List[Dict[str, Any]], label: str) -> None:
+        from app.models.assignment import AssignmentType
+        from app.models.user import UserRole
+
+        rng = self.rng
+        class_id = self._id("classes")
+        self.class_ids.append(class_id)
+        grade = rng.choice(["3ème primaire", "4ème primaire", "5ème primaire", "6ème primaire"])
+        self.writer.add(self.tables["classes"], {
+            "id": class_id, "school_id": school_id, "owner_teacher_id": teacher_id,
+            "name": f"{label} {grade}", "subject": rng.choice(["French", "Arabic", "Math"]), "grade_level": grade,
+            "created_at": self._past(),
+        })
+
+        assignments = []
+        for n in range(self.options.assignments):
+            assignment_id = self._id("assignments")
+            created_at = self._past()
+            self.writer.add(self.tables["assignments"], {
+                "id": assignment_id, "class_id": class_id, "created_by_teacher_id": teacher_id,
+                "owner_teacher_id": teacher_id, "title": f"Devoir {n + 1}",
+                "assignment_type": rng.choice(list(AssignmentType)), "due_date": created_at + timedelta(days=7),
+                "max_points": 100, "created_at": created_at,
+            })
+            assignments.append((assignment_id, created_at))
+
+        size = max(1, round(rng.gauss(self.options.class_size, self.options.class_size_stddev)))
+        for _ in range(size):
+            student_id = self._user(UserRole.STUDENT)
+            self.writer.add(self.tables["student_classes"], {
+                "id": self._id("student_classes"), "student_id": student_id, "class_id": class_id,
+                "enrolled_at": self._past(),
+            })
+            for assignment_id, assigned_at in assignments:
+                if rng.random() >= self.options.submission_rate:
+                    continue
+                submitted_at = min(assigned_at + timedelta(hours=rng.uniform(1, 8 * 24)), self.now)
+                graded = rng.random() < self.options.graded_share
+                self.writer.add(self.tables["submissions"], {
+                    "id": self._id("submissions"), "assignment_id": assignment_id, "student_id": student_id,
+                    "owner_teacher_id": teacher_id, "text_content": " ".join(rng.sample(WORDS, 8)),
+                    "grade": round(100 * rng.betavariate(5, 2), 1) if graded else None,
+                    "feedback": "Bien" if graded else None, "is_graded": graded,
+                    "submitted_at": submitted_at,
+                    "graded_at": min(submitted_at + timedelta(days=rng.uniform(0, 3)), self.now) if graded else None,
+                })
+            self.generate_student_activity(student_id, quests)
+
+    def generate(self) -> Dict[str, int]:
+        """Write the whole dataset; returns rows written per table"""
+        from app.models.user import UserRole
+
+        quests = self.generate_quests()
+        for t in range(self.options.teachers):
+            teacher_id = self._user(UserRole.TEACHER)
+            for s in range(self.options.schools):
+                school_id = self._id("schools")
+                self.writer.add(self.tables["schools"], {
+                    "id": school_id, "teacher_id": teacher_id, "name": f"École {self.rng.choice(self.last_names)}",
+                    "created_at": self._past(),
+                })
+                for c in range(self.options.classes):
+                    self.generate_class(teacher_id, school_id, quests, f"Groupe {chr(ord('A') + c % 26)}")
+            self.progress(f"teacher {t + 1}/{self.options.teachers}: {sum(self.writer.written.values())} rows written")
+        self.writer.flush()
+        return dict(self.writer.written)
+
+def rebuild_derived(conn, class_ids: List[int], batch_size: int, with_activity: bool,
+                    progress: Optional[Callable[[str], None]] = None) -> None:
+    """Fill the rollups the bulk INSERTs bypassed: dashboard rollups, then activity events and daily stats"""
+    from app.models.dashboard_rollup import rebuild_dashboard_rollup
+
+    progress = progress or (lambda message: None)
+    for start in range(0, len(class_ids), batch_size):
+        rebuild_dashboard_rollup(conn, class_ids[start:start + batch_size])
+        conn.commit()
+    progress(f"dashboard rollups rebuilt for {len(class_ids)} classes")
+    if with_activity:
+        from app.core.database import AsyncSessionLocal
+        from app.services.stats_rollup_service import StatsRollupService
+
+        async def backfill():
+            async with AsyncSessionLocal() as db:
+                return await StatsRollupService.backfill(db, batch_size=batch_size)
+
+        counts = asyncio.run(backfill())
+        progress(f"activity events logged {counts} and rolled up")
+
+def generate(options: argparse.Namespace, progress: Optional[Callable[[str], None]] = None) -> Dict[str, int]:
+    """Generate into the configured database (creating missing tables) and rebuild derived data"""
+    from app import models  # noqa: F401  registers every table
+    from app.core.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        generator = DataGenerator(conn, options, progress)
+        written = generator.generate()
+        rebuild_derived(conn, generator.class_ids, options.batch_size, not options.skip_activity, progress)
+    return written
+
+def main():
+    options = build_parser().parse_args()
+    if options.database_url:
+        os.environ["DATABASE_URL"] = options.database_url  # Before the app's settings are loaded
+
+    started = time.perf_counter()
+    written = generate(options, progress=lambda message: print(f"  {message}", flush=True))
+    elapsed = time.perf_counter() - started
+    total = sum(written.values())
+    for table, count in written.items():
+        print(f"{table:<26} {count:>12}")
+    print(f"{total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+
+from app.core import query_tracking
+
+@pytest.fixture
+def assert_max_queries():
+    """Context manager failing the test when its block runs more than n SQL statements"""
+    return query_tracking.assert_max_queries
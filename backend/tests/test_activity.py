@@ -0,0 +1,77 @@
+"""
+Activity event log tests
+"""
+
+import asyncio
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base
+from app.models import (
+    User, School, Class, StudentClass, Assignment, Submission, Quest, QuestAttempt, Correction, ActivityEvent
+)
+from app.services.activity_service import ActivityService
+
+def test_actions_are_logged_and_aggregated(tmp_path):
+    """Test writes append events in their own transaction and the feeds read them back"""
+    db_path = tmp_path / "activity.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+
+    teacher = User(name="Teacher", email="t@example.com", password_hash="x", role="teacher")
+    student = User(name="Sara", email="s@example.com", password_hash="x", role="student")
+    db.add_all([teacher, student])
+    db.flush()
+    school = School(name="School", teacher_id=teacher.id)
+    db.add(school)
+    db.flush()
+    class_obj = Class(name="French A", school_id=school.id, owner_teacher_id=teacher.id)
+    db.add(class_obj)
+    db.flush()
+    assignment = Assignment(title="HW", class_id=class_obj.id, created_by_teacher_id=teacher.id, owner_teacher_id=teacher.id)
+    quest = Quest(title="Q", quest_type="multiple_choice", content_json={}, points_reward=10)
+    db.add_all([StudentClass(student_id=student.id, class_id=class_obj.id), assignment, quest])
+    db.flush()
+    submission = Submission(assignment_id=assignment.id, student_id=student.id, owner_teacher_id=teacher.id)
+    db.add_all([
+        submission,
+        QuestAttempt(quest_id=quest.id, student_id=student.id, answer_data={}, is_correct=False,
+                     points_earned=5, time_taken=600),
+        Correction(student_id=student.id, corrections_data=[{}, {}, {}], ai_score=70),
+        Correction(student_id=student.id),  # Upload still being processed
+    ])
+    db.commit()
+    submission.is_graded, submission.grade = True, 90
+    db.commit()
+
+    events = db.execute(select(ActivityEvent.kind, ActivityEvent.actor_id, ActivityEvent.class_id, ActivityEvent.score)
+                        .order_by(ActivityEvent.kind)).all()
+    assert events == [
+        ("correction", student.id, None, 70.0),
+        ("enrollment", teacher.id, class_obj.id, None),
+        ("grade", teacher.id, class_obj.id, 90.0),
+        ("quest_attempt", student.id, None, 50.0),
+        ("submission", student.id, class_obj.id, None),
+    ]
+
+    async def read():
+        async with async_session() as session:
+            return (
+                await ActivityService.class_feed(session, [class_obj.id]),
+                await ActivityService.student_feed(session, student.id),
+                await ActivityService.ensure_partitions(session),
+            )
+
+    feed, student_feed, partitions = asyncio.run(read())
+    assert [item["message"] for item in feed] == [
+        "Graded Sara's submission in French A", "New submission from Sara in French A", "Sara joined French A"
+    ]
+    assert len(student_feed) == 5
+    assert partitions == []
+    db.close()
+    engine.dispose()
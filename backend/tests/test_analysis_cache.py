@@ -0,0 +1,55 @@
+"""
+Correction/dictation analysis cache tests
+"""
+
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.services.analysis_service import AnalysisService, DICTATION, analysis_cache
+
+def test_cache_key_ignores_spacing_but_not_exercise():
+    """Test near-identical submissions share a key while other exercises do not"""
+    key = AnalysisService.cache_key(DICTATION, "Le  chat\n dort. ", "fr", 7)
+
+    assert AnalysisService.cache_key(DICTATION, "Le chat dort.", "fr", 7) == key
+    assert AnalysisService.cache_key(DICTATION, "كتـــاب", "ar", 7) == AnalysisService.cache_key(DICTATION, "كتاب", "ar", 7)
+    assert AnalysisService.cache_key(DICTATION, "Le chat dort.", "fr", 8) != key
+    assert AnalysisService.cache_key(DICTATION, "le chat dort.", "fr", 7) != key
+
+def test_repeated_analysis_is_computed_once_and_persisted(tmp_path, monkeypatch):
+    """Test hits skip the analysis and persisted results survive a cleared memory cache"""
+    db_path = tmp_path / "analysis.db"
+    Base.metadata.create_all(bind=create_engine(f"sqlite:///{db_path}"))
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    monkeypatch.setattr(settings, "ANALYSIS_CACHE_PERSIST", True)
+    analysis_cache.clear()
+    calls = []
+
+    def analyze():
+        calls.append(1)
+        return {"errors": [], "score": 100}
+
+    async def run():
+        results = []
+        for text in ("Le chat dort.", "Le chat  dort. "):
+            async with async_session() as db:
+                results.append(await AnalysisService.get_or_compute(db, DICTATION, text, analyze, "fr", 1))
+                await db.commit()
+        analysis_cache.clear()  # As after a restart
+        async with async_session() as db:
+            results.append(await AnalysisService.get_or_compute(db, DICTATION, "Le chat dort.", analyze, "fr", 1))
+        await async_engine.dispose()
+        return results
+
+    persisted_before = AnalysisService.persisted_hits
+    results = asyncio.run(run())
+    analysis_cache.clear()
+
+    assert results == [{"errors": [], "score": 100}] * 3
+    assert len(calls) == 1
+    assert AnalysisService.persisted_hits == persisted_before + 1
@@ -0,0 +1,83 @@
+"""
+In-process cache tests
+"""
+
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import TTLCache, PrincipalCache
+from app.core.database import Base
+from app.core.security import principal_cache
+from app.models import User
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test LRU eviction once the cache is full"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_cache_expires_entries():
+    """Test entries expire after their TTL"""
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_principal_cache_invalidates_every_token_of_a_user():
+    """Test invalidating a user drops entries for all of their tokens"""
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set((1, "token-a"), "user-1")
+    cache.set((1, "token-b"), "user-1")
+    cache.set((2, "token-c"), "user-2")
+
+    cache.invalidate_user(1)
+
+    assert cache.get((1, "token-a")) is None
+    assert cache.get((1, "token-b")) is None
+    assert cache.get((2, "token-c")) == "user-2"
+
+def test_user_writes_evict_cached_principals(tmp_path):
+    """Test any column change to a user, or deleting them, drops their cached principals"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'principals.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = User(name="Sara", email="s@example.com", password_hash="x", role="student")
+    db.add(user)
+    db.commit()
+
+    principal_cache.set((user.id, "token"), user)
+    user.name = "Sara B."
+    db.commit()
+    assert principal_cache.get((user.id, "token")) is None
+
+    principal_cache.set((user.id, "token"), user)
+    db.delete(user)
+    db.commit()
+    assert principal_cache.get((user.id, "token")) is None
+    db.close()
+    engine.dispose()
+
+def test_ttl_cache_enforces_byte_budget():
+    """Test least recently used entries go once the byte budget is exceeded"""
+    cache = TTLCache(maxsize=100, ttl=60, maxbytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    assert cache.get("a") == "xxxx"
+    cache.set("c", "xxxx")
+
+    assert cache.get("b") is None
+    assert cache.bytes == 8
+    cache.set("huge", "x" * 11)
+    assert cache.get("huge") is None
+    assert len(cache) == 2
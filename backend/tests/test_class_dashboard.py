@@ -0,0 +1,109 @@
+"""
+Class dashboard tests
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base, get_async_db
+from app.core.security import create_access_token
+from app.models import User, School, Class, StudentClass, Assignment, Submission, ProgressStats, TeacherDashboardRollup
+from main import app
+
+MAX_DASHBOARD_QUERIES = 3
+
+@pytest.fixture
+def dashboard_db(tmp_path):
+    """File-backed SQLite database shared by a sync seeding engine and the app's async engine"""
+    db_path = tmp_path / "dashboard.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session() as db:
+            yield db
+
+    previous = app.dependency_overrides.get(get_async_db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield sessionmaker(bind=engine)(), async_engine
+    if previous is None:
+        app.dependency_overrides.pop(get_async_db, None)
+    else:
+        app.dependency_overrides[get_async_db] = previous
+    engine.dispose()
+
+def seed_class(db, teacher, school, name, student_count):
+    class_obj = Class(school_id=school.id, name=name)
+    assignments = [
+        Assignment(class_obj=class_obj, created_by_teacher_id=teacher.id, title=f"{name} {i}") for i in range(2)
+    ]
+    db.add_all([class_obj, *assignments])
+    for i in range(student_count):
+        student = User(name=f"{name} student {i}", email=f"{name}{i}@example.com", password_hash="x", role="student")
+        db.add(student)
+        db.flush()
+        db.add_all([
+            StudentClass(student_id=student.id, class_id=class_obj.id),
+            ProgressStats(student_id=student.id, lessons_completed=i, stars_earned=2 * i),
+            Submission(assignment=assignments[0], student_id=student.id, text_content="x", is_graded=True, grade=50 + i),
+        ])
+    db.commit()
+    return class_obj.id
+
+def test_class_dashboard_query_count_is_constant(dashboard_db):
+    """Test the class dashboard costs the same number of statements for any roster size"""
+    db, async_engine = dashboard_db
+    teacher = User(name="teacher", email="teacher@example.com", password_hash="x", role="teacher")
+    db.add(teacher)
+    db.commit()
+    school = School(name="School", teacher_id=teacher.id)
+    db.add(school)
+    db.flush()
+    small = seed_class(db, teacher, school, "small", 1)
+    large = seed_class(db, teacher, school, "large", 8)
+
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": str(teacher.id)})}
+    statements = []
+    event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    counts = {}
+    client.get(f"/api/v1/stats/dashboard/class/{small}", headers=headers)  # warm the principal cache
+    for class_id in (small, large):
+        statements.clear()
+        response = client.get(f"/api/v1/stats/dashboard/class/{class_id}", headers=headers)
+        assert response.status_code == 200, response.text
+        counts[class_id] = len(statements)
+
+    assert counts[small] == counts[large] <= MAX_DASHBOARD_QUERIES, statements
+    data = response.json()
+    assert data["student_count"] == 8
+    assert len(data["recent_submissions"]) == 8
+    assert data["student_progress"][0]["submission_count"] == 1
+    assert data["student_progress"][0]["completion_rate"] == 0.5
+    assert data["average_grade"] == pytest.approx(53.5)
+
+def test_class_stats_without_rollup_row(dashboard_db):
+    """Test class stats fall back to zeros for a class that has no rollup row yet"""
+    db, _ = dashboard_db
+    teacher = User(name="teacher", email="teacher@example.com", password_hash="x", role="teacher")
+    db.add(teacher)
+    db.commit()
+    school = School(name="School", teacher_id=teacher.id)
+    db.add(school)
+    db.flush()
+    class_id = seed_class(db, teacher, school, "legacy", 2)
+    db.execute(delete(TeacherDashboardRollup).where(TeacherDashboardRollup.class_id == class_id))
+    db.commit()
+
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": str(teacher.id)})}
+    response = client.get(f"/api/v1/classes/{class_id}/stats", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json() == {"total_students": 0, "total_assignments": 0, "average_grade": None, "completion_rate": 0.0}
@@ -0,0 +1,104 @@
+"""
+Daily stats rollup tests
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, delete, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base
+from app.models import User, Quest, QuestAttempt, Correction, ActivityEvent, StudentDailyStats
+from app.services.stats_rollup_service import StatsRollupService
+
+def test_rollups_follow_writes_and_rebuild_from_history(tmp_path):
+    """Test rollups are kept on write, sum into weeks and months, and the backfill reproduces them"""
+    db_path = tmp_path / "daily.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+
+    student = User(name="Sara", email="s@example.com", password_hash="x", role="student")
+    quest = Quest(title="Q", quest_type="multiple_choice", content_json={}, points_reward=10)
+    db.add_all([student, quest])
+    db.flush()
+    db.add_all([
+        QuestAttempt(quest_id=quest.id, student_id=student.id, answer_data={}, is_correct=True,
+                     points_earned=10, time_taken=300),
+        QuestAttempt(quest_id=quest.id, student_id=student.id, answer_data={}, is_correct=False,
+                     points_earned=5, time_taken=300),
+        Correction(student_id=student.id, corrections_data=[{}, {}], ai_score=80),
+    ])
+    db.commit()
+
+    # Move the correction and its event ten days back, as if it happened then
+    ten_days_ago = datetime.utcnow() - timedelta(days=10)
+    db.execute(update(Correction).values(created_at=ten_days_ago))
+    db.execute(update(ActivityEvent).where(ActivityEvent.kind == "correction").values(ts=ten_days_ago))
+    db.commit()
+
+    def stats():
+        async def read():
+            async with async_session() as session:
+                return await StatsRollupService.student_stats(session, student.id)
+        return asyncio.run(read())
+
+    def backfill():
+        async def run():
+            async with async_session() as session:
+                return await StatsRollupService.backfill(session, batch_size=1)
+        return asyncio.run(run())
+
+    # Written on insert, so the correction still counts today until the rollups are rebuilt
+    assert stats()["weekly"]["lessons_completed"] == 1
+
+    assert backfill()["rolled_up"] == 3
+    expected = stats()
+    assert expected["weekly"] == {
+        "time_spent": 10, "lessons_completed": 0, "quests_completed": 2, "errors_corrected": 0,
+        "accuracy": 0.5, "average_score": 75.0,
+    }
+    assert expected["monthly"]["lessons_completed"] == 1 and expected["monthly"]["errors_corrected"] == 2
+    assert expected["monthly"]["average_score"] == round((100 + 50 + 80) / 3, 1)
+
+    # History from before the activity log is logged, then rolled up the same way
+    db.execute(delete(ActivityEvent))
+    db.execute(delete(StudentDailyStats))
+    db.commit()
+    counts = backfill()
+    assert (counts["quest_attempt"], counts["correction"], counts["rolled_up"]) == (2, 1, 3)
+    assert stats() == expected
+    assert backfill()["quest_attempt"] == 0
+    assert len(db.scalars(select(StudentDailyStats)).all()) == 2
+    db.close()
+    engine.dispose()
+
+def test_partial_credit_is_not_counted_correct(tmp_path):
+    """Test an incorrect attempt earning the full reward, and a zero-point quest, roll up by is_correct"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'partial.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    student = User(name="Sara", email="s@example.com", password_hash="x", role="student")
+    quest = Quest(title="Q", quest_type="dictation", content_json={}, points_reward=10)
+    unscored = Quest(title="Practice", quest_type="multiple_choice", content_json={}, points_reward=0)
+    db.add_all([student, quest, unscored])
+    db.flush()
+    db.add_all([
+        QuestAttempt(quest_id=quest.id, student_id=student.id, answer_data={}, is_correct=False, points_earned=10),
+        QuestAttempt(quest_id=unscored.id, student_id=student.id, answer_data={}, is_correct=True, points_earned=0),
+        QuestAttempt(quest_id=unscored.id, student_id=student.id, answer_data={}, is_correct=False, points_earned=0),
+    ])
+    db.commit()
+
+    events = db.execute(select(ActivityEvent.correct, ActivityEvent.score).order_by(ActivityEvent.id)).all()
+    assert events == [(False, 100.0), (True, 100.0), (False, None)]
+    daily = db.scalars(select(StudentDailyStats)).one()
+    assert (daily.quests_completed, daily.quests_correct) == (3, 1)
+    db.close()
+    engine.dispose()
@@ -0,0 +1,90 @@
+"""
+Teacher dashboard rollup tests
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import User, School, Class, StudentClass, Assignment, Submission, TeacherDashboardRollup
+from app.models.dashboard_rollup import rebuild_dashboard_rollup
+
+COUNTERS = (
+    "teacher_id", "student_count", "assignment_count", "submission_count",
+    "pending_count", "graded_count", "grade_sum"
+)
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+def snapshot(db):
+    db.expire_all()
+    rows = db.scalars(select(TeacherDashboardRollup).order_by(TeacherDashboardRollup.class_id)).all()
+    return [(row.class_id,) + tuple(getattr(row, name) for name in COUNTERS) for row in rows]
+
+def assert_matches_rebuild(db):
+    """The incrementally maintained rows must equal a from-scratch recomputation"""
+    incremental = snapshot(db)
+    rebuild_dashboard_rollup(db.connection())
+    assert snapshot(db) == incremental
+    db.rollback()
+
+def test_rollup_tracks_every_write(session):
+    """Test enrollments, assignments, submissions and grades keep the rollup exact"""
+    teacher = User(name="teacher", email="teacher@example.com", password_hash="x", role="teacher")
+    students = [
+        User(name=f"student{i}", email=f"student{i}@example.com", password_hash="x", role="student")
+        for i in range(2)
+    ]
+    session.add_all([teacher, *students])
+    session.commit()
+    school = School(name="School", teacher_id=teacher.id)
+    class_obj = Class(school=school, name="Class A")
+    session.add_all([school, class_obj])
+    session.commit()
+    assert_matches_rebuild(session)
+
+    session.add_all([StudentClass(student_id=student.id, class_id=class_obj.id) for student in students])
+    essay = Assignment(class_id=class_obj.id, created_by_teacher_id=teacher.id, title="Essay")
+    quiz = Assignment(class_id=class_obj.id, created_by_teacher_id=teacher.id, title="Quiz")
+    session.add_all([essay, quiz])
+    session.commit()
+    first = Submission(assignment_id=essay.id, student_id=students[0].id, text_content="a")
+    second = Submission(assignment_id=essay.id, student_id=students[1].id, text_content="b")
+    third = Submission(assignment_id=quiz.id, student_id=students[0].id, text_content="c")
+    session.add_all([first, second, third])
+    session.commit()
+    assert_matches_rebuild(session)
+
+    # Grade, then regrade after the session expired the loaded values
+    first.grade, first.is_graded = 80, True
+    second.grade, second.is_graded = 60, True
+    session.commit()
+    first.grade = 90
+    session.commit()
+    assert_matches_rebuild(session)
+
+    rollup = session.get(TeacherDashboardRollup, class_obj.id)
+    assert rollup.pending_count == 1
+    assert rollup.average_grade == 75
+    assert rollup.completion_rate == 0.75
+
+    session.delete(third)
+    session.commit()
+    session.delete(essay)
+    session.commit()
+    enrollment = session.scalar(select(StudentClass).where(StudentClass.student_id == students[1].id))
+    session.delete(enrollment)
+    session.commit()
+    assert_matches_rebuild(session)
+
+    rollup = session.get(TeacherDashboardRollup, class_obj.id)
+    assert (rollup.student_count, rollup.assignment_count, rollup.submission_count) == (1, 1, 0)
+    assert rollup.average_grade is None
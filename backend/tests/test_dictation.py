@@ -0,0 +1,44 @@
+"""
+Dictation engine tests
+"""
+
+from app.core.dictation import (
+    check_dictation, reference_text, ACCENT, CASE, DIACRITICS, EXTRA_WORD, LETTER_VARIANT,
+    MISSING_WORD, SPELLING
+)
+
+def describe(report):
+    return [(error.type, error.word, error.correction, error.position) for error in report.errors]
+
+def test_alignment_handles_repeated_words():
+    """Test a dropped repeated word is reported once, at the right place"""
+    report = check_dictation("il a dit que que tu as dit", "il a dit que tu as dit")
+
+    assert describe(report) == [(MISSING_WORD, "", "que", 4)]
+
+def test_errors_are_classified_in_french_and_arabic():
+    """Test substitutions are labelled by what differs"""
+    french = check_dictation("Le chat dort sur le tapis", "le chat dors sur tapis rouge")
+    arabic = check_dictation("كَتَبَ الطالب إلى المدرسة", "كتب الطالب الى المدرسه")
+
+    assert describe(french) == [
+        (CASE, "le", "Le", 0), (SPELLING, "dors", "dort", 2), (MISSING_WORD, "", "le", 4), (EXTRA_WORD, "rouge", "", 5)
+    ]
+    assert [error.type for error in arabic.errors] == [DIACRITICS, LETTER_VARIANT, LETTER_VARIANT]
+    assert check_dictation("l'élève", "l’eleve").errors[0].type == ACCENT
+    assert check_dictation("ذهبـــت", "ذهبت").errors == []
+
+def test_alignment_work_grows_linearly():
+    """Test the banded alignment computes cells in proportion to passage length"""
+    def cells(words):
+        reference = " ".join(f"w{i % 50}" for i in range(words))
+        student = " ".join(f"w{i % 50}" if i % 20 else "x" for i in range(words))
+        return check_dictation(reference, student).cells
+
+    assert cells(5000) < 12 * cells(500)
+
+def test_reference_text_comes_from_content_json():
+    """Test only a non-empty text field counts as a reference"""
+    assert reference_text({"text": "Le chat"}) == "Le chat"
+    assert reference_text({"text": "  "}) is None
+    assert reference_text({}) is None
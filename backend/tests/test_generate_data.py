@@ -0,0 +1,62 @@
+"""
+Synthetic data generator tests
+"""
+
+from sqlalchemy import create_engine, select, func
+
+from app.core.database import Base
+from app.models import (
+    User, Submission, QuestAttempt, ProgressStats, StudentQuestProgress, TeacherDashboardRollup
+)
+from scripts.generate_data import DataGenerator, default_options, rebuild_derived
+
+def _generate(path, **overrides):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    options = default_options(
+        teachers=2, schools=1, classes=2, class_size=6, assignments=3, quests=8, attempts=6, corrections=2,
+        batch_size=50, **overrides
+    )
+    with engine.connect() as conn:
+        generator = DataGenerator(conn, options)
+        written = generator.generate()
+        rebuild_derived(conn, generator.class_ids, options.batch_size, with_activity=False)
+    return engine, written
+
+def test_generated_data_is_deterministic_and_aggregates_match_rows(tmp_path):
+    """Test one seed gives the same rows and the bulk-filled aggregates agree with the source rows"""
+    engine, written = _generate(tmp_path / "first.db", seed=7)
+    again, written_again = _generate(tmp_path / "second.db", seed=7)
+    assert written == written_again
+    assert written["users"] == 2 + written["student_classes"]
+
+    def fingerprint(bind):
+        with bind.connect() as conn:
+            return (
+                conn.execute(select(User.name, User.email).order_by(User.id)).all(),
+                conn.execute(select(QuestAttempt.quest_id, QuestAttempt.is_correct).order_by(QuestAttempt.id)).all(),
+            )
+    assert fingerprint(engine) == fingerprint(again)
+
+    with engine.connect() as conn:
+        attempts = dict(conn.execute(
+            select(QuestAttempt.student_id, func.count()).group_by(QuestAttempt.student_id)
+        ).all())
+        points = dict(conn.execute(
+            select(QuestAttempt.student_id, func.sum(QuestAttempt.points_earned)).group_by(QuestAttempt.student_id)
+        ).all())
+        distinct = dict(conn.execute(
+            select(QuestAttempt.student_id, func.count(QuestAttempt.quest_id.distinct())).group_by(QuestAttempt.student_id)
+        ).all())
+        for row in conn.execute(select(StudentQuestProgress)).all():
+            assert (row.attempts, row.points_total, row.quests_attempted) == (
+                attempts[row.student_id], points[row.student_id], distinct[row.student_id]
+            )
+        for student_id, quests_completed, stars in conn.execute(
+            select(ProgressStats.student_id, ProgressStats.quests_completed, ProgressStats.stars_earned)
+        ):
+            assert (quests_completed, stars) == (attempts.get(student_id, 0), points.get(student_id, 0))
+        rollups = conn.execute(select(func.sum(TeacherDashboardRollup.submission_count))).scalar()
+        assert rollups == conn.execute(select(func.count(Submission.id))).scalar() == written["submissions"]
+    engine.dispose()
+    again.dispose()
@@ -0,0 +1,46 @@
+"""
+Password hashing pool tests
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.hashing import PasswordHashingPool
+
+def test_pool_runs_work_off_loop():
+    """Test hashing work runs in a worker thread"""
+    pool = PasswordHashingPool(max_workers=1, max_pending=4)
+    loop_thread = threading.get_ident()
+
+    async def run():
+        return await pool.run(threading.get_ident)
+
+    worker_thread = asyncio.run(run())
+    pool.shutdown()
+
+    assert worker_thread != loop_thread
+    assert pool.stats()["completed"] == 1
+
+def test_pool_sheds_load_when_full():
+    """Test requests beyond the queue limit get 429"""
+    pool = PasswordHashingPool(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def run():
+        first = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(release.wait)
+        release.set()
+        await first
+        return exc_info.value
+
+    error = asyncio.run(run())
+    pool.shutdown()
+
+    assert error.status_code == 429
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["queue_length"] == 0
@@ -0,0 +1,150 @@
+"""
+Background job queue tests
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.database import Base, get_async_db
+from app.core.jobs import JobQueue, job_queue
+from app.core.security import create_access_token
+from app.models import User, Correction, ProgressStats, Job
+from app.models.job import JobStatus
+from app.services.write_fix_service import WriteFixEngine, WriteFixService
+from main import app
+
+class StandInEngine(WriteFixEngine):
+    """In-process OCR engine that records what it was asked to read"""
+
+    def __init__(self):
+        self.images = []
+
+    def extract_text(self, image_path):
+        self.images.append(image_path)
+        return {"extracted_text": "Je suis alle a l'ecole.", "corrections": [{"original": "alle", "corrected": "allé"}]}
+
+    def feedback(self, text, corrections):
+        return {"feedback": "1 accent", "suggestions": [], "score": 90, "mini_lesson": {"title": "Accents"}}
+
+@pytest.fixture
+def job_db(tmp_path):
+    db_path = tmp_path / "jobs.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+    student = User(name="student", email="student@example.com", password_hash="x", role="student")
+    db.add(student)
+    db.flush()
+    db.add(ProgressStats(student_id=student.id, stars_earned=0, lessons_completed=0))
+    db.commit()
+    yield db, async_session, student.id
+    db.close()
+    engine.dispose()
+
+def make_queue(async_session, **options):
+    options = {"workers": 0, "visibility_timeout": 60, "poll_interval": 0.01, "retry_delay": 0, **options}
+    return JobQueue(async_session, **options)
+
+def enqueue(async_session, queue, user_id, kind, payload=None, max_attempts=None):
+    async def run():
+        async with async_session() as db:
+            job = await queue.enqueue(db, kind, user_id, payload, max_attempts=max_attempts)
+            await db.commit()
+            return job.id
+    return asyncio.run(run())
+
+def test_failed_jobs_are_retried_then_marked_failed(job_db):
+    """Test a failing handler runs max_attempts times and records its last error"""
+    db, async_session, student_id = job_db
+    queue = make_queue(async_session)
+    calls = []
+
+    @queue.handler("flaky")
+    async def flaky(session, job):
+        calls.append(job.attempts)
+        raise RuntimeError(f"attempt {job.attempts}")
+
+    job_id = enqueue(async_session, queue, student_id, "flaky", max_attempts=3)
+    assert asyncio.run(queue.run_until_idle()) == 3
+
+    job = db.get(Job, job_id)
+    assert calls == [1, 2, 3]
+    assert job.status == JobStatus.FAILED
+    assert job.error == "attempt 3"
+    assert queue.retried == 2 and queue.failed == 1
+
+def test_expired_claims_are_taken_over(job_db):
+    """Test a job whose worker died is picked up again after the visibility timeout"""
+    db, async_session, student_id = job_db
+    queue = make_queue(async_session, visibility_timeout=0)
+
+    @queue.handler("echo")
+    async def echo(session, job):
+        return {"attempt": job.attempts}
+
+    job_id = enqueue(async_session, queue, student_id, "echo")
+
+    async def crash_then_recover():
+        async with async_session() as session:
+            assert (await queue.claim(session, "crashed-worker")).id == job_id
+        return await queue.run_one("healthy-worker")
+
+    assert asyncio.run(crash_then_recover())
+    job = db.get(Job, job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"attempt": 2}
+
+def test_write_fix_upload_is_processed_in_the_background(job_db, tmp_path, monkeypatch):
+    """Test the upload returns 202 at once and the job fills in the correction"""
+    db, async_session, student_id = job_db
+    engine = StandInEngine()
+    monkeypatch.setattr(WriteFixService, "engine", engine)
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(job_queue, "session_factory", async_session)
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    previous = app.dependency_overrides.get(get_async_db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        client = TestClient(app)
+        headers = {
+            "Authorization": "Bearer " + create_access_token({"sub": str(student_id)}),
+            "Idempotency-Key": "page-1",
+        }
+        upload = {"file": ("page.jpg", b"\xff\xd8 page", "image/jpeg")}
+        first = client.post("/api/v1/quests/write-fix/upload", files=upload, headers=headers)
+        retried = client.post("/api/v1/quests/write-fix/upload", files=upload, headers=headers)
+
+        assert first.status_code == 202
+        assert retried.json()["id"] == first.json()["id"]
+        assert first.headers["Location"] == f"/api/v1/jobs/{first.json()['id']}"
+        assert first.json()["status"] == "queued"
+        assert engine.images == []
+
+        assert asyncio.run(job_queue.run_until_idle()) == 1
+        polled = client.get(first.headers["Location"], headers=headers).json()
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_async_db, None)
+        else:
+            app.dependency_overrides[get_async_db] = previous
+
+    assert polled["status"] == "succeeded"
+    assert polled["result"]["score"] == 90
+    correction = db.get(Correction, polled["payload"]["correction_id"])
+    assert correction.original_text == "Je suis alle a l'ecole."
+    assert correction.uploaded_image_url == engine.images[0]
+    assert db.scalar(select(ProgressStats.stars_earned).where(ProgressStats.student_id == student_id)) == 5
+    assert db.scalar(select(Job.id).where(Job.id != polled["id"])) is None
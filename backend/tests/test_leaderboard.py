@@ -0,0 +1,96 @@
+"""
+Leaderboard tests
+"""
+
+import asyncio
+import bisect
+import random
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.ranking import IndexedSkipList
+from app.models import User, ProgressStats
+from app.services.leaderboard_service import LeaderboardService, CLASS, SCHOOL
+
+def test_skip_list_matches_sorted_list():
+    """Test ranks and ranges agree with a plain sorted list under random inserts and removes"""
+    rng = random.Random(7)
+    skip_list, reference = IndexedSkipList(seed=1), []
+    for _ in range(3000):
+        key = rng.randrange(300)
+        if rng.random() < 0.6:
+            if skip_list.insert(key):
+                bisect.insort(reference, key)
+        elif skip_list.remove(key):
+            reference.remove(key)
+
+    assert list(skip_list) == reference
+    assert all(skip_list.rank(key) == position for position, key in enumerate(reference, 1))
+    assert skip_list.range(5, 10) == reference[4:14]
+    assert skip_list.rank(-1) is None
+
+def test_leaderboard_scopes_and_ranks():
+    """Test star updates reorder the global, class and school boards together"""
+    board = LeaderboardService()
+    for student_id, stars in [(1, 30), (2, 10), (3, 20)]:
+        board.set_stars(student_id, stars)
+    board.enroll(1, class_id=10, school_id=100)
+    board.enroll(2, class_id=10, school_id=100)
+    board.enroll(3, class_id=11, school_id=100)
+    board.enroll(3, class_id=12, school_id=100)
+
+    assert board.top(3) == [(1, 1, 30), (2, 3, 20), (3, 2, 10)]
+    assert board.rank(2, CLASS, 10) == 2
+
+    board.set_stars(2, 50)
+    assert board.rank(2) == 1
+    assert board.top(1, CLASS, 10) == [(1, 2, 50)]
+    assert board.size(SCHOOL, 100) == 3
+
+    # Leaving one of two classes in a school keeps the school membership
+    board.unenroll(3, 11)
+    assert board.is_member(3, SCHOOL, 100)
+    board.drop_class(12)
+    assert not board.is_member(3, SCHOOL, 100)
+    assert board.rank(3, CLASS, 12) is None
+    assert board.rank(3) == 3
+
+def test_leaderboard_resyncs_writes_made_elsewhere(tmp_path, monkeypatch):
+    """Test stars written by another worker or a script show up once the boards are older than the resync interval"""
+    db_path = tmp_path / "leaderboard.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+    first = User(name="First", email="a@example.com", password_hash="x", role="student")
+    second = User(name="Second", email="b@example.com", password_hash="x", role="student")
+    db.add_all([first, second])
+    db.flush()
+    db.add(ProgressStats(student_id=first.id, stars_earned=10))
+    db.commit()
+    monkeypatch.setattr(settings, "LEADERBOARD_RESYNC_SECONDS", 60)
+    board = LeaderboardService()
+
+    def ensure_loaded():
+        async def run():
+            async with async_session() as session:
+                await board.ensure_loaded(session)
+        asyncio.run(run())
+
+    ensure_loaded()
+    db.add(ProgressStats(student_id=second.id, stars_earned=30))
+    db.commit()
+    ensure_loaded()
+    assert board.top(5) == [(1, first.id, 10)]
+
+    board._loaded_at -= 60
+    ensure_loaded()
+    assert board.top(5) == [(1, second.id, 30), (2, first.id, 10)]
+    db.close()
+    engine.dispose()
@@ -0,0 +1,85 @@
+"""
+Request metrics tests
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base, get_async_db
+from app.core.metrics import Histogram, metrics, instrument_engine
+from app.core.security import create_access_token
+from app.models import User
+from main import app
+
+def _sample(body: str, prefix: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in body.splitlines() if line.startswith(prefix))
+
+def test_histogram_buckets_are_cumulative():
+    """Test values land in the first bucket whose bound they do not exceed"""
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    lines = histogram.render("latency", ("route",), ("/x",))
+    assert lines == [
+        'latency_bucket{route="/x",le="0.1"} 2',
+        'latency_bucket{route="/x",le="1.0"} 3',
+        'latency_bucket{route="/x",le="+Inf"} 4',
+        'latency_sum{route="/x"} 3.65',
+        'latency_count{route="/x"} 4',
+    ]
+
+def test_requests_are_recorded_by_route_template_with_statement_counts(tmp_path):
+    """Test /metrics reports latency by route template, statements per request and pool checkouts"""
+    db_path = tmp_path / "metrics.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+    student = User(name="student", email="student@example.com", password_hash="x", role="student")
+    db.add(student)
+    db.commit()
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    reported_engine = metrics.engine
+    instrument_engine(async_engine.sync_engine)
+    previous = app.dependency_overrides.get(get_async_db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        client = TestClient(app)
+        before = client.get("/metrics").text
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": str(student.id)})}
+        assert client.get("/api/v1/quests/progress", headers=headers).status_code == 200
+        assert client.get("/api/v1/quests/progress", headers=headers).status_code == 200
+        assert client.get("/no/such/path/42").status_code == 404
+        response = client.get("/metrics")
+    finally:
+        metrics.engine = reported_engine
+        if previous is None:
+            app.dependency_overrides.pop(get_async_db, None)
+        else:
+            app.dependency_overrides[get_async_db] = previous
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    progress = 'http_request_duration_seconds_count{method="GET",route="/api/v1/quests/progress",status="200"}'
+    assert _sample(body, progress) - _sample(before, progress) == 2
+    unmatched = 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}'
+    assert _sample(body, unmatched) - _sample(before, unmatched) == 1
+    assert "/no/such/path/42" not in body
+
+    statements = 'http_request_db_statements_sum{method="GET",route="/api/v1/quests/progress"}'
+    assert _sample(body, statements) - _sample(before, statements) >= 4  # Quest count and aggregate, twice
+    waits = "db_pool_checkout_wait_seconds_count"
+    assert _sample(body, waits) > _sample(before, waits)
+    assert _sample(body, "http_requests_in_flight ") == 1  # This request
+    assert _sample(body, "db_pool_checked_out ") == 0
+    db.close()
+    engine.dispose()
@@ -0,0 +1,60 @@
+"""
+Denormalized ownership tests
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import User, School, Class, Assignment, Submission
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    yield db
+    db.close()
+    engine.dispose()
+
+def make_user(db, name, role):
+    user = User(name=name, email=f"{name}@example.com", password_hash="x", role=role)
+    db.add(user)
+    db.flush()
+    return user
+
+def test_owner_is_filled_from_the_parent_chain(session):
+    """Test rows created without owner_teacher_id inherit the school's teacher"""
+    teacher = make_user(session, "teacher", "teacher")
+    student = make_user(session, "student", "student")
+    school = School(name="School", teacher_id=teacher.id)
+    class_obj = Class(school=school, name="Class A")
+    assignment = Assignment(class_obj=class_obj, created_by_teacher_id=teacher.id, title="Essay")
+    submission = Submission(assignment=assignment, student_id=student.id, text_content="text")
+    session.add_all([school, class_obj, assignment, submission])
+    session.commit()
+
+    assert class_obj.owner_teacher_id == teacher.id
+    assert assignment.owner_teacher_id == teacher.id
+    assert submission.owner_teacher_id == teacher.id
+
+def test_school_handover_reowns_descendants(session):
+    """Test changing a school's teacher moves classes, assignments and submissions with it"""
+    teacher = make_user(session, "teacher", "teacher")
+    successor = make_user(session, "successor", "teacher")
+    student = make_user(session, "student", "student")
+    school = School(name="School", teacher_id=teacher.id)
+    class_obj = Class(school=school, name="Class A")
+    assignment = Assignment(class_obj=class_obj, created_by_teacher_id=teacher.id, title="Essay")
+    submission = Submission(assignment=assignment, student_id=student.id, text_content="text")
+    session.add_all([school, class_obj, assignment, submission])
+    session.commit()
+
+    school.teacher_id = successor.id
+    session.commit()
+    session.expire_all()
+
+    assert class_obj.owner_teacher_id == successor.id
+    assert assignment.owner_teacher_id == successor.id
+    assert submission.owner_teacher_id == successor.id
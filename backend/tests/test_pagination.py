@@ -0,0 +1,50 @@
+"""
+Keyset pagination tests
+"""
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.pagination import (
+    NEXT_CURSOR_HEADER, PageParams, encode_cursor, decode_cursor, keyset_page, finish_page
+)
+from app.models import Quest
+
+def test_cursor_round_trip():
+    """Test cursors decode back to the position they encode"""
+    assert decode_cursor(encode_cursor(None, 42)) == (None, 42)
+
+def test_invalid_cursor_is_rejected():
+    """Test tampered cursors give 400 rather than a server error"""
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+def test_pages_cover_every_row_once():
+    """Test walking the cursors returns each row once, newest first, even with equal timestamps"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    # Server-side timestamps: most rows share the same second
+    db.add_all([
+        Quest(title=f"Quest {i}", quest_type="multiple_choice", content_json={}) for i in range(7)
+    ])
+    db.commit()
+
+    seen, cursor = [], None
+    for _ in range(10):
+        page = PageParams(cursor=cursor, limit=3)
+        response = Response()
+        rows = db.scalars(keyset_page(select(Quest), Quest.created_at, Quest.id, page)).all()
+        seen.extend(quest.id for quest in finish_page(rows, page, response, lambda q: (q.created_at, q.id)))
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    db.close()
+    engine.dispose()
+    assert seen == sorted(seen, reverse=True)
+    assert sorted(seen) == list(range(1, 8))
@@ -0,0 +1,55 @@
+"""
+Progress counter tests
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base
+from app.models import User, ProgressStats
+from app.services.progress_service import ProgressService
+
+def test_increments_do_not_lose_updates_and_track_streaks(tmp_path):
+    """Test concurrent increments all land, the row is created on first use and streaks follow activity days"""
+    db_path = tmp_path / "progress.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+    student = User(name="student", email="student@example.com", password_hash="x", role="student")
+    db.add(student)
+    db.commit()
+
+    async def record(**increments):
+        async with async_session() as session:
+            stars = await ProgressService.record(session, student.id, **increments)
+            await session.commit()
+            return stars
+
+    async def run():
+        return await asyncio.gather(*(record(quests=1, stars=2) for _ in range(10)))
+
+    totals = asyncio.run(run())
+    progress = db.scalar(select(ProgressStats).where(ProgressStats.student_id == student.id))
+    assert (progress.quests_completed, progress.stars_earned, progress.streak_days) == (10, 20, 1)
+    assert max(totals) == 20
+
+    def streak_after_activity(days_ago):
+        db.execute(update(ProgressStats).values(
+            streak_days=3, last_activity_date=datetime.utcnow() - timedelta(days=days_ago)
+        ))
+        db.commit()
+        asyncio.run(record(lessons=1))
+        return db.scalar(select(ProgressStats.streak_days))
+
+    assert streak_after_activity(0) == 3
+    assert streak_after_activity(1) == 4
+    assert streak_after_activity(3) == 1
+    db.close()
+    engine.dispose()
@@ -0,0 +1,86 @@
+"""
+Query plan tests for the hot ownership and enrollment lookups
+"""
+
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, select, func, text
+
+from app.models import (
+    User, Class, StudentClass, Assignment, Submission, QuestAttempt, Correction, TeacherDashboardRollup
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HOT_QUERIES = {
+    "teacher_classes": select(Class).where(Class.owner_teacher_id == 1),
+    "teacher_assignments": select(Assignment).where(Assignment.owner_teacher_id == 1),
+    "teacher_submissions": select(Submission).where(Submission.owner_teacher_id == 1),
+    "teacher_pending_submissions": select(func.count(Submission.id)).where(
+        Submission.owner_teacher_id == 1,
+        Submission.is_graded == False
+    ),
+    "teacher_student_count": select(func.count(StudentClass.id)).join(Class).where(
+        Class.owner_teacher_id == 1
+    ),
+    "owned_assignment": select(Assignment).where(
+        Assignment.id == 1,
+        Assignment.owner_teacher_id == 2
+    ),
+    "teacher_dashboard_rollup": select(TeacherDashboardRollup).where(
+        TeacherDashboardRollup.teacher_id == 1
+    ).order_by(TeacherDashboardRollup.class_id),
+    "enrollment_check": select(StudentClass).where(
+        StudentClass.student_id == 1,
+        StudentClass.class_id == 2
+    ),
+    "existing_submission": select(Submission).where(
+        Submission.assignment_id == 1,
+        Submission.student_id == 2
+    ),
+    "student_assignments": select(Assignment).join(Class).join(StudentClass).where(
+        StudentClass.student_id == 1
+    ),
+    "student_submissions": select(Submission).where(Submission.student_id == 1),
+    "class_roster": select(User).join(StudentClass).where(StudentClass.class_id == 1),
+    "class_recent_submissions": select(Submission).join(Assignment).where(
+        Assignment.class_id == 1
+    ).order_by(Submission.submitted_at.desc()).limit(10),
+    "student_quest_attempts": select(QuestAttempt).where(QuestAttempt.student_id == 1),
+    "teacher_classes_page": select(Class).where(Class.owner_teacher_id == 1).order_by(
+        Class.created_at.desc(), Class.id.desc()
+    ).limit(51),
+    "teacher_submissions_page": select(Submission).where(Submission.owner_teacher_id == 1).order_by(
+        Submission.submitted_at.desc(), Submission.id.desc()
+    ).limit(51),
+    "student_quest_attempts_page": select(QuestAttempt).where(QuestAttempt.student_id == 1).order_by(
+        QuestAttempt.attempted_at.desc(), QuestAttempt.id.desc()
+    ).limit(51),
+    "student_corrections": select(Correction).where(Correction.student_id == 1),
+}
+
+@pytest.fixture(scope="module")
+def migrated_engine(tmp_path_factory):
+    """SQLite database built by running the full Alembic migration chain"""
+    db_path = tmp_path_factory.mktemp("plans") / "plans.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+    yield engine
+    engine.dispose()
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_indexes(migrated_engine, name):
+    """Test hot queries never fall back to a full table scan"""
+    sql = str(HOT_QUERIES[name].compile(migrated_engine, compile_kwargs={"literal_binds": True}))
+    with migrated_engine.connect() as connection:
+        plan = [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+    scans = [step for step in plan if step.startswith("SCAN")]
+    assert not scans, f"{name} scans a table: {plan}"
@@ -0,0 +1,110 @@
+"""
+SQL statement tracking tests
+"""
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.database import Base, get_async_db
+from app.core import query_tracking
+from app.core.query_tracking import QueryStats, SQL_STATS_HEADER, fingerprint, log_queries
+from app.core.security import create_access_token
+from app.models import User, School, Class
+from main import app
+
+def test_fingerprint_folds_literals_and_parameter_lists():
+    """Test loop iterations over different ids share one fingerprint"""
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)") == fingerprint("SELECT * FROM t WHERE id IN (?)")
+    assert fingerprint("SELECT *\n  FROM t WHERE name = 'a''b' AND n = 12") == "SELECT * FROM t WHERE name = ? AND n = ?"
+
+def test_repeated_statements_are_reported_from_threshold():
+    """Test only statement shapes run at least threshold times are reported"""
+    stats = QueryStats()
+    for school_id in range(5):
+        stats.add(f"SELECT count(id) FROM classes WHERE school_id = {school_id}", 0.001)
+    stats.add("SELECT * FROM users WHERE id = ?", 0.001)
+    assert stats.repeated(threshold=5) == [("SELECT count(id) FROM classes WHERE school_id = ?", 5)]
+    assert stats.repeated(threshold=7) == []
+    assert stats.count == 6
+
+def test_repeated_statements_are_logged_as_possible_n_plus_one(caplog, monkeypatch):
+    """Test a request repeating a statement shape logs a warning with the structured summary"""
+    monkeypatch.setattr(query_tracking.logger, "disabled", False)  # Alembic's fileConfig disables existing loggers
+    stats = QueryStats()
+    for class_id in range(6):
+        stats.add(f"SELECT * FROM student_classes WHERE class_id = {class_id}", 0.002)
+    with caplog.at_level(logging.WARNING, logger="app.core.query_tracking"):
+        log_queries("GET", "/api/v1/classes/{class_id}/dashboard", 200, stats)
+    [record] = caplog.records
+    assert "Possible N+1 in GET /api/v1/classes/{class_id}/dashboard: 6 similar statements" in record.getMessage()
+    assert record.sql["statements"] == 6
+    assert record.sql["repeated"] == [{"sql": "SELECT * FROM student_classes WHERE class_id = ?", "count": 6}]
+
+def test_assert_max_queries_fails_listing_statements(assert_max_queries, tmp_path):
+    """Test the fixture raises when a block runs too many statements"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'limit.db'}")
+    with pytest.raises(AssertionError, match="3 statements executed, expected at most 2"):
+        with assert_max_queries(2):
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.exec_driver_sql("SELECT 1")
+    with assert_max_queries(3) as stats:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+    assert stats.count == 1
+    engine.dispose()
+
+def test_school_list_runs_constant_statements_and_reports_them(assert_max_queries, tmp_path, monkeypatch, caplog):
+    """Test listing schools does not query per school and reports its statements in debug mode"""
+    db_path = tmp_path / "schools.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+    teacher = User(name="teacher", email="teacher@example.com", password_hash="x", role="teacher")
+    db.add(teacher)
+    db.flush()
+    schools = [School(teacher_id=teacher.id, name=f"School {n}") for n in range(8)]
+    db.add_all(schools)
+    db.flush()
+    db.add_all([Class(school_id=school.id, name="A", grade_level="3") for school in schools])
+    db.commit()
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    monkeypatch.setattr(settings, "SQL_STATS_HEADER", True)
+    monkeypatch.setattr(query_tracking.logger, "disabled", False)
+    previous = app.dependency_overrides.get(get_async_db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": str(teacher.id)})}
+        with caplog.at_level(logging.WARNING, logger="app.core.query_tracking"):
+            with assert_max_queries(5):
+                response = client.get("/api/v1/schools/", headers=headers)
+        monkeypatch.setattr(settings, "SQL_STATS_HEADER", False)
+        quiet = client.get("/api/v1/schools/", headers=headers)
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_async_db, None)
+        else:
+            app.dependency_overrides[get_async_db] = previous
+
+    assert response.status_code == 200
+    assert [school["class_count"] for school in response.json()] == [1] * 8
+    assert response.headers[SQL_STATS_HEADER].startswith("statements=")
+    assert "max_repeat=0" in response.headers[SQL_STATS_HEADER]
+    assert SQL_STATS_HEADER not in quiet.headers
+    assert not caplog.records
+    db.close()
+    engine.dispose()
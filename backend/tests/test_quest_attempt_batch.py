@@ -0,0 +1,115 @@
+"""
+Batched quest attempt tests
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base, get_async_db
+from app.core.security import create_access_token
+from app.models import User, ProgressStats, Quest, QuestAttempt, ActivityEvent, StudentDailyStats
+from main import app
+
+def test_batch_is_recorded_once_with_one_progress_delta(tmp_path):
+    """Test a resent batch reports duplicates and progress counts each attempt once"""
+    db_path = tmp_path / "batch.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+    student = User(name="student", email="student@example.com", password_hash="x", role="student")
+    quest = Quest(title="Choice", quest_type="multiple_choice", content_json={"correct_answer": "b"}, points_reward=10)
+    db.add_all([student, quest])
+    db.flush()
+    db.add(ProgressStats(student_id=student.id, stars_earned=5, quests_completed=0, streak_days=0))
+    db.commit()
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    played_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    batch = {"attempts": [
+        {"client_attempt_id": "a1", "quest_id": quest.id, "answer_data": {"selected_option": "b"},
+         "attempted_at": played_at.isoformat()},
+        {"client_attempt_id": "a2", "quest_id": quest.id, "answer_data": {"selected_option": "c"}},
+        {"client_attempt_id": "a1", "quest_id": quest.id, "answer_data": {"selected_option": "b"}},
+        {"client_attempt_id": "a3", "quest_id": quest.id + 100, "answer_data": {}},
+    ]}
+    previous = app.dependency_overrides.get(get_async_db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": str(student.id)})}
+        first = client.post("/api/v1/quests/attempts/batch", json=batch, headers=headers)
+        resent = client.post("/api/v1/quests/attempts/batch", json=batch, headers=headers)
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_async_db, None)
+        else:
+            app.dependency_overrides[get_async_db] = previous
+
+    assert first.status_code == 200
+    body = first.json()
+    assert [result["status"] for result in body["results"]] == ["created", "created", "duplicate", "rejected"]
+    assert body["results"][2]["attempt_id"] == body["results"][0]["attempt_id"]
+    assert (body["created"], body["points_earned"]) == (2, 10)
+    assert [result["status"] for result in resent.json()["results"]] == ["duplicate", "duplicate", "duplicate", "rejected"]
+
+    progress = db.scalar(select(ProgressStats).where(ProgressStats.student_id == student.id))
+    assert (progress.quests_completed, progress.stars_earned, progress.streak_days) == (2, 15, 1)
+    assert db.scalar(select(func.count()).select_from(QuestAttempt)) == 2
+    stored = db.scalar(select(QuestAttempt.attempted_at).where(QuestAttempt.client_attempt_id == "a1"))
+    assert abs(stored - played_at.replace(tzinfo=None)) < timedelta(seconds=1)
+    db.close()
+    engine.dispose()
+
+def test_offline_attempts_count_towards_the_day_they_were_played(tmp_path):
+    """Test a synced attempt from days ago is logged and rolled up on its own day, not the sync day"""
+    db_path = tmp_path / "offline.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+    student = User(name="student", email="student@example.com", password_hash="x", role="student")
+    quest = Quest(title="Choice", quest_type="multiple_choice", content_json={"correct_answer": "b"}, points_reward=10)
+    db.add_all([student, quest])
+    db.commit()
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    played_at = datetime.now(timezone.utc) - timedelta(days=4)
+    batch = {"attempts": [
+        {"client_attempt_id": "old", "quest_id": quest.id, "answer_data": {"selected_option": "b"},
+         "attempted_at": played_at.isoformat(), "time_taken": 120},
+    ]}
+    previous = app.dependency_overrides.get(get_async_db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": str(student.id)})}
+        response = client.post("/api/v1/quests/attempts/batch", json=batch, headers=headers)
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_async_db, None)
+        else:
+            app.dependency_overrides[get_async_db] = previous
+
+    assert response.status_code == 200, response.text
+    event_ts = db.scalar(select(ActivityEvent.ts).where(ActivityEvent.kind == "quest_attempt"))
+    assert abs(event_ts - played_at.replace(tzinfo=None)) < timedelta(seconds=1)
+    daily = db.scalars(select(StudentDailyStats).where(StudentDailyStats.student_id == student.id)).all()
+    assert [(row.day, row.quests_completed, row.quests_correct, row.time_spent) for row in daily] == [
+        (played_at.date(), 1, 1, 120)
+    ]
+    db.close()
+    engine.dispose()
@@ -0,0 +1,66 @@
+"""
+Quest progress aggregate tests
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base, get_async_db
+from app.core.security import create_access_token
+from app.models import User, Quest, QuestAttempt, StudentQuestProgress, StudentQuestAttempted
+from main import app
+
+def test_progress_aggregate_follows_single_and_batched_attempts(tmp_path):
+    """Test attempts saved one by one or in a batch keep the aggregate the endpoint reads"""
+    db_path = tmp_path / "quest_progress.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_session = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    db = sessionmaker(bind=engine)()
+    student = User(name="student", email="student@example.com", password_hash="x", role="student")
+    first = Quest(title="One", quest_type="multiple_choice", content_json={"correct_answer": "b"}, points_reward=10)
+    second = Quest(title="Two", quest_type="multiple_choice", content_json={"correct_answer": "a"}, points_reward=4)
+    third = Quest(title="Three", quest_type="multiple_choice", content_json={"correct_answer": "a"}, points_reward=1)
+    db.add_all([student, first, second, third])
+    db.flush()
+    db.add(QuestAttempt(quest_id=first.id, student_id=student.id, answer_data={}, is_correct=True, points_earned=10))
+    db.add(QuestAttempt(quest_id=first.id, student_id=student.id, answer_data={}, is_correct=False, points_earned=0))
+    db.commit()
+
+    async def override_get_async_db():
+        async with async_session() as session:
+            yield session
+
+    batch = {"attempts": [
+        {"client_attempt_id": "a1", "quest_id": first.id, "answer_data": {"selected_option": "b"}},
+        {"client_attempt_id": "a2", "quest_id": second.id, "answer_data": {"selected_option": "a"}},
+        {"client_attempt_id": "a3", "quest_id": second.id, "answer_data": {"selected_option": "c"}},
+    ]}
+    previous = app.dependency_overrides.get(get_async_db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        client = TestClient(app)
+        headers = {"Authorization": "Bearer " + create_access_token({"sub": str(student.id)})}
+        assert client.post("/api/v1/quests/attempts/batch", json=batch, headers=headers).status_code == 200
+        response = client.get("/api/v1/quests/progress", headers=headers)
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(get_async_db, None)
+        else:
+            app.dependency_overrides[get_async_db] = previous
+
+    progress = db.get(StudentQuestProgress, student.id)
+    assert (progress.attempts, progress.correct_attempts, progress.points_total, progress.quests_attempted) == (5, 3, 24, 2)
+    attempted = db.scalars(select(StudentQuestAttempted.quest_id).where(StudentQuestAttempted.student_id == student.id))
+    assert sorted(attempted) == [first.id, second.id]
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_quests": 3, "completed_quests": 2, "total_points": 24, "accuracy_rate": 0.6
+    }
+    db.close()
+    engine.dispose()
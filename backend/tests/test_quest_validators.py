@@ -0,0 +1,97 @@
+"""
+Quest answer validator tests
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.core.quest_validators import compile_quest, compiled_quest, compiled_quests, points_for, score_answers
+
+def test_fill_in_blank_tolerances_and_partial_credit():
+    """Test accepted alternatives, tolerance rules and per-blank credit"""
+    strict = compile_quest("fill_in_blank", {
+        "correct_answers": {"1": "a", "2": ["est", "était"]}, "partial_credit": True
+    })
+    lenient = compile_quest("fill_in_blank", {
+        "correct_answers": ["Élève", 3.14],
+        "case_sensitive": False, "ignore_accents": True, "max_typos": 1, "tolerance": 0.01
+    })
+
+    assert strict.check({"answers": {"1": " a ", "2": "était"}}) == 1.0
+    assert strict.check({"answers": {"1": "a", "2": "Est"}}) == 0.5
+    assert strict.check({"answers": "a"}) == 0.0
+    assert lenient.check({"answers": ["elve", "3.141"]}) == 1.0
+    assert lenient.check({"answers": ["eleves!", "3.2"]}) == 0.0
+    assert points_for(strict, 0.5, 10) == 5
+    assert points_for(compile_quest("fill_in_blank", {"correct_answers": ["a"], "partial_credit": False}), 0.5, 10) == 0
+
+def test_quests_without_the_flag_keep_all_or_nothing_points():
+    """Test an existing quest with no partial_credit flag still earns nothing for a near miss"""
+    for quest_type, content, near_miss in [
+        ("fill_in_blank", {"correct_answers": ["le", "chat"]}, {"answers": ["le", "chien"]}),
+        ("reorder", {"correct_order": ["je", "suis", "ici"]}, {"order": ["suis", "je", "ici"]}),
+        ("matching", {"pairs": {"chat": "cat", "chien": "dog"}}, {"matches": {"chat": "cat", "chien": "cat"}}),
+    ]:
+        compiled = compile_quest(quest_type, content)
+        score = compiled.check(near_miss)
+        assert 0 < score < 1 and not compiled.partial_credit
+        assert points_for(compiled, score, 10) == 0
+
+def test_choice_order_matching_and_dictation_scores():
+    """Test each quest type scores full, partial and malformed answers"""
+    single = compile_quest("multiple_choice", {"correct_answer": 2})
+    several = compile_quest("multiple_choice", {"correct_answer": ["a", "c"]})
+    reorder = compile_quest("reorder", {"correct_order": ["je", "suis", "ici"]})
+    matching = compile_quest("matching", {"pairs": {"chat": "cat", "chien": "dog"}})
+    dictation = compile_quest("dictation", {"text": "le chat dort"})
+
+    assert single.check({"selected_option": 2}) == 1.0 and single.correct_answer == 2
+    assert several.check({"selected_option": ["a"]}) == 0.5
+    assert several.check({"selected_option": ["a", "b"]}) == 0.0
+    assert reorder.check({"order": ["je", "suis", "ici"]}) == 1.0
+    assert reorder.check({"order": ["suis", "je", "ici"]}) == 2 / 3
+    assert matching.check({"matches": {"chat": "cat", "chien": "cat"}}) == 0.5
+    assert matching.check({"matches": ["cat"]}) == 0.0
+    assert dictation.check({"text": "le chat dort"}) == 1.0
+    assert compile_quest("unknown", {}).check({}) == 0.0
+
+def test_compiled_quests_are_cached_per_version():
+    """Test a quest compiles once per updated_at"""
+    compiled_quests.clear()
+    quest = SimpleNamespace(id=1, updated_at=datetime(2024, 1, 1), quest_type="multiple_choice",
+                            content_json={"correct_answer": "a"})
+
+    first = compiled_quest(quest)
+    assert compiled_quest(quest) is first
+
+    quest.updated_at, quest.content_json = datetime(2024, 1, 2), {"correct_answer": "b"}
+    assert compiled_quest(quest) is not first
+    assert compiled_quest(quest).check({"selected_option": "b"}) == 1.0
+
+def test_dictation_is_scored_off_the_event_loop():
+    """Test threaded quest types are checked in the threadpool and the rest inline, in answer order"""
+    dictation = compile_quest("dictation", {"text": "le chat dort"})
+    choice = compile_quest("multiple_choice", {"correct_answer": "a"})
+    threads = []
+
+    def recording(compiled):
+        def check(answer_data):
+            threads.append(threading.get_ident())
+            return compiled.check(answer_data)
+        return compiled._replace(check=check)
+
+    async def score(answers):
+        return await score_answers(answers), threading.get_ident()
+
+    assert dictation.threaded and not choice.threaded
+    scores, loop_thread = asyncio.run(score([(recording(choice), {"selected_option": "a"})]))
+    assert scores == [1.0] and threads == [loop_thread]
+
+    threads.clear()
+    scores, loop_thread = asyncio.run(score([
+        (recording(dictation), {"text": "le chat"}), (recording(choice), {"selected_option": "b"})
+    ]))
+    assert scores == [dictation.check({"text": "le chat"}), 0.0]
+    assert len(set(threads)) == 1 and loop_thread not in threads
@@ -0,0 +1,64 @@
+"""
+Slow-query log tests
+"""
+
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.slow_queries import SlowQueryLog, slow_query_log
+from main import app
+
+def test_slow_statements_are_aggregated_by_fingerprint_and_explained_once(tmp_path, monkeypatch):
+    """Test statements over the threshold share a fingerprint entry with percentiles and one captured plan"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE words (id INTEGER PRIMARY KEY, word TEXT)"))
+        conn.execute(text("INSERT INTO words (word) VALUES ('chat'), ('chien'), ('oiseau')"))
+
+    slow_query_log.reset()
+    monkeypatch.setattr(slow_query_log, "threshold", 0)
+    monkeypatch.setattr(slow_query_log, "explain", True)
+    try:
+        with engine.connect() as conn:
+            for word in ("chat", "chien", "loup"):
+                conn.execute(text("SELECT id FROM words WHERE word = :word"), {"word": word})
+        queries = slow_query_log.top(order_by="count")
+    finally:
+        slow_query_log.reset()
+        engine.dispose()
+
+    [lookup] = [query for query in queries if query["fingerprint"] == "SELECT id FROM words WHERE word = ?"]
+    assert lookup["count"] == 3
+    assert lookup["p50_ms"] <= lookup["p95_ms"] <= lookup["max_ms"]
+    assert lookup["total_ms"] >= lookup["max_ms"]
+    assert any("SCAN" in str(row) for row in lookup["plan"])
+
+def test_slow_statements_are_written_to_the_log_file_within_the_fingerprint_bound(tmp_path):
+    """Test each slow statement is logged as JSON and fingerprints past the bound are only counted"""
+    log_file = tmp_path / "slow.log"
+    log = SlowQueryLog(threshold_ms=0, max_fingerprints=1, log_file=str(log_file))
+    log.record(None, "SELECT * FROM quests WHERE id = 7", (), 0.25, explainable=False)
+    log.record(None, "SELECT * FROM quests WHERE id = 8", (), 0.75, explainable=False)
+    log.record(None, "SELECT * FROM users", (), 0.5, explainable=False)
+
+    [entry] = log.top()
+    assert (entry["count"], entry["total_ms"], entry["max_ms"]) == (2, 1000.0, 750.0)
+    assert log.stats()["dropped"] == 1
+    lines = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [line["fingerprint"] for line in lines] == ["SELECT * FROM quests WHERE id = ?"] * 2
+    assert lines[1]["ms"] == 750.0
+
+def test_admin_slow_query_endpoint_requires_the_admin_key(monkeypatch):
+    """Test the admin API is closed without ADMIN_API_KEY and lists slow queries with it"""
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", None)
+    assert client.get("/api/v1/admin/slow-queries", headers={"X-Admin-Key": ""}).status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "s3cret")
+    assert client.get("/api/v1/admin/slow-queries", headers={"X-Admin-Key": "wrong"}).status_code == 403
+    response = client.get("/api/v1/admin/slow-queries?order_by=p95", headers={"X-Admin-Key": "s3cret"})
+    assert response.status_code == 200
+    assert set(response.json()) == {"threshold_ms", "fingerprints", "dropped", "queries"}
@@ -0,0 +1,112 @@
+"""
+Upload storage tests
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.utils import FileTooLargeError, blob_path, copy_file_stream, save_upload_stream
+from app.models import User, School, Class, Assignment, Submission, Correction, UploadBlob
+from app.services.upload_service import UploadService
+
+def test_copy_file_stream_writes_and_hashes_in_chunks(tmp_path):
+    """Test the copy matches the source byte for byte across chunk boundaries"""
+    content = os.urandom(10_000)
+    stored = copy_file_stream(io.BytesIO(content), str(tmp_path), max_size=20_000, chunk_size=4096)
+
+    assert stored.size == len(content)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert stored.path == str(tmp_path / stored.sha256[:2] / stored.sha256[2:4] / stored.sha256)
+    assert not stored.deduplicated
+    with open(stored.path, "rb") as f:
+        assert f.read() == content
+
+def test_copy_file_stream_stores_duplicates_once(tmp_path):
+    """Test identical content maps to one blob"""
+    first = copy_file_stream(io.BytesIO(b"worksheet"), str(tmp_path), max_size=100)
+    second = copy_file_stream(io.BytesIO(b"worksheet"), str(tmp_path), max_size=100)
+
+    assert second.path == first.path
+    assert second.deduplicated
+    assert os.listdir(tmp_path / "tmp") == []
+
+def test_copy_file_stream_aborts_past_limit(tmp_path):
+    """Test oversized files stop early and leave nothing behind"""
+    source = io.BytesIO(b"x" * 10_000)
+    with pytest.raises(FileTooLargeError):
+        copy_file_stream(source, str(tmp_path), max_size=5000, chunk_size=1024)
+
+    assert source.tell() < 10_000
+    assert os.listdir(tmp_path / "tmp") == []
+
+def test_save_upload_stream_rejects_with_413(tmp_path):
+    """Test the async wrapper maps oversized uploads to 413"""
+    upload = UploadFile(io.BytesIO(b"x" * 100), filename="page.jpg")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(save_upload_stream(upload, upload_dir=str(tmp_path), max_size=50))
+
+    assert error.value.status_code == 413
+    assert os.listdir(tmp_path / "tmp") == []
+
+def test_blob_references_are_counted_and_collected(tmp_path):
+    """Test ref counts follow inserts and deletes and garbage collection removes unreferenced blobs"""
+    database = tmp_path / "uploads.db"
+    upload_dir = tmp_path / "uploads"
+    kept = copy_file_stream(io.BytesIO(b"kept"), str(upload_dir), max_size=100)
+    dropped = copy_file_stream(io.BytesIO(b"dropped"), str(upload_dir), max_size=100)
+    orphan = copy_file_stream(io.BytesIO(b"orphan"), str(upload_dir), max_size=100)
+
+    engine = create_engine(f"sqlite:///{database}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        teacher = User(name="teacher", email="teacher@example.com", password_hash="x", role="teacher")
+        student = User(name="student", email="student@example.com", password_hash="x", role="student")
+        db.add_all([teacher, student])
+        db.flush()
+        school = School(name="School", teacher_id=teacher.id)
+        db.add(school)
+        db.flush()
+        class_obj = Class(school_id=school.id, name="Class")
+        db.add(class_obj)
+        db.flush()
+        assignment = Assignment(class_id=class_obj.id, created_by_teacher_id=teacher.id, title="Essay")
+        db.add(assignment)
+        db.flush()
+        submission = Submission(assignment_id=assignment.id, student_id=student.id, content_hash=kept.sha256)
+        corrections = [Correction(student_id=student.id, content_hash=sha256) for sha256 in (kept.sha256, dropped.sha256)]
+        db.add_all([submission, *corrections])
+        db.commit()
+
+        counts = dict(db.execute(select(UploadBlob.sha256, UploadBlob.ref_count)).all())
+        assert counts == {kept.sha256: 2, dropped.sha256: 1}
+
+        db.delete(corrections[1])
+        db.commit()
+        assert db.scalar(select(UploadBlob.ref_count).where(UploadBlob.sha256 == dropped.sha256)) == 0
+    engine.dispose()
+
+    async def collect():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+        async with async_sessionmaker(async_engine)() as db:
+            removed = await UploadService.collect_garbage(db, upload_dir=str(upload_dir), grace_seconds=-1)
+            remaining = set((await db.scalars(select(UploadBlob.sha256))).all())
+        await async_engine.dispose()
+        return removed, remaining
+
+    removed, remaining = asyncio.run(collect())
+
+    assert removed["blobs"] == 1 and removed["orphans"] == 1
+    assert remaining == {kept.sha256}
+    assert os.path.exists(kept.path)
+    assert not os.path.exists(dropped.path)
+    assert not os.path.exists(orphan.path)
+    assert blob_path(kept.sha256, str(upload_dir)) == kept.path